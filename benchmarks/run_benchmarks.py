@@ -0,0 +1,358 @@
+"""Benchmark the smart bots on fixed, seeded games for each number of players, and
+compare the results against a baseline.
+
+Run from the root of the repository, e.g.:
+
+    uv run -m benchmarks.run_benchmarks --output-path baseline.json
+    uv run -m benchmarks.run_benchmarks --compare-path baseline.json
+"""
+
+import dataclasses
+import json
+import sys
+import tracemalloc
+from pathlib import Path
+from statistics import median
+from time import perf_counter
+from typing import Any, Self
+
+import numpy as np
+import pandas as pd
+from pydantic import model_validator
+from pydantic_settings import BaseSettings, CliApp, SettingsConfigDict
+
+from cluedo_replay import feed_turn
+from cluedo_simulator import run_game, set_up_game
+from common.batched_games import BaselineStrategy, play_baseline_games
+from common.consts import MIN_N_PLAYERS
+from common.game_record import GameRecord
+from common.sat_backends import SatBackendSetting
+from common.sat_solver import DEFAULT_SAT_BACKEND
+from common.smart_bot_agent import SmartBotObserver, SmartBotPlayer
+
+BENCHMARKS_FORMAT = "cluedo-benchmarks/2"
+
+OPERATIONS = (
+    "must_see_extra_cards",
+    "try_solving_crime",
+    "count_truths_probabilities",
+    "solve_truths_cnf_probabilities",
+)
+"""The calls of the smart observers that are timed in each turn, in this order."""
+
+
+@dataclasses.dataclass(frozen=True)
+class BenchmarkSettings:
+    """The scenarios of the benchmarks, which must be the same to compare results."""
+
+    n_players: tuple[int, ...] = (2, 3, 4, 5, 6)
+    n_games: int = 3
+    """The number of games per number of players."""
+    seed: int = 0
+    max_n_turns: int = 40
+    n_samples: int = 100
+    """The number of samples for `solve_truths_cnf_probabilities`."""
+    sampling_turn_step: int = 5
+    """Time `solve_truths_cnf_probabilities`, which is slow, only every this many
+    turns (from turn 1) and in the turn that the crime is solved.
+    """
+    sat_backend: SatBackendSetting = DEFAULT_SAT_BACKEND
+
+
+def get_scenarios(n_players: int, settings: BenchmarkSettings) -> list[GameRecord]:
+    """Get the games to replay, which are baseline games (see `play_baseline_games`)
+    so that they do not change with the smart bots.
+    """
+    games = play_baseline_games(
+        n_players,
+        n_games=settings.n_games,
+        strategy=BaselineStrategy.NAIVE,
+        seed=settings.seed,
+    )
+    return [
+        dataclasses.replace(games.get_game_record(game_index), seed=settings.seed)
+        for game_index in range(settings.n_games)
+    ]
+
+
+def _set_up_observer(
+    game_record: GameRecord, settings: BenchmarkSettings
+) -> SmartBotObserver:
+    return SmartBotObserver(
+        agent_index=game_record.n_players,
+        player_indices=list(range(game_record.n_players)),
+        n_cards_per_player=game_record.deal.hand_masks[0].bit_count(),
+        sat_backend=settings.sat_backend,
+        rng=np.random.default_rng(game_record.seed),
+    )
+
+
+def measure_latencies(
+    game_record: GameRecord, settings: BenchmarkSettings
+) -> dict[str, dict[int, float]]:
+    """Replay a game to smart observers and time each of `OPERATIONS` in each turn,
+    until they solve the crime.
+
+    `must_see_extra_cards` and `try_solving_crime` both bring the deduction of the case
+    file up to date, so whichever is called first does the work for the other. To time
+    the work of each, `try_solving_crime` is called on a second observer that is shown
+    the same game, and the extra cards when the first one is.
+
+    Returns the seconds of each operation in each turn that it is timed in.
+    """
+    observer = _set_up_observer(game_record, settings)
+    solving_observer = _set_up_observer(game_record, settings)
+    latencies: dict[str, dict[int, float]] = {operation: {} for operation in OPERATIONS}
+
+    def time_call(
+        agent: SmartBotObserver, operation: str, turn_index: int, **kwargs: Any
+    ) -> Any:
+        start = perf_counter()
+        result = getattr(agent, operation)(**kwargs)
+        latencies[operation][turn_index] = perf_counter() - start
+        return result
+
+    for turn_index, turn in enumerate(
+        game_record.turns[: settings.max_n_turns], start=1
+    ):
+        feed_turn([observer, solving_observer], game_record.n_players, turn_index, turn)
+        if time_call(observer, "must_see_extra_cards", turn_index):
+            for agent in [observer, solving_observer]:
+                agent.sees_extra_cards(
+                    turn_index=turn_index, rumor_cards=game_record.deal.extra_cards
+                )
+        crime = time_call(solving_observer, "try_solving_crime", turn_index)
+        time_call(observer, "count_truths_probabilities", turn_index)
+        if turn_index % settings.sampling_turn_step == 1 or crime is not None:
+            time_call(
+                observer,
+                "solve_truths_cnf_probabilities",
+                turn_index,
+                n_samples=settings.n_samples,
+            )
+        if crime is not None:
+            break
+    return latencies
+
+
+def measure_peak_memory(game_record: GameRecord, settings: BenchmarkSettings) -> int:
+    """Get the peak memory, in bytes, of setting up a smart observer and replaying a
+    game to it until it solves the crime.
+
+    Only the memory allocated by Python is traced, not that of the SAT solver, nor that
+    of caches shared between agents, e.g., of the rules, once they are warm.
+    """
+    tracemalloc.start()
+    try:
+        observer = _set_up_observer(game_record, settings)
+        for turn_index, turn in enumerate(
+            game_record.turns[: settings.max_n_turns], start=1
+        ):
+            feed_turn([observer], game_record.n_players, turn_index, turn)
+            if observer.must_see_extra_cards():
+                observer.sees_extra_cards(
+                    turn_index=turn_index, rumor_cards=game_record.deal.extra_cards
+                )
+            if observer.try_solving_crime() is not None:
+                break
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def measure_throughput(n_players: int, settings: BenchmarkSettings) -> dict[str, float]:
+    """Play whole seeded games between smart bot players, and get how many games and
+    turns they play per second.
+    """
+    n_turns = 0
+    start = perf_counter()
+    for game_seed in np.random.SeedSequence(settings.seed).spawn(settings.n_games):
+        setup = set_up_game(
+            player_types=[SmartBotPlayer] * n_players,
+            observer_types=[],
+            sat_backend=settings.sat_backend,
+            seed=game_seed,
+        )
+        solving_turn_indices = run_game(
+            setup, dashboard=False, reveal_extra_cards_first=False
+        )
+        n_turns += max(solving_turn_indices.values())
+    seconds = perf_counter() - start
+    return {
+        "games_per_second": settings.n_games / seconds,
+        "turns_per_second": n_turns / seconds,
+    }
+
+
+def run_benchmarks(settings: BenchmarkSettings) -> dict[str, Any]:
+    """Run the benchmarks for each number of players, and get the results as JSON data.
+
+    The latency of each operation in each turn is the median over the games, in
+    milliseconds, and the peak memory is the largest over the games, in KiB.
+    """
+    results: dict[str, Any] = {}
+    for n_players in settings.n_players:
+        print(f"Benchmarking {n_players} players...", file=sys.stderr)
+        game_records = get_scenarios(n_players, settings)
+        all_latencies = [
+            measure_latencies(game_record, settings) for game_record in game_records
+        ]
+        results[str(n_players)] = {
+            "latency_ms": {
+                operation: {
+                    str(turn_index): median(
+                        latencies[operation][turn_index] * 1000
+                        for latencies in all_latencies
+                        if turn_index in latencies[operation]
+                    )
+                    for turn_index in sorted(
+                        {
+                            turn_index
+                            for latencies in all_latencies
+                            for turn_index in latencies[operation]
+                        }
+                    )
+                }
+                for operation in OPERATIONS
+            },
+            "peak_memory_kib": max(
+                measure_peak_memory(game_record, settings)
+                for game_record in game_records
+            )
+            / 1024,
+            **measure_throughput(n_players, settings),
+        }
+    return {
+        "format": BENCHMARKS_FORMAT,
+        "settings": _settings_to_json(settings),
+        "results": results,
+    }
+
+
+def _settings_to_json(settings: BenchmarkSettings) -> dict[str, Any]:
+    return {**dataclasses.asdict(settings), "n_players": list(settings.n_players)}
+
+
+def compare_benchmarks(
+    baseline: dict[str, Any], current: dict[str, Any], threshold: float = 0.2
+) -> pd.DataFrame:
+    """Compare the results of `run_benchmarks` against a baseline, with one row per
+    metric per number of players.
+
+    The latency of each operation is compared as its mean over the turns timed in
+    both. A metric regresses if it is worse than the baseline by more than
+    `threshold`, as a fraction: higher for latency and memory, lower for throughput.
+    """
+    if baseline["settings"] != current["settings"]:
+        raise ValueError("The benchmarks were run on different scenarios")
+    rows = []
+    for n_players, results in current["results"].items():
+        baseline_results = baseline["results"][n_players]
+        metrics: list[tuple[str, float, float, bool]] = []
+        for operation, latencies in results["latency_ms"].items():
+            baseline_latencies = baseline_results["latency_ms"][operation]
+            turn_indices = latencies.keys() & baseline_latencies.keys()
+            if len(turn_indices) == 0:
+                continue
+            metrics.append(
+                (
+                    f"{operation}_ms",
+                    float(np.mean([baseline_latencies[t] for t in turn_indices])),
+                    float(np.mean([latencies[t] for t in turn_indices])),
+                    True,
+                )
+            )
+        for metric, is_lower_better in [
+            ("peak_memory_kib", True),
+            ("games_per_second", False),
+            ("turns_per_second", False),
+        ]:
+            metrics.append(
+                (metric, baseline_results[metric], results[metric], is_lower_better)
+            )
+        for metric, baseline_value, value, is_lower_better in metrics:
+            ratio = value / baseline_value if baseline_value != 0 else 1.0
+            rows.append(
+                {
+                    "n_players": int(n_players),
+                    "metric": metric,
+                    "baseline": baseline_value,
+                    "current": value,
+                    "ratio": ratio,
+                    "regressed": (
+                        ratio > 1 + threshold
+                        if is_lower_better
+                        else ratio < 1 / (1 + threshold)
+                    ),
+                }
+            )
+    return pd.DataFrame(rows)
+
+
+def main() -> None:
+    cli_settings = _CliSettings.from_cli_args()
+    settings = BenchmarkSettings(
+        n_players=tuple(cli_settings.n_players),
+        n_games=cli_settings.n_games,
+        seed=cli_settings.seed,
+        max_n_turns=cli_settings.max_n_turns,
+        n_samples=cli_settings.n_samples,
+        sampling_turn_step=cli_settings.sampling_turn_step,
+        sat_backend=cli_settings.sat_backend,
+    )
+    if cli_settings.compare_path is not None:
+        # Check that the baseline can be compared before running the benchmarks.
+        baseline = json.loads(cli_settings.compare_path.read_text())
+        if baseline.get("format") != BENCHMARKS_FORMAT:
+            raise ValueError(f"Not benchmark results: {cli_settings.compare_path}")
+        if baseline["settings"] != _settings_to_json(settings):
+            raise ValueError("The baseline was run with different settings")
+    start = perf_counter()
+    results = run_benchmarks(settings)
+    print(f"Benchmarked in {perf_counter() - start:.1f} s.", file=sys.stderr)
+    cli_settings.output_path.write_text(json.dumps(results, indent=2) + "\n")
+    print(f"Results written to {cli_settings.output_path}.")
+    if cli_settings.compare_path is None:
+        return
+    comparison = compare_benchmarks(baseline, results, cli_settings.threshold)
+    print(comparison.to_string(index=False, float_format="{:.3f}".format))
+    regressions = comparison[comparison["regressed"]]
+    if len(regressions) > 0:
+        print(
+            f"{len(regressions)} metrics regressed by more than "
+            f"{cli_settings.threshold:.0%}."
+        )
+        sys.exit(1)
+    print(f"No metric regressed by more than {cli_settings.threshold:.0%}.")
+
+
+class _CliSettings(BaseSettings):
+    model_config = SettingsConfigDict(cli_kebab_case=True, cli_implicit_flags=True)
+
+    output_path: Path = Path("benchmark_results.json")
+    compare_path: Path | None = None
+    """If given, compare the results against this baseline, and exit with an error if
+    any metric regressed by more than `threshold`.
+    """
+    threshold: float = 0.2
+    n_players: list[int] = list(BenchmarkSettings.n_players)
+    n_games: int = BenchmarkSettings.n_games
+    seed: int = BenchmarkSettings.seed
+    max_n_turns: int = BenchmarkSettings.max_n_turns
+    n_samples: int = BenchmarkSettings.n_samples
+    sampling_turn_step: int = BenchmarkSettings.sampling_turn_step
+    sat_backend: SatBackendSetting = DEFAULT_SAT_BACKEND
+
+    @model_validator(mode="after")
+    def check_n_players(self) -> Self:
+        if any(not MIN_N_PLAYERS <= n_players <= 6 for n_players in self.n_players):
+            raise ValueError("The benchmarks are for 2 to 6 players")
+        return self
+
+    @classmethod
+    def from_cli_args(cls) -> Self:
+        return CliApp.run(cls, cli_args=sys.argv[1:])
+
+
+if __name__ == "__main__":
+    main()
@@ -1,34 +1,55 @@
 import os
 import sys
+from pathlib import Path
 from time import sleep
 from typing import Self, assert_never
 
 from pydantic_settings import BaseSettings, CliApp, SettingsConfigDict
 
 from common import store
-from common.agent_utils import BasePlayer, UnknownRumor
+from common.agent_utils import AgentIndex, BasePlayer, UnknownRumor
 from common.cards import (
     N_CASE_FILE_CARDS,
     RUMORS,
     Character,
     Crime,
     Room,
+    RumorCard,
     Weapon,
 )
 from common.circular_sequence import CircularSequence
 from common.consts import GameVariant
 from common.dashboard import run_dashboard
-from common.io.io import AbstractIo
+from common.events import (
+    NULL_EVENT_SINK,
+    CardRevealed,
+    CrimeSolved,
+    EventSink,
+    ExtraCardsSeen,
+    GameEnded,
+    GuessMade,
+    JsonlEventSink,
+    NullEventSink,
+    TurnStarted,
+)
+from common.io.io import AbstractIo, format_list
 from common.io.text_io import TextIo
+from common.sat_backends import SatBackendSetting
+from common.sat_solver import DEFAULT_SAT_BACKEND
 from common.smart_bot_agent import SmartBotObserver, SmartBotPlayer, UnsolvableError
 from common.utils import print_logo
 
-N_SAMPLES_FOR_PROBABILITY = 10
-
 
 class CluedoAssistant:
-    def __init__(self, io: AbstractIo, player_names: list[str]) -> None:
+    def __init__(
+        self,
+        io: AbstractIo,
+        player_names: list[str],
+        sat_backend: SatBackendSetting = DEFAULT_SAT_BACKEND,
+        events: EventSink = NULL_EVENT_SINK,
+    ) -> None:
         self.io = io
+        self.events = events
         self.player_names = player_names
         self.player_indices = list(range(len(self.player_names)))
         self.n_players = len(self.player_names)
@@ -49,6 +70,7 @@ class CluedoAssistant:
                 agent_index=-1,
                 player_indices=self.player_indices,
                 n_cards_per_player=n_cards_per_player,
+                sat_backend=sat_backend,
             )
         else:
             player_hand = self.io.get_rumor_cards(
@@ -60,6 +82,7 @@ class CluedoAssistant:
                 player_indices=self.player_indices,
                 n_cards_per_player=n_cards_per_player,
                 rumor_cards=player_hand,
+                sat_backend=sat_backend,
             )
         self.turn_index = 0
         self.n_extra_cards = self.agent.n_extra_cards
@@ -77,47 +100,40 @@ class CluedoAssistant:
                 ),
             )
             if self.reveal_extra_cards_first:
-                self.agent.sees_extra_cards(
-                    turn_index=self.turn_index,
-                    rumor_cards=self.io.get_extra_cards(
-                        n_extra_cards=self.n_extra_cards
-                    ),
-                )
+                self._sees_extra_cards()
         self.game_variant = self.io.get_game_variant()
 
     def run(self, dashboard: bool) -> None:
         while True:
             for player_name in self.player_names:
                 if dashboard:
-                    probabilities = self.agent.solve_truths_cnf_probabilities(
-                        n_samples=N_SAMPLES_FOR_PROBABILITY
-                    )
+                    probabilities = self.agent.count_truths_probabilities()
                     store.append_probabilities(
-                        str(self.agent), self.turn_index, probabilities
+                        str(self.agent),
+                        self.turn_index,
+                        probabilities,
+                        self.agent.get_deduction_state(),
                     )
                 self.turn_index += 1
-                if self._run_turn(current_player_name=player_name):
-                    return
+                try:
+                    if self._run_turn(current_player_name=player_name):
+                        return
+                except UnsolvableError:
+                    if self._correct_turns():
+                        return
                 if (
                     not isinstance(self.agent, BasePlayer)
                     and self.n_extra_cards > 0
                     and not self.reveal_extra_cards_first
                 ):
                     # TODO: Move into `_run_turn`.
-                    observer_must_see_extra_cards = self.agent.must_see_extra_cards(
-                        turn_index=self.turn_index
-                    )
+                    observer_must_see_extra_cards = self.agent.must_see_extra_cards()
                     if observer_must_see_extra_cards:
                         self.io.print_(
                             "Knowing the extra cards is the only thing left I need to "
                             "solve the crime."
                         )
-                        self.agent.sees_extra_cards(
-                            turn_index=self.turn_index,
-                            rumor_cards=self.io.get_extra_cards(
-                                n_extra_cards=self.n_extra_cards
-                            ),
-                        )
+                        self._sees_extra_cards()
                         solved = self._try_solving_crime()
                         if not solved:
                             self.io.print_("An unexpected error occurred.")
@@ -126,6 +142,7 @@ class CluedoAssistant:
     def _run_turn(self, current_player_name: str) -> bool:
         current_player_index = self.player_names.index(current_player_name)
         current_player_is_user = current_player_index == self.agent.agent_index
+        self.events.emit(TurnStarted(self.turn_index, current_player_index))
 
         self.io.announce_turn(
             self.turn_index,
@@ -137,15 +154,83 @@ class CluedoAssistant:
             f"Did {'you' if current_player_is_user else current_player_name.capitalize()} start a rumor in this turn?"
         )
         if not rumor_started:
-            self.agent.add_game_log_entry(turn_index=self.turn_index)
+            self._start_game_log_entry()
             return False
 
         guess = self._get_guess(current_player_name)
-        self.agent.add_game_log_entry(turn_index=self.turn_index, guess=guess)
+        self._start_game_log_entry(guess)
+        self.events.emit(GuessMade(self.turn_index, current_player_index, guess))
 
         self.io.print_("Who gave evidence that the suspect, weapon, or room was wrong?")
         return self.collect_responses(current_player_name, guess)
 
+    def _start_game_log_entry(self, guess: Crime | None = None) -> None:
+        if self.turn_index < len(self.agent.game_log):
+            # The turn is being entered again.
+            self.agent.reset_game_log_entry(turn_index=self.turn_index, guess=guess)
+        else:
+            self.agent.add_game_log_entry(turn_index=self.turn_index, guess=guess)
+
+    def _correct_turns(self) -> bool:
+        """Have the user enter the turns that contradict each other again, until none
+        do, then the current turn, which the contradiction interrupted. Returns whether
+        the crime has been solved meanwhile.
+
+        Entering a turn again only changes which clauses the solver assumes, so this
+        is as fast however long the game has gone on.
+        """
+        turn_indices_to_enter = {self.turn_index}
+        while True:
+            conflicting_turn_indices = self.agent.get_conflicting_turn_indices()
+            if len(conflicting_turn_indices) > 0:
+                self.io.print_(
+                    "What you've entered in "
+                    + format_list(
+                        [
+                            "your hand" if turn_index == 0 else f"turn {turn_index}"
+                            for turn_index in conflicting_turn_indices
+                        ],
+                        sep="and",
+                    )
+                    + " is contradictory."
+                )
+                turn_index = next(
+                    (
+                        turn_index
+                        for turn_index in reversed(conflicting_turn_indices)
+                        if turn_index > 0
+                        and self.io.get_yes_or_no(
+                            f"Would you like to enter turn {turn_index} again?"
+                        )
+                    ),
+                    None,
+                )
+                if turn_index is None:
+                    raise UnsolvableError
+                self.agent.reset_game_log_entry(turn_index=turn_index)
+                turn_indices_to_enter.add(turn_index)
+                continue
+            if len(turn_indices_to_enter) == 0:
+                return False
+            turn_index = min(turn_indices_to_enter)
+            turn_indices_to_enter.remove(turn_index)
+            try:
+                if self._run_turn_again(turn_index):
+                    return True
+            except UnsolvableError:
+                turn_indices_to_enter.add(turn_index)
+
+    def _run_turn_again(self, turn_index: int) -> bool:
+        current_turn_index = self.turn_index
+        self.turn_index = turn_index
+        self.io.print_(f"Let's enter turn {turn_index} again.")
+        try:
+            return self._run_turn(
+                current_player_name=self.player_names[(turn_index - 1) % self.n_players]
+            )
+        finally:
+            self.turn_index = current_turn_index
+
     def _get_guess(self, current_player_name: str) -> Crime:
         current_player_index = self.player_names.index(current_player_name)
         current_player_is_user = current_player_index == self.agent.agent_index
@@ -216,11 +301,7 @@ class CluedoAssistant:
                 )
             else:
                 rumor_card = UnknownRumor()
-            self.agent.sees_card(
-                turn_index=self.turn_index,
-                other_player_index=respondent_index,
-                rumor_card=rumor_card,
-            )
+            self._sees_card(current_player_index, respondent_index, rumor_card)
             if (
                 self.game_variant is GameVariant.BOTH_SIDES_REVEAL
                 and respondent_index == farthest_player_index
@@ -241,11 +322,7 @@ class CluedoAssistant:
                         : choice_list.index(respondent_index)
                     ]
                     for nonrespondent_index in nonrespondent_indexes:
-                        self.agent.sees_card(
-                            turn_index=self.turn_index,
-                            other_player_index=nonrespondent_index,
-                            rumor_card=None,
-                        )
+                        self._sees_card(current_player_index, nonrespondent_index, None)
                 choiceset = [
                     choices for choices in choiceset if respondent_index not in choices
                 ]
@@ -256,20 +333,49 @@ class CluedoAssistant:
         all_choices = sorted({c for choices in choiceset for c in choices})
         for choice in all_choices:
             nonrespondent_index = choice
-            self.agent.sees_card(
-                turn_index=self.turn_index,
-                other_player_index=nonrespondent_index,
-                rumor_card=None,
-            )
+            self._sees_card(current_player_index, nonrespondent_index, None)
         if len(all_choices) > 0:
             if self._try_solving_crime():
                 return True
         return False
 
+    def _sees_card(
+        self,
+        current_player_index: AgentIndex,
+        other_player_index: AgentIndex,
+        rumor_card: RumorCard | UnknownRumor | None,
+    ) -> None:
+        self.agent.sees_card(
+            turn_index=self.turn_index,
+            other_player_index=other_player_index,
+            rumor_card=rumor_card,
+        )
+        self.events.emit(
+            CardRevealed(
+                self.turn_index, current_player_index, other_player_index, rumor_card
+            )
+        )
+
+    def _sees_extra_cards(self) -> None:
+        extra_cards = self.io.get_extra_cards(n_extra_cards=self.n_extra_cards)
+        self.agent.sees_extra_cards(turn_index=self.turn_index, rumor_cards=extra_cards)
+        self.events.emit(
+            ExtraCardsSeen(self.turn_index, self.agent.agent_index, extra_cards)
+        )
+
     def _try_solving_crime(self) -> bool:
         crime = self.agent.try_solving_crime()
         if crime is None:
             return False
+        is_player = isinstance(self.agent, BasePlayer)
+        self.events.emit(
+            CrimeSolved(
+                self.turn_index,
+                player_indices=[self.agent.agent_index] if is_player else [],
+                observer_indices=[] if is_player else [self.agent.agent_index],
+            )
+        )
+        self.events.emit(GameEnded(self.turn_index))
         self.io.print_("The Cluedo assistant has solved the case!")
         self.io.print_(
             f"The host was killed by {crime.character.name.capitalize()} with the "
@@ -278,7 +384,15 @@ class CluedoAssistant:
         return True
 
 
-def cluedo_assistant(io: AbstractIo, dashboard: bool = False) -> None:
+def cluedo_assistant(
+    io: AbstractIo,
+    dashboard: bool = False,
+    sat_backend: SatBackendSetting = DEFAULT_SAT_BACKEND,
+    events_path: Path | None = None,
+) -> None:
+    """Run the assistant, writing the events of the game to `events_path` as lines of
+    JSON if given.
+    """
     if isinstance(io, TextIo):
         os.system("cls" if os.name == "nt" else "clear")
         print()
@@ -288,15 +402,20 @@ def cluedo_assistant(io: AbstractIo, dashboard: bool = False) -> None:
     io.print_("Give me information about your gameplay by answering my prompts.")
     io.print_("I'll tell you what the crime was as soon as I've isolated the solution.")
     player_names = io.get_human_player_names()
-    cluedo_assistant = CluedoAssistant(io=io, player_names=player_names)
-    try:
-        cluedo_assistant.run(dashboard)
-    except UnsolvableError:
-        io.print_(
-            "Based on the information you've entered during the gameplay, "
-            "the crime is unsolvable. "
-            "You likely entered a rumor or player response incorrectly."
+    with (
+        NullEventSink() if events_path is None else JsonlEventSink(events_path)
+    ) as events:
+        cluedo_assistant = CluedoAssistant(
+            io=io, player_names=player_names, sat_backend=sat_backend, events=events
         )
+        try:
+            cluedo_assistant.run(dashboard)
+        except UnsolvableError:
+            io.print_(
+                "Based on the information you've entered during the gameplay, "
+                "the crime is unsolvable. "
+                "You likely entered a rumor or player response incorrectly."
+            )
 
 
 def main() -> None:
@@ -305,7 +424,12 @@ def main() -> None:
         dashboard_thread = run_dashboard()
     else:
         dashboard_thread = None
-    cluedo_assistant(io=TextIo(), dashboard=cli_settings.dashboard)
+    cluedo_assistant(
+        io=TextIo(),
+        dashboard=cli_settings.dashboard,
+        sat_backend=cli_settings.sat_backend,
+        events_path=cli_settings.events_path,
+    )
     if dashboard_thread is not None:
         dashboard_thread.join()
 
@@ -314,6 +438,9 @@ class _CliSettings(BaseSettings):
     model_config = SettingsConfigDict(cli_kebab_case=True, cli_implicit_flags=True)
 
     dashboard: bool = False
+    sat_backend: SatBackendSetting = DEFAULT_SAT_BACKEND
+    events_path: Path | None = None
+    """If given, write the events of the game here as lines of JSON."""
 
     @classmethod
     def from_cli_args(cls) -> Self:
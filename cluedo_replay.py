@@ -0,0 +1,211 @@
+import dataclasses
+import sys
+from collections.abc import Iterable, Sequence
+from pathlib import Path
+from time import perf_counter
+from typing import Self
+
+import numpy as np
+from pydantic_settings import BaseSettings, CliApp, SettingsConfigDict
+
+from cluedo_simulator import set_up_game
+from common.agent_utils import (
+    AgentIndex,
+    BaseAgent,
+    BaseObserver,
+    BasePlayer,
+    NaivePlayer,
+    UnknownRumor,
+)
+from common.batched_games import BaselineStrategy, play_baseline_games
+from common.game_record import (
+    GameRecord,
+    TurnRecord,
+    read_game_records,
+    write_game_records,
+)
+from common.sat_backends import SatBackendSetting
+from common.sat_solver import DEFAULT_SAT_BACKEND
+from common.smart_bot_agent import SmartBotObserver, SmartBotPlayer
+
+
+@dataclasses.dataclass
+class ReplayResult:
+    solving_turn_indices: dict[AgentIndex, int]
+    """The turn in which each agent solved the crime, if it did by the end of the
+    record.
+    """
+    turn_seconds: list[float]
+    """How long the agents took to take in each turn and try solving the crime."""
+    n_solver_calls: int
+
+
+def replay_game(
+    game_record: GameRecord,
+    player_types: Sequence[type[BasePlayer]],
+    observer_types: Sequence[type[BaseObserver]] = (),
+    sat_backend: SatBackendSetting = DEFAULT_SAT_BACKEND,
+    reveal_extra_cards_first: bool = False,
+) -> ReplayResult:
+    """Feed a recorded game to agents of the given types, as fast as they can take it
+    in, until every agent has solved the crime or the record ends.
+
+    The players do not make guesses or answer them, but see the recorded ones, so any
+    agents can be replayed on any record, e.g., to compare their deduction.
+    """
+    setup = set_up_game(
+        player_types=player_types,
+        observer_types=observer_types,
+        sat_backend=sat_backend,
+        seed=game_record.seed,
+        deal=game_record.deal,
+    )
+    agents = list(setup.agents.values())
+    extra_cards = setup.extra_cards
+    if len(extra_cards) != 0 and reveal_extra_cards_first:
+        for agent in agents:
+            agent.sees_extra_cards(turn_index=0, rumor_cards=extra_cards)
+    solving_turn_indices: dict[AgentIndex, int] = {}
+    turn_seconds: list[float] = []
+    for turn_index, turn in enumerate(game_record.turns, start=1):
+        start = perf_counter()
+        feed_turn(agents, game_record.n_players, turn_index, turn)
+        for agent in agents:
+            if agent.agent_index in solving_turn_indices:
+                continue
+            if (
+                len(extra_cards) != 0
+                and not reveal_extra_cards_first
+                and isinstance(agent, SmartBotObserver | NaivePlayer)
+                and agent.must_see_extra_cards()
+            ):
+                agent.sees_extra_cards(turn_index=turn_index, rumor_cards=extra_cards)
+            if agent.try_solving_crime() is not None:
+                solving_turn_indices[agent.agent_index] = turn_index
+        turn_seconds.append(perf_counter() - start)
+        if len(solving_turn_indices) == len(agents):
+            break
+    return ReplayResult(
+        solving_turn_indices=solving_turn_indices,
+        turn_seconds=turn_seconds,
+        n_solver_calls=setup.public_knowledge.solver.n_solves,
+    )
+
+
+def feed_turn(
+    agents: Sequence[BaseAgent], n_players: int, turn_index: int, turn: TurnRecord
+) -> None:
+    """Show a recorded turn to the given agents, as `run_turn` would have, without
+    their trying to solve the crime.
+    """
+    current_player_index = (turn_index - 1) % n_players
+    for agent in agents:
+        agent.add_game_log_entry(turn_index=turn_index, guess=turn.guess)
+    for responder_index, rumor_card in turn.card_reveals:
+        third_agent_rumor_card = None if rumor_card is None else UnknownRumor()
+        for agent in agents:
+            if agent.agent_index == responder_index:
+                continue
+            agent.sees_card(
+                turn_index=turn_index,
+                other_player_index=responder_index,
+                rumor_card=(
+                    rumor_card
+                    if agent.agent_index == current_player_index
+                    else third_agent_rumor_card
+                ),
+            )
+
+
+def replay_games(
+    game_records: Iterable[GameRecord],
+    naive_players: bool = False,
+    include_observer: bool = False,
+    sat_backend: SatBackendSetting = DEFAULT_SAT_BACKEND,
+    reveal_extra_cards_first: bool = False,
+) -> list[ReplayResult]:
+    """Replay each recorded game with a player of the given kind in each seat, and an
+    observer if `include_observer`.
+    """
+    player_type: type[BasePlayer] = NaivePlayer if naive_players else SmartBotPlayer
+    return [
+        replay_game(
+            game_record,
+            player_types=[player_type] * game_record.n_players,
+            observer_types=[SmartBotObserver] if include_observer else [],
+            sat_backend=sat_backend,
+            reveal_extra_cards_first=reveal_extra_cards_first,
+        )
+        for game_record in game_records
+    ]
+
+
+def main() -> None:
+    cli_settings = _CliSettings.from_cli_args()
+    if cli_settings.n_baseline_games is not None:
+        baseline_games = play_baseline_games(
+            n_players=cli_settings.n_players,
+            n_games=cli_settings.n_baseline_games,
+            strategy=BaselineStrategy.NAIVE,
+            reveal_extra_cards_first=cli_settings.reveal_extra_cards_first,
+            seed=cli_settings.seed,
+        )
+        write_game_records(
+            cli_settings.records_path,
+            (
+                baseline_games.get_game_record(game_index)
+                for game_index in range(cli_settings.n_baseline_games)
+            ),
+        )
+        print(
+            f"Recorded {cli_settings.n_baseline_games} baseline games to "
+            f"{cli_settings.records_path}."
+        )
+    start = perf_counter()
+    results = replay_games(
+        read_game_records(cli_settings.records_path),
+        naive_players=cli_settings.naive_players,
+        include_observer=cli_settings.include_observer,
+        sat_backend=cli_settings.sat_backend,
+        reveal_extra_cards_first=cli_settings.reveal_extra_cards_first,
+    )
+    seconds = perf_counter() - start
+    turn_seconds = np.array([s for result in results for s in result.turn_seconds])
+    p50, p95, p99 = np.percentile(turn_seconds, [50, 95, 99]) * 1000
+    print(
+        f"{len(results)} games, {len(turn_seconds)} turns in {seconds:.1f} s "
+        f"({len(results) / seconds:.2f} games/s, "
+        f"{len(turn_seconds) / seconds:.1f} turns/s)."
+    )
+    print(
+        f"Time per turn: {p50:.2f} ms median, {p95:.2f} ms p95, {p99:.2f} ms p99, "
+        f"{turn_seconds.max() * 1000:.2f} ms max."
+    )
+    print(f"Solver calls per game: {np.mean([r.n_solver_calls for r in results]):.1f}.")
+
+
+class _CliSettings(BaseSettings):
+    model_config = SettingsConfigDict(cli_kebab_case=True, cli_implicit_flags=True)
+
+    records_path: Path
+    """The game records to replay, as written by `write_game_records`."""
+    naive_players: bool = False
+    """Replay naive players instead of smart bot players."""
+    include_observer: bool = False
+    reveal_extra_cards_first: bool = False
+    sat_backend: SatBackendSetting = DEFAULT_SAT_BACKEND
+    n_baseline_games: int | None = None
+    """If given, first record this many baseline games (see `play_baseline_games`)
+    to `records_path`.
+    """
+    n_players: int = 4
+    """The number of players of the baseline games."""
+    seed: int | None = None
+
+    @classmethod
+    def from_cli_args(cls) -> Self:
+        return CliApp.run(cls, cli_args=sys.argv[1:])
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,14 @@
+import contextlib
 import dataclasses
 import sys
 from collections.abc import Sequence
-from time import sleep
-from typing import Self
+from concurrent.futures import Executor, ProcessPoolExecutor
+from pathlib import Path
+from time import perf_counter, sleep
+from typing import Any, Self
 
+import numpy as np
+import pandas as pd
 from pydantic import model_validator
 from pydantic_settings import BaseSettings, CliApp, SettingsConfigDict
 
@@ -13,16 +18,36 @@ from common.agent_utils import (
     BaseAgent,
     BaseObserver,
     BasePlayer,
+    NaivePlayer,
     UnknownRumor,
 )
-from common.cards import CHARACTERS, ROOMS, WEAPONS, Crime, RumorCard
+from common.bitboard import BitboardDeal, mask_cards
+from common.cards import Crime, RumorCard
 from common.consts import MIN_N_PLAYERS
 from common.dashboard import run_dashboard
-from common.smart_bot_agent import SmartBotObserver, SmartBotPlayer
+from common.events import (
+    NULL_EVENT_SINK,
+    CardRevealed,
+    ConsoleEventSink,
+    CrimeSolved,
+    EventSink,
+    ExtraCardsSeen,
+    GameEnded,
+    GuessMade,
+    JsonlEventSink,
+    TurnStarted,
+)
+from common.game_record import GameRecord, write_game_records
+from common.public_knowledge import PublicKnowledge
+from common.sat_backends import SatBackendSetting
+from common.sat_solver import DEFAULT_SAT_BACKEND
+from common.smart_bot_agent import (
+    GuessMakingStrategy,
+    SmartBotObserver,
+    SmartBotPlayer,
+    count_truths_probabilities_in_parallel,
+)
 from common.user_player import UserPlayer
-from common.utils import shuffled
-
-N_SAMPLES_FOR_PROBABILITY = 10
 
 
 @dataclasses.dataclass
@@ -30,6 +55,8 @@ class GameSetup:
     crime: Crime
     extra_cards: Sequence[RumorCard]
     agents: dict[AgentIndex, BaseAgent]
+    public_knowledge: PublicKnowledge
+    deal: BitboardDeal
 
     @property
     def players(self) -> dict[AgentIndex, BasePlayer]:
@@ -53,148 +80,237 @@ def run_turn(
     players: dict[AgentIndex, BasePlayer],
     current_player_index: AgentIndex,
     observers: dict[AgentIndex, BaseObserver],
+    deal: BitboardDeal,
+    events: EventSink = NULL_EVENT_SINK,
 ) -> None:
-    print(f"Turn: {turn_index}.")
-    agents: dict[AgentIndex, BaseAgent] = {**players, **observers}
+    """Play a turn, in which the deal determines who is asked to answer the guess and
+    which cards they can show, and each player who can show a card chooses which.
+    """
+    events.emit(TurnStarted(turn_index, current_player_index))
     current_player = players[current_player_index]
     guess = current_player.make_guess(turn_index=turn_index)
-    for agent in agents.values():
+    events.emit(GuessMade(turn_index, current_player_index, guess))
+    # Everyone but the current player sees that a card is shown, but not which.
+    other_agents: list[BaseAgent] = [
+        *(player for player in players.values() if player is not current_player),
+        *observers.values(),
+    ]
+    current_player.add_game_log_entry(turn_index=turn_index, guess=guess)
+    for agent in other_agents:
         agent.add_game_log_entry(turn_index=turn_index, guess=guess)
-    furthest_player_reached = False
-    n_players = len(players)
-    for direction in [-1, +1]:
-        players_pos_delta = 1
-        while players_pos_delta <= n_players // 2:
-            if players_pos_delta == n_players // 2 and furthest_player_reached:
-                break
-            if players_pos_delta == n_players // 2:
-                furthest_player_reached = True
-            second_player_pos = (
-                current_player.agent_index + players_pos_delta * direction
-            )
-            second_player = players[(len(players) + second_player_pos) % len(players)]
-            rumor_card = second_player.answer_guess(guess)
-            current_player.sees_card(
-                turn_index=turn_index,
-                other_player_index=second_player.agent_index,
-                rumor_card=rumor_card,
+
+    for second_player_index, shown_mask in deal.get_answers(
+        current_player_index, guess
+    ):
+        second_player = players[second_player_index]
+        rumor_card = (
+            None
+            if shown_mask == 0
+            else second_player.choose_card_to_show(mask_cards(shown_mask))
+        )
+        events.emit(
+            CardRevealed(
+                turn_index, current_player_index, second_player_index, rumor_card
             )
-            for third_agent in [
-                agent
-                for agent in agents.values()
-                if agent.agent_index
-                not in [current_player.agent_index, second_player.agent_index]
-            ]:
+        )
+        current_player.sees_card(
+            turn_index=turn_index,
+            other_player_index=second_player_index,
+            rumor_card=rumor_card,
+        )
+        third_agent_rumor_card = None if rumor_card is None else UnknownRumor()
+        for third_agent in other_agents:
+            if third_agent is not second_player:
                 third_agent.sees_card(
                     turn_index=turn_index,
-                    other_player_index=second_player.agent_index,
-                    rumor_card=(UnknownRumor() if rumor_card is not None else None),
+                    other_player_index=second_player_index,
+                    rumor_card=third_agent_rumor_card,
                 )
-            if rumor_card is not None:
-                break
-            else:
-                players_pos_delta += 1
 
 
-def run_game(setup: GameSetup, dashboard: bool, reveal_extra_cards_first: bool) -> None:
+def run_game(
+    setup: GameSetup,
+    dashboard: bool,
+    reveal_extra_cards_first: bool,
+    executor: Executor | None = None,
+    events: EventSink = NULL_EVENT_SINK,
+    n_probability_samples: int | None = None,
+) -> dict[AgentIndex, int]:
+    """Run a game until every agent has solved the crime, and return the turn in
+    which each agent solved it.
+
+    The agents' probabilities for the dashboard are counted exactly, or estimated from
+    `n_probability_samples` sampled deals if given. If an executor is given, they are
+    counted in parallel on it, one agent per task, or each agent's samples are drawn
+    across its workers.
+    """
     n_extra_cards = len(setup.extra_cards)
     turn_index = 0
     for agent in setup.agents.values():
         if n_extra_cards != 0 and reveal_extra_cards_first:
             agent.sees_extra_cards(turn_index=turn_index, rumor_cards=setup.extra_cards)
+            events.emit(
+                ExtraCardsSeen(turn_index, agent.agent_index, setup.extra_cards)
+            )
     won_agent_indices: list[AgentIndex] = []
+    solving_turn_indices: dict[AgentIndex, int] = {}
     while True:
         for player in setup.players.values():
             if dashboard:
-                for agent in setup.agents.values():
-                    if not isinstance(agent, SmartBotObserver):
-                        continue
-                    probabilities = agent.solve_truths_cnf_probabilities(
-                        n_samples=N_SAMPLES_FOR_PROBABILITY
+                smart_agents = [
+                    agent
+                    for agent in setup.agents.values()
+                    if isinstance(agent, SmartBotObserver)
+                ]
+                if n_probability_samples is not None:
+                    all_probabilities = [
+                        agent.solve_truths_cnf_probabilities(
+                            n_samples=n_probability_samples, executor=executor
+                        )
+                        for agent in smart_agents
+                    ]
+                elif executor is None:
+                    all_probabilities = [
+                        agent.count_truths_probabilities() for agent in smart_agents
+                    ]
+                else:
+                    all_probabilities = count_truths_probabilities_in_parallel(
+                        smart_agents, executor
+                    )
+                for agent, probabilities in zip(
+                    smart_agents, all_probabilities, strict=True
+                ):
+                    store.append_probabilities(
+                        str(agent),
+                        turn_index,
+                        probabilities,
+                        agent.get_deduction_state(),
                     )
-                    store.append_probabilities(str(agent), turn_index, probabilities)
                     sleep(0.1)
             turn_index += 1
-            run_turn(turn_index, setup.players, player.agent_index, setup.observers)
+            run_turn(
+                turn_index,
+                setup.players,
+                player.agent_index,
+                setup.observers,
+                setup.deal,
+                events=events,
+            )
             newly_won_agent_indices: list[AgentIndex] = []
             for agent in setup.agents.values():
                 if agent.agent_index in won_agent_indices:
                     continue
                 if n_extra_cards != 0 and not reveal_extra_cards_first:
-                    if isinstance(agent, SmartBotObserver):
-                        agent_must_see_extra_cards = agent.must_see_extra_cards(
-                            turn_index=turn_index
-                        )
+                    if isinstance(agent, SmartBotObserver | NaivePlayer):
+                        agent_must_see_extra_cards = agent.must_see_extra_cards()
                         if agent_must_see_extra_cards:
                             agent.sees_extra_cards(
                                 turn_index=turn_index, rumor_cards=setup.extra_cards
                             )
+                            events.emit(
+                                ExtraCardsSeen(
+                                    turn_index, agent.agent_index, setup.extra_cards
+                                )
+                            )
                 result = agent.try_solving_crime()
                 if result is not None:
                     won_agent_indices.append(agent.agent_index)
                     newly_won_agent_indices.append(agent.agent_index)
-            newly_won_player_indices = [
-                index
-                for index in newly_won_agent_indices
-                if index in setup.players.keys()
-            ]
-            if len(newly_won_player_indices) > 0:
-                print(
-                    f"The following players have solved the crime in the last turn: {newly_won_player_indices}"
-                )
-            newly_won_observer_indices = [
-                index
-                for index in newly_won_agent_indices
-                if index in setup.observers.keys()
-            ]
-            if len(newly_won_observer_indices) > 0:
-                print(
-                    f"The following observers have solved the crime in the last turn: {newly_won_observer_indices}"
+                    solving_turn_indices[agent.agent_index] = turn_index
+            if len(newly_won_agent_indices) > 0:
+                events.emit(
+                    CrimeSolved(
+                        turn_index,
+                        player_indices=[
+                            index
+                            for index in newly_won_agent_indices
+                            if index in setup.players.keys()
+                        ],
+                        observer_indices=[
+                            index
+                            for index in newly_won_agent_indices
+                            if index in setup.observers.keys()
+                        ],
+                    )
                 )
             if len(won_agent_indices) == len(setup.agents):
-                print("By now, all players and observers have solved the crime.")
-                return
+                events.emit(GameEnded(turn_index))
+                return solving_turn_indices
 
 
 def set_up_game(
     player_types: Sequence[type[BasePlayer]],
     observer_types: Sequence[type[BaseObserver]],
+    sat_backend: SatBackendSetting = DEFAULT_SAT_BACKEND,
+    seed: int | np.random.SeedSequence | None = None,
+    guess_making_strategies: Sequence[GuessMakingStrategy] = (),
+    deal: BitboardDeal | None = None,
 ) -> GameSetup:
-    character_deck = shuffled(CHARACTERS)
-    weapon_deck = shuffled(WEAPONS)
-    room_deck = shuffled(ROOMS)
-    crime = Crime(
-        character=character_deck.pop(),
-        weapon=weapon_deck.pop(),
-        room=room_deck.pop(),
+    """Deal a game, unless a deal is given (e.g., to replay a game), and set up its
+    agents.
+
+    The deal and each smart agent get their own random generator, all derived from
+    `seed`, so that the same seed gives the same game.
+
+    The smart bot players take the given strategies in order, and any others keep the
+    default strategy.
+    """
+    seed_sequence = (
+        seed
+        if isinstance(seed, np.random.SeedSequence)
+        else np.random.SeedSequence(seed)
     )
-    rumor_deck = shuffled(character_deck + weapon_deck + room_deck)
-    n_players = len(player_types)
-    n_cards_per_player = len(rumor_deck) // n_players
-    n_extra_cards = len(rumor_deck) % n_players
-    extra_cards = [rumor_deck.pop() for _ in range(n_extra_cards)]
     agent_types = list(player_types) + list(observer_types)
+    deal_seed, *agent_seeds = seed_sequence.spawn(1 + len(agent_types))
+    n_players = len(player_types)
+    if deal is None:
+        deal = BitboardDeal.deal(n_players, np.random.default_rng(deal_seed))
+    elif deal.n_players != n_players:
+        raise ValueError("The deal is for a different number of players")
+    extra_cards = deal.extra_cards
+    n_cards_per_player = deal.hand_masks[0].bit_count()
+    n_extra_cards = len(extra_cards)
     agents: dict[AgentIndex, BaseAgent] = {}
+    player_indices = list(range(n_players))
+    # The smart agents share one solver for what they all know.
+    public_knowledge = PublicKnowledge(
+        player_indices, n_cards_per_player, n_extra_cards, sat_backend
+    )
     for agent_index, agent_type in enumerate(agent_types):
-        player_indices = list(range(n_players))
+        kwargs: dict[str, Any] = {}
+        if issubclass(agent_type, SmartBotObserver | NaivePlayer):
+            kwargs["rng"] = np.random.default_rng(agent_seeds[agent_index])
+        if issubclass(agent_type, SmartBotObserver):
+            kwargs["public_knowledge"] = public_knowledge
         if issubclass(agent_type, BasePlayer):
             agent = agent_type(
                 agent_index=agent_index,
                 player_indices=player_indices,
                 n_cards_per_player=n_cards_per_player,
-                rumor_cards=[rumor_deck.pop() for _ in range(n_cards_per_player)],
+                rumor_cards=deal.hand(agent_index),
+                **kwargs,
             )
         else:
             agent = agent_type(
                 agent_index=agent_index,
                 player_indices=player_indices,
                 n_cards_per_player=n_cards_per_player,
+                **kwargs,
             )
         agents[agent_index] = agent
+    smart_players = [
+        agent for agent in agents.values() if isinstance(agent, SmartBotPlayer)
+    ]
+    if len(guess_making_strategies) > len(smart_players):
+        raise ValueError("There are more strategies than smart bot players")
+    for player, strategy in zip(smart_players, guess_making_strategies, strict=False):
+        player.guess_making_strategy = strategy
     game_setup = GameSetup(
-        crime=crime,
+        crime=deal.crime,
         extra_cards=extra_cards,
         agents=agents,
+        public_knowledge=public_knowledge,
+        deal=deal,
     )
     return game_setup
 
@@ -204,17 +320,184 @@ def cluedo_simulator(
     observer_types: Sequence[type[BaseObserver]] = (),
     dashboard: bool = False,
     reveal_extra_cards_first: bool = False,
+    sat_backend: SatBackendSetting = DEFAULT_SAT_BACKEND,
+    n_probability_workers: int = 1,
+    seed: int | None = None,
+    guess_making_strategies: Sequence[GuessMakingStrategy] = (),
+    events_path: Path | None = None,
+    record_path: Path | None = None,
+    n_probability_samples: int | None = None,
 ) -> None:
-    game_setup = set_up_game(player_types=player_types, observer_types=observer_types)
-    run_game(
-        setup=game_setup,
-        dashboard=dashboard,
+    """Play a game, printing its progress, or writing its events to `events_path` as
+    lines of JSON if given, and write a record of the game to `record_path` if given.
+    """
+    game_setup = set_up_game(
+        player_types=player_types,
+        observer_types=observer_types,
+        sat_backend=sat_backend,
+        seed=seed,
+        guess_making_strategies=guess_making_strategies,
+    )
+    with (
+        (
+            ProcessPoolExecutor(max_workers=n_probability_workers)
+            if dashboard and n_probability_workers > 1
+            else contextlib.nullcontext()
+        ) as executor,
+        (
+            ConsoleEventSink() if events_path is None else JsonlEventSink(events_path)
+        ) as events,
+    ):
+        run_game(
+            setup=game_setup,
+            dashboard=dashboard,
+            reveal_extra_cards_first=reveal_extra_cards_first,
+            executor=executor,
+            events=events,
+            n_probability_samples=n_probability_samples,
+        )
+    if record_path is not None:
+        write_game_records(
+            record_path,
+            [GameRecord.from_players(game_setup.deal, game_setup.players, seed)],
+        )
+
+
+def run_tournament(
+    n_games: int,
+    guess_making_strategies: Sequence[GuessMakingStrategy],
+    include_observer: bool = False,
+    reveal_extra_cards_first: bool = False,
+    sat_backend: SatBackendSetting = DEFAULT_SAT_BACKEND,
+    seed: int | None = None,
+    n_workers: int = 1,
+) -> pd.DataFrame:
+    """Play games between smart bot players with the given strategies, one per seat,
+    quietly, on `n_workers` worker processes.
+
+    The strategies move one seat along after each game, so that no strategy keeps the
+    first turn, and each game gets its own seed derived from `seed`.
+
+    Returns one row of results per agent per game.
+    """
+    n_players = len(guess_making_strategies)
+    game_seeds = np.random.SeedSequence(seed).spawn(n_games)
+    game_strategies = [
+        [
+            guess_making_strategies[(seat - game_index) % n_players]
+            for seat in range(n_players)
+        ]
+        for game_index in range(n_games)
+    ]
+    with (
+        ProcessPoolExecutor(max_workers=n_workers)
+        if n_workers > 1
+        else contextlib.nullcontext()
+    ) as executor:
+        all_results = (map if executor is None else executor.map)(
+            _play_tournament_game,
+            range(n_games),
+            game_strategies,
+            [include_observer] * n_games,
+            [reveal_extra_cards_first] * n_games,
+            [sat_backend] * n_games,
+            game_seeds,
+        )
+        return pd.DataFrame([row for results in all_results for row in results])
+
+
+def _play_tournament_game(
+    game_index: int,
+    guess_making_strategies: Sequence[GuessMakingStrategy],
+    include_observer: bool,
+    reveal_extra_cards_first: bool,
+    sat_backend: SatBackendSetting,
+    seed: np.random.SeedSequence,
+) -> list[dict[str, Any]]:
+    start = perf_counter()
+    setup = set_up_game(
+        player_types=[SmartBotPlayer] * len(guess_making_strategies),
+        observer_types=[SmartBotObserver] if include_observer else [],
+        sat_backend=sat_backend,
+        seed=seed,
+        guess_making_strategies=guess_making_strategies,
+    )
+    solving_turn_indices = run_game(
+        setup,
+        dashboard=False,
         reveal_extra_cards_first=reveal_extra_cards_first,
     )
+    seconds = perf_counter() - start
+    first_solving_turn_index = min(
+        solving_turn_indices[player_index] for player_index in setup.players
+    )
+    return [
+        {
+            "game_index": game_index,
+            "agent_index": agent_index,
+            "strategy": (
+                agent.guess_making_strategy.value
+                if isinstance(agent, SmartBotPlayer)
+                else "OBSERVER"
+            ),
+            "solving_turn_index": solving_turn_indices[agent_index],
+            # Players who solve the crime in the same turn all win.
+            "won": (
+                agent_index in setup.players
+                and solving_turn_indices[agent_index] == first_solving_turn_index
+            ),
+            "n_turns": max(solving_turn_indices.values()),
+            "n_solver_calls": setup.public_knowledge.solver.n_solves,
+            "seconds": seconds,
+        }
+        for agent_index, agent in setup.agents.items()
+    ]
+
+
+def summarize_tournament(results: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Summarize the results of `run_tournament` per strategy and per game."""
+    per_strategy = results.groupby("strategy").agg(
+        n_seats=("game_index", "size"),
+        mean_solving_turn_index=("solving_turn_index", "mean"),
+        median_solving_turn_index=("solving_turn_index", "median"),
+        win_rate=("won", "mean"),
+    )
+    games = results.groupby("game_index").first()
+    per_game = games[["n_turns", "n_solver_calls", "seconds"]].agg(
+        ["mean", "median", "max"]
+    )
+    return per_strategy, per_game
 
 
 def main() -> None:
     cli_settings = _CliSettings.from_cli_args()
+    if cli_settings.n_games is not None:
+        start = perf_counter()
+        results = run_tournament(
+            n_games=cli_settings.n_games,
+            guess_making_strategies=(
+                cli_settings.strategies
+                or [SmartBotPlayer.guess_making_strategy] * cli_settings.n_bot_players
+            ),
+            include_observer=cli_settings.include_observer,
+            reveal_extra_cards_first=cli_settings.reveal_extra_cards_first,
+            sat_backend=cli_settings.sat_backend,
+            seed=cli_settings.seed,
+            n_workers=cli_settings.workers,
+        )
+        seconds = perf_counter() - start
+        results.to_csv(cli_settings.results_path, index=False)
+        per_strategy, per_game = summarize_tournament(results)
+        print(per_strategy.to_string(float_format="{:.2f}".format))
+        print()
+        print(per_game.to_string(float_format="{:.3f}".format))
+        print()
+        print(
+            f"{cli_settings.n_games} games in {seconds:.1f} s "
+            f"({cli_settings.n_games / seconds:.2f} games/s). "
+            f"Results written to {cli_settings.results_path}."
+        )
+        return
     if cli_settings.dashboard:
         dashboard_thread = run_dashboard()
     else:
@@ -227,6 +510,13 @@ def main() -> None:
         observer_types=([SmartBotObserver] if cli_settings.include_observer else []),
         dashboard=cli_settings.dashboard,
         reveal_extra_cards_first=cli_settings.reveal_extra_cards_first,
+        sat_backend=cli_settings.sat_backend,
+        n_probability_workers=cli_settings.n_probability_workers,
+        seed=cli_settings.seed,
+        guess_making_strategies=cli_settings.strategies,
+        events_path=cli_settings.events_path,
+        record_path=cli_settings.record_path,
+        n_probability_samples=cli_settings.n_probability_samples,
     )
     if dashboard_thread is not None:
         dashboard_thread.join()
@@ -240,6 +530,27 @@ class _CliSettings(BaseSettings):
     include_observer: bool = False
     dashboard: bool = False
     reveal_extra_cards_first: bool = False
+    sat_backend: SatBackendSetting = DEFAULT_SAT_BACKEND
+    n_probability_workers: int = 1
+    n_probability_samples: int | None = None
+    """If given, estimate the probabilities for the dashboard from this many sampled
+    deals, instead of counting them exactly.
+    """
+    seed: int | None = None
+    events_path: Path | None = None
+    """If given, write the events of the game here as lines of JSON, not to the
+    console.
+    """
+    record_path: Path | None = None
+    """If given, write a record of the game here, e.g., to replay it with
+    `cluedo_replay.py`.
+    """
+    strategies: list[GuessMakingStrategy] = []
+    """The guess-making strategy of each bot player, in order."""
+    n_games: int | None = None
+    """If given, play this many games of bots quietly, as a tournament."""
+    workers: int = 1
+    results_path: Path = Path("tournament_results.csv")
 
     @model_validator(mode="after")
     def check_n_total_players(self) -> Self:
@@ -247,6 +558,18 @@ class _CliSettings(BaseSettings):
             raise ValueError(f"There must be at least {MIN_N_PLAYERS} players")
         return self
 
+    @model_validator(mode="after")
+    def check_strategies(self) -> Self:
+        if len(self.strategies) not in [0, self.n_bot_players]:
+            raise ValueError("There must be one strategy per bot player, if any")
+        return self
+
+    @model_validator(mode="after")
+    def check_tournament(self) -> Self:
+        if self.n_games is not None and (self.n_human_players > 0 or self.dashboard):
+            raise ValueError("Tournaments are only for bots, without the dashboard")
+        return self
+
     @classmethod
     def from_cli_args(cls) -> Self:
         return CliApp.run(cls, cli_args=sys.argv[1:])
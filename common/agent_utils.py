@@ -1,11 +1,20 @@
 import abc
 import dataclasses
 from collections.abc import Sequence
-from copy import deepcopy
 from typing import Literal
 
-from common.cards import RUMORS, Crime, RumorCard
+import numpy as np
+import numpy.typing as npt
+
+from common.cards import N_CASE_FILE_CARDS, RUMORS, Crime, RumorCard
 from common.consts import EXTRA_CARDS, ExtraCards
+from common.elimination import (
+    RUMOR_TYPE_CARD_IDS,
+    get_case_file_candidates,
+    is_solved,
+    must_see_extra_cards,
+    rule_out_case_file,
+)
 
 CASE_FILE = "Case File"
 
@@ -77,6 +86,27 @@ class BaseAgent(abc.ABC):
         pass
 
 
+def get_responder_sequences(
+    current_player_index: AgentIndex, n_players: int
+) -> tuple[list[AgentIndex], list[AgentIndex]]:
+    """Get the players whom the current player asks to answer their guess.
+
+    The players of the first sequence, to one side, are asked in order until one of
+    them shows a card, then likewise the players of the second sequence, to the other
+    side. Each sequence ends with the player furthest away on its side. If the first
+    sequence gets as far as its furthest player, the furthest player of the second
+    sequence is not asked.
+    """
+    first_sequence, second_sequence = (
+        [
+            (current_player_index + players_pos_delta * direction) % n_players
+            for players_pos_delta in range(1, n_players // 2 + 1)
+        ]
+        for direction in [-1, +1]
+    )
+    return first_sequence, second_sequence
+
+
 class BaseObserver(BaseAgent, abc.ABC):
     pass
 
@@ -90,16 +120,110 @@ class BasePlayer(BaseAgent, abc.ABC):
         raise NotImplementedError
 
     @abc.abstractmethod
-    def answer_guess(self, guess: Crime) -> RumorCard | None:
+    def choose_card_to_show(self, rumor_cards: Sequence[RumorCard]) -> RumorCard:
+        """Choose which of the given guessed cards, all in this player's hand, to show
+        in answer to a guess.
+        """
         raise NotImplementedError
 
 
 @dataclasses.dataclass
 class NaivePlayer(BasePlayer):
-    _remaining_possible_rumors: Sequence[RumorCard] = dataclasses.field(init=False)
+    """A baseline player who needs no solver. They only keep track of which cards may
+    be in which locations, ruling out a location when a card is held or shown
+    elsewhere, or when a player shows none of the guessed cards, and of the case file
+    having one card of each rumor type (see `rule_out_case_file`). They guess at random
+    among the cards that may be in the case file.
+    """
+
+    rng: np.random.Generator = dataclasses.field(
+        default_factory=np.random.default_rng, kw_only=True
+    )
+
+    _possible: npt.NDArray[np.bool_] = dataclasses.field(init=False, repr=False)
+    """Whether each card (row) may be in each location (column), i.e., the players, the
+    case file, and the extra cards.
+    """
 
     def __post_init__(self) -> None:
         super().__post_init__()
-        self._remaining_possible_rumors = deepcopy(RUMORS)
-        for rumor_card in self.rumor_cards:
-            self._remaining_possible_rumors.remove(rumor_card)
+        n_players = len(self.player_indices)
+        self._possible = np.ones((len(RUMORS), n_players + 2), dtype=np.bool_)
+        self._possible[:, n_players + 1] = self.n_extra_cards > 0
+        self._possible[:, self.agent_index] = False
+        self._set_location(
+            [rumor_card.id for rumor_card in self.rumor_cards], self.agent_index
+        )
+
+    @property
+    def n_extra_cards(self) -> int:
+        return (
+            len(RUMORS)
+            - N_CASE_FILE_CARDS
+            - len(self.player_indices) * self.n_cards_per_player
+        )
+
+    def sees_card(
+        self,
+        turn_index: int,
+        other_player_index: AgentIndex | ExtraCards,
+        rumor_card: RumorCard | UnknownRumor | None,
+    ) -> None:
+        super().sees_card(turn_index, other_player_index, rumor_card)
+        if isinstance(rumor_card, RumorCard):
+            self._set_location(
+                [rumor_card.id],
+                -1 if other_player_index == EXTRA_CARDS else other_player_index,
+            )
+        elif rumor_card is None:
+            guess = self.game_log[turn_index].guess
+            if guess is not None:
+                self._possible[
+                    [rumor_card.id for rumor_card in guess], other_player_index
+                ] = False
+        rule_out_case_file(self._possible, len(self.player_indices))
+
+    def sees_extra_cards(
+        self, turn_index: int, rumor_cards: Sequence[RumorCard]
+    ) -> None:
+        super().sees_extra_cards(turn_index, rumor_cards)
+        # There are no other extra cards.
+        is_extra_card = np.zeros(len(RUMORS), dtype=np.bool_)
+        is_extra_card[[rumor_card.id for rumor_card in rumor_cards]] = True
+        self._possible[~is_extra_card, -1] = False
+        rule_out_case_file(self._possible, len(self.player_indices))
+
+    def make_guess(self, turn_index: int | None = None) -> Crime:
+        return Crime(
+            *(
+                candidates[self.rng.integers(len(candidates))]
+                for candidates in self._get_candidates()
+            )
+        )  # type: ignore
+
+    def choose_card_to_show(self, rumor_cards: Sequence[RumorCard]) -> RumorCard:
+        return rumor_cards[self.rng.integers(len(rumor_cards))]
+
+    def must_see_extra_cards(self) -> bool:
+        return bool(
+            must_see_extra_cards(
+                self._possible, len(self.player_indices), self.n_extra_cards
+            )
+        )
+
+    def try_solving_crime(self) -> Crime | None:
+        if not is_solved(self._possible, len(self.player_indices)):
+            return None
+        return Crime(*(rumor_cards[0] for rumor_cards in self._get_candidates()))  # type: ignore
+
+    def _set_location(self, card_ids: list[int], location_index: int) -> None:
+        self._possible[card_ids] = False
+        self._possible[card_ids, location_index] = True
+
+    def _get_candidates(self) -> list[list[RumorCard]]:
+        """Get the cards of each rumor type that may be in the case file."""
+        candidates = get_case_file_candidates(self._possible, len(self.player_indices))
+        return [
+            [RUMORS[card_id] for card_id in card_ids if candidates[card_id]]
+            for card_ids in RUMOR_TYPE_CARD_IDS
+        ]
@@ -0,0 +1,42 @@
+from collections.abc import Sequence
+
+from common.sat_solver import IncrementalSolver
+
+DEFAULT_CHUNK_SIZE = 8
+
+
+def compute_backbone(
+    solver: IncrementalSolver,
+    variables: Sequence[int],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    assumptions: Sequence[int] = (),
+) -> list[int]:
+    """Get the literals over the given `variables` that are true in every model under
+    the given assumptions.
+
+    The solver must be satisfiable under the assumptions and hold a model from its last
+    call to `solve` with them.
+
+    Every literal of the current model is a candidate. Candidates are tested a chunk at
+    a time by asking the solver for a model in which at least one of them is false (see
+    `IncrementalSolver.solve_falsifying_any`), so the solver does not keep growing. If
+    there is none, the whole chunk is backbone. Otherwise, every candidate that the new
+    model falsifies is dropped (model filtering), which usually drops many at once. The
+    chunk grows after each proven chunk and shrinks after each filtering model.
+    """
+    model = solver.get_model()
+    candidates = [model[var - 1] for var in variables]
+    backbone: list[int] = []
+    while len(candidates) > 0:
+        chunk = candidates[:chunk_size]
+        if solver.solve_falsifying_any(
+            chunk, assumptions=assumptions, phases=[-lit for lit in candidates]
+        ):
+            model = solver.get_model()
+            candidates = [lit for lit in candidates if model[abs(lit) - 1] == lit]
+            chunk_size = max(1, chunk_size // 2)
+        else:
+            backbone.extend(chunk)
+            candidates = candidates[len(chunk) :]
+            chunk_size *= 2
+    return backbone
@@ -0,0 +1,337 @@
+import dataclasses
+from enum import Enum
+
+import numpy as np
+import numpy.typing as npt
+
+from common.agent_utils import AgentIndex, GameLogEntry
+from common.bitboard import BitboardDeal, get_responder_table, ids_mask
+from common.cards import N_CASE_FILE_CARDS, RUMORS, Crime
+from common.deals import N_RUMOR_TYPES
+from common.elimination import (
+    RUMOR_TYPE_CARD_IDS,
+    is_solved,
+    must_see_extra_cards,
+    rule_out_case_file,
+)
+from common.game_record import GameRecord, TurnRecord
+
+N_CARDS = len(RUMORS)
+NO_CARD = -1
+"""The answer of a player who is asked but has none of the guessed cards."""
+NOT_ASKED = -2
+"""The answer of a player who is not asked, or of every player in a game that is over."""
+MAX_N_TURNS = 2000
+
+
+class BaselineStrategy(Enum):
+    """How the players of `play_baseline_games` guess. Either way, they deduce what
+    `NaivePlayer` does.
+    """
+
+    RANDOM = "RANDOM"
+    """Guess any cards at random, as `GuessMakingStrategy.RANDOM` does."""
+    NAIVE = "NAIVE"
+    """Guess at random among the cards that may be in the case file, as `NaivePlayer`
+    does.
+    """
+
+
+@dataclasses.dataclass
+class BaselineGames:
+    """Games that are played at once by `play_baseline_games`, as arrays."""
+
+    locations: npt.NDArray[np.int8]
+    """The location of each card (column) in each game (row), i.e., a player, or the
+    number of players for the case file, or one more for the extra cards.
+    """
+    guesses: npt.NDArray[np.int8]
+    """The card id of each rumor type guessed in each turn (from turn 1) of each game,
+    as turns × games × rumor types, or `NO_CARD` once a game is over.
+    """
+    answers: npt.NDArray[np.int8]
+    """The card id shown by each player in each turn of each game, as turns × games ×
+    players, or `NO_CARD` or `NOT_ASKED`.
+    """
+    solving_turn_indices: npt.NDArray[np.int64]
+    """The turn in which each player (column) solved the crime in each game (row)."""
+
+    @property
+    def n_players(self) -> int:
+        return self.solving_turn_indices.shape[1]
+
+    @property
+    def n_turns(self) -> npt.NDArray[np.int64]:
+        """The number of turns of each game, i.e., until every player solved it."""
+        return self.solving_turn_indices.max(axis=1)
+
+    def get_crime(self, game_index: int) -> Crime:
+        return Crime(
+            *(
+                RUMORS[card_id]
+                for card_id in np.flatnonzero(
+                    self.locations[game_index] == self.n_players
+                )
+            )
+        )  # type: ignore
+
+    def get_game_record(self, game_index: int) -> GameRecord:
+        """Get a game as a record, e.g., to write it or to replay it."""
+        locations = self.locations[game_index]
+        deal = BitboardDeal(
+            hand_masks=tuple(
+                ids_mask(np.flatnonzero(locations == player_index))
+                for player_index in range(self.n_players)
+            ),
+            case_file_mask=ids_mask(np.flatnonzero(locations == self.n_players)),
+            extra_cards_mask=ids_mask(np.flatnonzero(locations == self.n_players + 1)),
+        )
+        turns = []
+        for turn_index in range(1, self.n_turns[game_index] + 1):
+            first_sequence, second_sequence = get_responder_table(self.n_players)[
+                (turn_index - 1) % self.n_players
+            ]
+            answers = self.answers[turn_index - 1, game_index]
+            turns.append(
+                TurnRecord(
+                    Crime(
+                        *(
+                            RUMORS[card_id]
+                            for card_id in self.guesses[turn_index - 1, game_index]
+                        )
+                    ),  # type: ignore
+                    [
+                        (
+                            responder_index,
+                            None
+                            if answers[responder_index] == NO_CARD
+                            else RUMORS[answers[responder_index]],
+                        )
+                        for responder_index in [*first_sequence, *second_sequence]
+                        if answers[responder_index] != NOT_ASKED
+                    ],
+                )
+            )
+        return GameRecord(deal, turns)
+
+    def get_game_log(
+        self, game_index: int, agent_index: AgentIndex | None = None
+    ) -> list[GameLogEntry]:
+        """Get the game log of a game as a player would have seen it, or as an observer
+        would have if no player is given (see `GameRecord.get_game_log`).
+        """
+        return self.get_game_record(game_index).get_game_log(agent_index)
+
+
+def play_baseline_games(
+    n_players: int,
+    n_games: int,
+    strategy: BaselineStrategy = BaselineStrategy.NAIVE,
+    reveal_extra_cards_first: bool = False,
+    seed: int | np.random.SeedSequence | None = None,
+) -> BaselineGames:
+    """Play many games between players who need no solver (see `BaselineStrategy`) at
+    once, until every player of every game has solved the crime.
+
+    What each player knows is held as in `NaivePlayer`, for every game at once, as
+    arrays of games × players × cards × locations. As in the simulator, players see
+    the extra cards first if `reveal_extra_cards_first`, otherwise once they must (see
+    `must_see_extra_cards`).
+    """
+    rng = np.random.default_rng(seed)
+    locations = _deal(n_players, n_games, rng)
+    holds = locations[:, None, :] == np.arange(n_players)[None, :, None]
+    is_extra_card = locations == n_players + 1
+    n_extra_cards = int(is_extra_card[0].sum())
+    # Each player knows their own hand.
+    possible = np.ones((n_games, n_players, N_CARDS, n_players + 2), dtype=np.bool_)
+    possible[..., -1] = n_extra_cards > 0
+    possible &= ~holds[..., None]
+    for player_index in range(n_players):
+        possible[:, player_index, :, player_index] = holds[:, player_index]
+    if reveal_extra_cards_first and n_extra_cards > 0:
+        _see_extra_cards(possible, is_extra_card)
+    game_indices = np.arange(n_games)
+    solving_turn_indices = np.full((n_games, n_players), -1)
+    all_guesses: list[npt.NDArray[np.int8]] = []
+    all_answers: list[npt.NDArray[np.int8]] = []
+    turn_index = 0
+    while len(game_indices) > 0:
+        turn_index += 1
+        if turn_index > MAX_N_TURNS:
+            raise RuntimeError(f"Some games took more than {MAX_N_TURNS} turns")
+        current_player_index = (turn_index - 1) % n_players
+        guesses = _guess(
+            possible[game_indices, current_player_index, :, n_players], strategy, rng
+        )
+        answers = np.full((len(game_indices), n_players), NOT_ASKED, dtype=np.int8)
+        first_sequence, second_sequence = get_responder_table(n_players)[
+            current_player_index
+        ]
+        is_asking = np.ones(len(game_indices), dtype=np.bool_)
+        for responder_index in first_sequence:
+            is_asking = _ask(
+                holds,
+                possible,
+                game_indices,
+                guesses,
+                answers,
+                current_player_index,
+                responder_index,
+                is_asking,
+                rng,
+            )
+        # If the first sequence got as far as its furthest player, the furthest player
+        # of the second sequence is not asked.
+        reached_furthest = answers[:, first_sequence[-1]] != NOT_ASKED
+        is_asking = np.ones(len(game_indices), dtype=np.bool_)
+        for position, responder_index in enumerate(second_sequence):
+            if position == len(second_sequence) - 1:
+                is_asking &= ~reached_furthest
+            is_asking = _ask(
+                holds,
+                possible,
+                game_indices,
+                guesses,
+                answers,
+                current_player_index,
+                responder_index,
+                is_asking,
+                rng,
+            )
+        turn_guesses = np.full((n_games, N_RUMOR_TYPES), NO_CARD, dtype=np.int8)
+        turn_guesses[game_indices] = guesses
+        all_guesses.append(turn_guesses)
+        turn_answers = np.full((n_games, n_players), NOT_ASKED, dtype=np.int8)
+        turn_answers[game_indices] = answers
+        all_answers.append(turn_answers)
+        game_possible = possible[game_indices]
+        rule_out_case_file(game_possible, n_players)
+        if n_extra_cards > 0 and not reveal_extra_cards_first:
+            seen_possible = game_possible.copy()
+            _see_extra_cards(seen_possible, is_extra_card[game_indices])
+            rule_out_case_file(seen_possible, n_players)
+            game_possible = np.where(
+                must_see_extra_cards(game_possible, n_players, n_extra_cards)[
+                    ..., None, None
+                ],
+                seen_possible,
+                game_possible,
+            )
+        possible[game_indices] = game_possible
+        game_is_solved = is_solved(game_possible, n_players)
+        game_solving_turn_indices = solving_turn_indices[game_indices]
+        game_solving_turn_indices[game_is_solved & (game_solving_turn_indices < 0)] = (
+            turn_index
+        )
+        solving_turn_indices[game_indices] = game_solving_turn_indices
+        game_indices = game_indices[~game_is_solved.all(axis=1)]
+    return BaselineGames(
+        locations=locations,
+        guesses=np.stack(all_guesses),
+        answers=np.stack(all_answers),
+        solving_turn_indices=solving_turn_indices,
+    )
+
+
+def _see_extra_cards(
+    possible: npt.NDArray[np.bool_], is_extra_card: npt.NDArray[np.bool_]
+) -> None:
+    """Have every player see the extra cards (games × cards), in place."""
+    possible[..., -1] &= is_extra_card[:, None, :]
+    possible[..., :-1] &= ~is_extra_card[:, None, :, None]
+
+
+def _deal(
+    n_players: int, n_games: int, rng: np.random.Generator
+) -> npt.NDArray[np.int8]:
+    """Deal every game at once, as the location of each card (see
+    `BaselineGames.locations`).
+    """
+    case_file_ids = np.stack(
+        [
+            card_ids[rng.integers(len(card_ids), size=n_games)]
+            for card_ids in RUMOR_TYPE_CARD_IDS
+        ],
+        axis=1,
+    )
+    # Sort each game's cards by a random key, with the case file cards last, which
+    # shuffles the others.
+    keys = rng.random((n_games, N_CARDS))
+    np.put_along_axis(keys, case_file_ids, 2.0, axis=1)
+    deck_ids = keys.argsort(axis=1)[:, : N_CARDS - N_CASE_FILE_CARDS]
+    n_cards_per_player = (N_CARDS - N_CASE_FILE_CARDS) // n_players
+    # Any cards left over after the players' hands are extra cards.
+    deck_locations = np.arange(N_CARDS - N_CASE_FILE_CARDS) // n_cards_per_player
+    deck_locations[deck_locations >= n_players] = n_players + 1
+    locations = np.full((n_games, N_CARDS), n_players, dtype=np.int8)
+    np.put_along_axis(
+        locations,
+        deck_ids,
+        np.broadcast_to(deck_locations, deck_ids.shape).astype(np.int8),
+        axis=1,
+    )
+    return locations
+
+
+def _guess(
+    candidates: npt.NDArray[np.bool_],
+    strategy: BaselineStrategy,
+    rng: np.random.Generator,
+) -> npt.NDArray[np.int8]:
+    """Choose a card of each rumor type for each game at random, among those that may
+    be in the case file (games × cards) for `BaselineStrategy.NAIVE`.
+    """
+    keys = rng.random(candidates.shape)
+    if strategy is BaselineStrategy.NAIVE:
+        keys[~candidates] = -1.0
+    return np.stack(
+        [
+            card_ids[keys[:, card_ids].argmax(axis=1)]
+            for card_ids in RUMOR_TYPE_CARD_IDS
+        ],
+        axis=1,
+    ).astype(np.int8)
+
+
+def _ask(
+    holds: npt.NDArray[np.bool_],
+    possible: npt.NDArray[np.bool_],
+    game_indices: npt.NDArray[np.intp],
+    guesses: npt.NDArray[np.int8],
+    answers: npt.NDArray[np.int8],
+    current_player_index: AgentIndex,
+    responder_index: AgentIndex,
+    is_asking: npt.NDArray[np.bool_],
+    rng: np.random.Generator,
+) -> npt.NDArray[np.bool_]:
+    """Ask a player to answer the guesses of the games that are still asking, record
+    their answers, and have the players learn from them.
+
+    Returns which games are still asking, i.e., in which no card has been shown.
+    """
+    has_cards = holds[game_indices[:, None], responder_index, guesses]
+    keys = rng.random(has_cards.shape)
+    keys[~has_cards] = -1.0
+    shown_cards = np.where(
+        has_cards.any(axis=1),
+        np.take_along_axis(guesses, keys.argmax(axis=1)[:, None], axis=1)[:, 0],
+        NO_CARD,
+    )
+    answers[is_asking, responder_index] = shown_cards[is_asking]
+    is_shown = is_asking & (shown_cards != NO_CARD)
+    # The current player sees where the card shown is, and everyone sees that none
+    # of the guessed cards are in the hand of a player who shows none.
+    shown_game_indices = game_indices[is_shown]
+    possible[shown_game_indices, current_player_index, shown_cards[is_shown]] = False
+    possible[
+        shown_game_indices,
+        current_player_index,
+        shown_cards[is_shown],
+        responder_index,
+    ] = True
+    is_not_shown = is_asking & ~is_shown
+    possible[
+        game_indices[is_not_shown, None], :, guesses[is_not_shown], responder_index
+    ] = False
+    return is_not_shown
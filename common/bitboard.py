@@ -0,0 +1,135 @@
+import dataclasses
+import functools
+from collections.abc import Iterable, Sequence
+
+import numpy as np
+
+from common.agent_utils import AgentIndex, get_responder_sequences
+from common.cards import RUMOR_TYPES, RUMORS, Crime, RumorCard
+
+type CardMask = int
+"""A set of cards as an integer, with bit `i` set if the card of id `i` (i.e., index in
+`RUMORS`) is in it. The deck has at most 64 cards, so masks also fit in `np.uint64`.
+"""
+
+FULL_MASK: CardMask = (1 << len(RUMORS)) - 1
+RUMOR_TYPE_MASKS: list[CardMask] = [
+    sum(1 << card.id for card in RUMORS if isinstance(card, rumor_type))
+    for rumor_type in RUMOR_TYPES
+]
+
+
+def card_mask(rumor_cards: Iterable[RumorCard]) -> CardMask:
+    mask = 0
+    for rumor_card in rumor_cards:
+        mask |= 1 << rumor_card.id
+    return mask
+
+
+def ids_mask(card_ids: Iterable[int]) -> CardMask:
+    """Get the mask of the cards of the given ids."""
+    mask = 0
+    for card_id in card_ids:
+        mask |= 1 << int(card_id)
+    return mask
+
+
+def mask_cards(mask: CardMask) -> list[RumorCard]:
+    """Get the cards of a mask, in the order of `RUMORS`."""
+    rumor_cards = []
+    while mask:
+        lowest_bit = mask & -mask
+        rumor_cards.append(RUMORS[lowest_bit.bit_length() - 1])
+        mask ^= lowest_bit
+    return rumor_cards
+
+
+@functools.cache
+def get_responder_table(
+    n_players: int,
+) -> tuple[tuple[tuple[AgentIndex, ...], tuple[AgentIndex, ...]], ...]:
+    """Get the responder sequences (see `get_responder_sequences`) of each current
+    player, computed once per number of players.
+    """
+    return tuple(
+        (tuple(first_sequence), tuple(second_sequence))
+        for first_sequence, second_sequence in (
+            get_responder_sequences(current_player_index, n_players)
+            for current_player_index in range(n_players)
+        )
+    )
+
+
+@dataclasses.dataclass(frozen=True)
+class BitboardDeal:
+    """A deal of the cards, as the mask of each player's hand, of the case file, and of
+    the extra cards.
+    """
+
+    hand_masks: tuple[CardMask, ...]
+    case_file_mask: CardMask
+    extra_cards_mask: CardMask
+
+    @classmethod
+    def deal(cls, n_players: int, rng: np.random.Generator) -> "BitboardDeal":
+        """Deal a card of each rumor type to the case file at random, then the other
+        cards evenly between the players, with any left over as extra cards.
+        """
+        case_file_mask = ids_mask(
+            rng.choice([card.id for card in mask_cards(rumor_type_mask)])
+            for rumor_type_mask in RUMOR_TYPE_MASKS
+        )
+        deck_ids = rng.permutation(
+            [card.id for card in mask_cards(FULL_MASK & ~case_file_mask)]
+        )
+        n_cards_per_player = len(deck_ids) // n_players
+        n_dealt = n_players * n_cards_per_player
+        return cls(
+            hand_masks=tuple(
+                ids_mask(deck_ids[start : start + n_cards_per_player])
+                for start in range(0, n_dealt, n_cards_per_player)
+            ),
+            case_file_mask=case_file_mask,
+            extra_cards_mask=ids_mask(deck_ids[n_dealt:]),
+        )
+
+    @property
+    def n_players(self) -> int:
+        return len(self.hand_masks)
+
+    @property
+    def crime(self) -> Crime:
+        return Crime(*mask_cards(self.case_file_mask))  # type: ignore
+
+    @property
+    def extra_cards(self) -> list[RumorCard]:
+        return mask_cards(self.extra_cards_mask)
+
+    def hand(self, player_index: AgentIndex) -> list[RumorCard]:
+        return mask_cards(self.hand_masks[player_index])
+
+    def get_answers(
+        self, current_player_index: AgentIndex, guess: Crime
+    ) -> list[tuple[AgentIndex, CardMask]]:
+        """Get the players who are asked to answer a guess, in order, each with the
+        guessed cards that they could show, if any.
+        """
+        guess_mask = card_mask(guess)
+        first_sequence, second_sequence = get_responder_table(self.n_players)[
+            current_player_index
+        ]
+        answers = self._ask_until_shown(first_sequence, guess_mask)
+        if len(answers) == len(first_sequence):
+            second_sequence = second_sequence[:-1]
+        return answers + self._ask_until_shown(second_sequence, guess_mask)
+
+    def _ask_until_shown(
+        self, responder_indices: Sequence[AgentIndex], guess_mask: CardMask
+    ) -> list[tuple[AgentIndex, CardMask]]:
+        answers = []
+        for responder_index in responder_indices:
+            shown_mask = self.hand_masks[responder_index] & guess_mask
+            answers.append((responder_index, shown_mask))
+            if shown_mask:
+                break
+        return answers
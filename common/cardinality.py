@@ -0,0 +1,33 @@
+import itertools
+from collections.abc import Sequence
+
+from pysat.card import CardEnc, EncType  # type: ignore
+from pysat.formula import IDPool  # type: ignore
+
+from common.maths import Cnf
+
+type CardinalityConstraint = tuple[tuple[int, ...], int]
+"""Literals of which exactly the given number are true."""
+
+PAIRWISE_MAX_SIZE = 12
+"""The most literals for which exactly-one is encoded pairwise.
+
+The pairwise encoding needs no auxiliary variables and propagates best, and on the
+standard deck, whose exactly-one constraints have at most nine literals, it beats the
+sequential counter, ladder, and totalizer encodings. Its quadratic size only outweighs
+that for larger constraints, e.g., with more players or larger variant decks.
+"""
+
+
+def exactly_clauses(lits: Sequence[int], bound: int, id_pool: IDPool) -> Cnf:
+    """Encode that exactly `bound` of `lits` are true, allocating any auxiliary
+    variables from `id_pool`.
+    """
+    if bound == 1 and len(lits) <= PAIRWISE_MAX_SIZE:
+        return [
+            list(lits),
+            *([-a, -b] for a, b in itertools.combinations(lits, 2)),
+        ]
+    return CardEnc.equals(  # type: ignore
+        lits=list(lits), bound=bound, vpool=id_pool, encoding=EncType.seqcounter
+    ).clauses
@@ -3,7 +3,7 @@ from __future__ import annotations
 import abc
 import dataclasses
 from collections.abc import Sequence
-from typing import NamedTuple, Self
+from typing import Any, NamedTuple, Self, cast
 
 CHARACTER_NAMES = [
     "mustard",
@@ -37,15 +37,41 @@ ROOM_NAMES = [
 ]
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(frozen=True, eq=False, slots=True)
 class RumorCard(abc.ABC):
+    """A rumor card.
+
+    Cards are interned, i.e., creating a card that already exists returns the existing
+    instance, so that cards compare and hash by identity and copying a card returns it
+    as is. Each card has a stable integer `id`, which is its index in `RUMORS`.
+    """
+
     name: str
+    id: int = dataclasses.field(init=False, repr=False)
+
+    def __new__(cls, name: str) -> Self:
+        rumor_card = _RUMOR_CARDS.get((cls, name))
+        if rumor_card is None:
+            rumor_card = object.__new__(cls)
+            # Cards are created in the order of `RUMORS` below.
+            object.__setattr__(rumor_card, "id", len(_RUMOR_CARDS))
+            _RUMOR_CARDS[(cls, name)] = rumor_card
+        return cast(Self, rumor_card)
 
     def __str__(self) -> str:
         return f"{self.__class__.__name__}: {self.name.title()}"
 
     def __hash__(self) -> int:
-        return hash(self.name)
+        return self.id
+
+    def __reduce__(self) -> tuple[type[Self], tuple[str]]:
+        return type(self), (self.name,)
+
+    def __copy__(self) -> Self:
+        return self
+
+    def __deepcopy__(self, memo: dict[int, Any]) -> Self:
+        return self
 
     @classmethod
     @abc.abstractmethod
@@ -53,19 +79,28 @@ class RumorCard(abc.ABC):
         raise NotImplementedError
 
 
+_RUMOR_CARDS: dict[tuple[type[RumorCard], str], RumorCard] = {}
+
+
 class Room(RumorCard):
+    __slots__ = ()
+
     @classmethod
     def instances(cls) -> Sequence[Room]:
         return ROOMS
 
 
 class Weapon(RumorCard):
+    __slots__ = ()
+
     @classmethod
     def instances(cls) -> Sequence[Weapon]:
         return WEAPONS
 
 
 class Character(RumorCard):
+    __slots__ = ()
+
     @classmethod
     def instances(cls) -> Sequence[Character]:
         return CHARACTERS
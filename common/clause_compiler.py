@@ -0,0 +1,68 @@
+import dataclasses
+from collections.abc import Collection, Sequence
+
+from common.agent_utils import (
+    CASE_FILE,
+    EXTRA_CARDS,
+    AgentIndex,
+    CardReveal,
+    GameLogEntry,
+    UnknownRumor,
+)
+from common.cards import RUMORS, RumorCard
+from common.maths import CardLocation, Cnf
+
+
+@dataclasses.dataclass
+class ClauseCompiler:
+    """Compiles what an agent learns straight to clauses over integer literals.
+
+    The clauses are the same as those of the `common.maths` statements that
+    `SmartBotObserver` uses as its readable reference, but without building, hashing,
+    and looking up statement objects. Literals are numbered as in
+    `common.rules_cnf.get_variables_to_lits`, and every clause is canonical, i.e., has
+    its literals sorted, so that clauses can be deduplicated as they are.
+    """
+
+    player_indices: Sequence[AgentIndex]
+
+    _lit_offsets: dict[CardLocation, int] = dataclasses.field(init=False)
+
+    def __post_init__(self) -> None:
+        locs: list[CardLocation] = [*self.player_indices, CASE_FILE, EXTRA_CARDS]
+        self._lit_offsets = {loc: i * len(RUMORS) + 1 for i, loc in enumerate(locs)}
+
+    def lit(self, rumor_card: RumorCard, location: CardLocation) -> int:
+        return self._lit_offsets[location] + rumor_card.id
+
+    def hand_clauses(
+        self, location: CardLocation, rumor_cards: Collection[RumorCard]
+    ) -> Cnf:
+        """Get the clauses stating that `location` has `rumor_cards` and only those."""
+        offset = self._lit_offsets[location]
+        return [
+            [
+                offset + rumor_card.id
+                if rumor_card in rumor_cards
+                else -(offset + rumor_card.id)
+            ]
+            for rumor_card in RUMORS
+        ]
+
+    def card_reveal_clauses(
+        self, game_log_entry: GameLogEntry, card_reveal: CardReveal
+    ) -> Cnf:
+        """Get the clauses that an agent learns from a single card reveal.
+
+        See `SmartBotObserver._card_reveal_to_boolean_statements` for the reasoning.
+        """
+        if isinstance(card_reveal.rumor_card, RumorCard):
+            return [[self.lit(card_reveal.rumor_card, card_reveal.other_player_index)]]
+        if game_log_entry.guess is None:
+            return []
+        offset = self._lit_offsets[card_reveal.other_player_index]
+        lits = sorted({offset + rumor_card.id for rumor_card in game_log_entry.guess})
+        if isinstance(card_reveal.rumor_card, UnknownRumor):
+            return [lits]
+        # card_reveal.rumor_card is None
+        return [[-lit] for lit in lits]
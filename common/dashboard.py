@@ -15,8 +15,9 @@ from common.cards import RUMORS
 from common.consts import EXTRA_CARDS
 from common.store import (
     AGENT,
-    APPROX_PROBABILITY,
     CARD_LOCATION,
+    PROBABILITY,
+    PROVEN,
     RUMOR_CARD,
     TURN_INDEX,
 )
@@ -82,23 +83,31 @@ def update_probabilities_heatmap(n: int, agent: str, turn_index: int) -> go.Figu
         df = df[df[AGENT] == agent]
         if turn_index in ["(Latest)", None]:
             turn_index = df[TURN_INDEX].iloc[-1]
-        probabilities_ser = (
+        turn_df = (
             df.set_index([AGENT, TURN_INDEX])
             .loc[agent, turn_index]
-            .set_index([CARD_LOCATION, RUMOR_CARD])[APPROX_PROBABILITY]
+            .set_index([CARD_LOCATION, RUMOR_CARD])
         )
-        probability_df = probabilities_ser.unstack()
-        title = f"Approximate Probabilities | Turn {turn_index}, Bot {agent}"
+        probability_df = turn_df[PROBABILITY].unstack()
+        proven_df = turn_df[PROVEN].astype(bool).unstack()
+        title = f"Probabilities | Turn {turn_index}, Bot {agent}"
     else:
         probability_df = pd.DataFrame(index=[CASE_FILE, EXTRA_CARDS])
+        proven_df = pd.DataFrame(index=[CASE_FILE, EXTRA_CARDS])
         title = "Start the game to see probabilities."
     probability_df = probability_df.reindex(
         columns=[str(r) for r in RUMORS], fill_value=0
     )
+    proven_df = proven_df.reindex(
+        index=probability_df.index, columns=probability_df.columns, fill_value=False
+    )
     probability_df = probability_df.rename_axis(
         index="Card Location", columns="Rumor Card"
     )
     fig = px.imshow(probability_df, range_color=(0, 1))
+    # Mark the probabilities that are known for certain.
+    fig.update_traces(text=proven_df.replace({True: "✓", False: ""}).values)
+    fig.update_traces(texttemplate="%{text}")
     fig.update_xaxes(type="category")
     fig.update_yaxes(type="category")
     fig.update_layout(title=title, font_family=FONT_FAMILY)
@@ -0,0 +1,174 @@
+from collections.abc import Iterable
+
+import numpy as np
+import numpy.typing as npt
+
+from common.deals import DealConstraints
+from common.symmetry import (
+    count_player_splits,
+    get_interchangeable_players,
+    merge_players,
+)
+
+type _Layer = dict[int, npt.NDArray[np.float64]]
+
+
+def count_deals(
+    constraints: DealConstraints,
+) -> tuple[float, npt.NDArray[np.float64]]:
+    """Count the deals that are consistent with the given constraints.
+
+    Returns the number of deals, and the number of those deals in which each card (row)
+    is in each external location (column).
+
+    Cards are placed one at a time in a dynamic program whose state is the number of
+    cards still to be placed in each internal location, together with the set of "has at
+    least one of" clauses that have been started but not yet satisfied. Counts over the
+    remaining capacities are held as dense arrays, so that placing a card is a shift
+    along one axis. Cards that appear in clauses are placed first, clause by clause, so
+    that few clauses are ever pending at once. A forward pass counts the ways to reach
+    each state and a backward pass the ways to complete it, which gives every card's
+    marginal counts at once.
+
+    Counts are floats, because they overflow 64-bit integers for some player counts.
+
+    Interchangeable players (see `get_interchangeable_players`), of whom there are many
+    early in the game, are counted as one player who holds all of their cards, which
+    shrinks the state space by orders of magnitude. Each deal of the merged players
+    stands for the same number of deals of the players, in each of which each card of
+    a merged player is equally likely to be in each of their slots.
+    """
+    player_groups = get_interchangeable_players(constraints)
+    if len(player_groups) == constraints.n_players:
+        return _count_deals(constraints)
+    n_merged_deals, merged_marginals = _count_deals(
+        merge_players(constraints, player_groups)
+    )
+    n_splits = count_player_splits(constraints, player_groups)
+    marginals = np.empty((constraints.n_cards, constraints.n_locations))
+    for merged_player, group in enumerate(player_groups):
+        n_cards = sum(constraints.capacities[player] for player in group)
+        for player in group:
+            marginals[:, player] = (
+                merged_marginals[:, merged_player]
+                * constraints.capacities[player]
+                / n_cards
+            )
+    marginals[:, constraints.n_players :] = merged_marginals[:, len(player_groups) :]
+    return n_merged_deals * n_splits, marginals * n_splits
+
+
+def _count_deals(
+    constraints: DealConstraints,
+) -> tuple[float, npt.NDArray[np.float64]]:
+    order = _get_card_order(constraints)
+    n_cards = len(order)
+    if any(len(cards) == 0 for _, cards in constraints.or_clauses):
+        return 0.0, np.zeros((n_cards, constraints.n_locations))
+    first_positions = [
+        min(order.index(card) for card in cards) for _, cards in constraints.or_clauses
+    ]
+    last_positions = [
+        max(order.index(card) for card in cards) for _, cards in constraints.or_clauses
+    ]
+    opened = [
+        _bits(k for k, p in enumerate(first_positions) if p == i)
+        for i in range(n_cards)
+    ]
+    closed = [
+        _bits(k for k, p in enumerate(last_positions) if p == i) for i in range(n_cards)
+    ]
+    satisfied = [
+        {
+            location: _bits(
+                k
+                for k, (clause_location, cards) in enumerate(constraints.or_clauses)
+                if clause_location == location and card in cards
+            )
+            for location in np.flatnonzero(constraints.allowed[card]).tolist()
+        }
+        for card in order
+    ]
+
+    def transitions(i: int, pending: int) -> list[tuple[int, int]]:
+        result: list[tuple[int, int]] = []
+        for location, satisfied_bits in satisfied[i].items():
+            new_pending = (pending | opened[i]) & ~satisfied_bits
+            if new_pending & closed[i] == 0:
+                result.append((location, new_pending))
+        return result
+
+    shape = tuple(capacity + 1 for capacity in constraints.capacities)
+    start = np.zeros(shape)
+    start[tuple(constraints.capacities)] = 1
+    forward: list[_Layer] = [{0: start}]
+    for i in range(n_cards):
+        layer: _Layer = {}
+        for pending, counts in forward[i].items():
+            for location, new_pending in transitions(i, pending):
+                new_counts = layer.setdefault(new_pending, np.zeros(shape))
+                new_counts[_lower(location)] += counts[_upper(location)]
+        forward.append(layer)
+
+    marginals = np.zeros((n_cards, constraints.n_locations))
+    end = np.zeros(shape)
+    end[(0,) * len(shape)] = 1
+    backward: _Layer = {0: end}
+    for i in reversed(range(n_cards)):
+        layer = {}
+        for pending, counts in forward[i].items():
+            completions = np.zeros(shape)
+            for location, new_pending in transitions(i, pending):
+                if new_pending not in backward:
+                    continue
+                next_completions = backward[new_pending][_lower(location)]
+                completions[_upper(location)] += next_completions
+                marginals[order[i], constraints.to_external_location(location)] += (
+                    np.vdot(counts[_upper(location)], next_completions)
+                )
+            layer[pending] = completions
+        backward = layer
+    n_deals = float(backward[0][tuple(constraints.capacities)])
+    return n_deals, marginals
+
+
+def _get_card_order(constraints: DealConstraints) -> list[int]:
+    """Order the cards so that few clauses are pending at once.
+
+    Cards in clauses are picked greedily, each time taking the card after which the
+    fewest clauses are pending. The other cards follow in their own order.
+    """
+    clauses = [set(cards) for _, cards in constraints.or_clauses]
+    unplaced = set().union(*clauses)
+    order: list[int] = []
+
+    def n_pending_after(card: int) -> int:
+        return sum(
+            1
+            for cards in clauses
+            if any(c in order or c == card for c in cards)
+            and not cards.issubset({*order, card})
+        )
+
+    while len(unplaced) > 0:
+        card = min(sorted(unplaced), key=n_pending_after)
+        order.append(card)
+        unplaced.remove(card)
+    order.extend(card for card in range(constraints.n_cards) if card not in order)
+    return order
+
+
+def _bits(indices: Iterable[int]) -> int:
+    return sum(1 << i for i in set(indices))
+
+
+def _upper(axis: int) -> tuple[slice, ...]:
+    """Index the entries of an array that have at least one card left on `axis`."""
+    return (slice(None),) * axis + (slice(1, None),)
+
+
+def _lower(axis: int) -> tuple[slice, ...]:
+    """Index the entries of an array that the `_upper` entries move to when a card is
+    placed on `axis`.
+    """
+    return (slice(None),) * axis + (slice(None, -1),)
@@ -0,0 +1,193 @@
+from concurrent.futures import Executor
+from time import perf_counter
+
+import numpy as np
+import numpy.typing as npt
+
+from common.deals import DealConstraints
+from common.symmetry import (
+    get_interchangeable_players,
+    get_merged_locations,
+    merge_players,
+    split_merged_players,
+)
+
+DEFAULT_N_SAMPLES = 2000
+N_CHAINS = 200
+N_BURN_IN_STEPS = 2000
+N_STEPS_BETWEEN_SAMPLES = 200
+
+
+def sample_deals(
+    constraints: DealConstraints,
+    start: npt.NDArray[np.intp],
+    n_samples: int = DEFAULT_N_SAMPLES,
+    max_seconds: float | None = None,
+    rng: np.random.Generator | None = None,
+    n_burn_in_steps: int = N_BURN_IN_STEPS,
+    n_steps_between_samples: int = N_STEPS_BETWEEN_SAMPLES,
+) -> npt.NDArray[np.intp]:
+    """Sample deals that are consistent with the given constraints, near-uniformly.
+
+    Deals are given as the internal location of each card, one deal per row. Sampling
+    starts from the consistent deal `start` and stops after `n_samples` deals or, if
+    given, once `max_seconds` have passed, whichever is first (but not before the
+    first batch of samples). Fewer steps make sampling faster but the samples less
+    independent of `start` and of each other.
+
+    Many Markov chains are run at once, as arrays. Each step of a chain proposes to
+    swap the locations of one or two random pairs of cards, which keeps every hand
+    size, and accepts the swap if the deal stays consistent. Since proposals are
+    symmetric, the chains converge on the uniform distribution over the consistent deals
+    that swaps can reach from `start`, which, in practice, is almost always all of them.
+
+    Interchangeable players (see `get_interchangeable_players`) are sampled as one
+    player who holds all of their cards, whose cards are then split between them at
+    random, so the chains have fewer deals to mix over.
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    player_groups = get_interchangeable_players(constraints)
+    if len(player_groups) < constraints.n_players:
+        merged_deals = sample_deals(
+            merge_players(constraints, player_groups),
+            get_merged_locations(constraints, player_groups)[start],
+            n_samples,
+            max_seconds,
+            rng,
+            n_burn_in_steps,
+            n_steps_between_samples,
+        )
+        return split_merged_players(constraints, player_groups, merged_deals, rng)
+    deadline = None if max_seconds is None else perf_counter() + max_seconds
+    n_chains = min(n_samples, N_CHAINS)
+    # The chains have an extra card, with location -1, for padding.
+    deals = np.tile(np.append(start, -1), (n_chains, 1))
+    _step(constraints, deals, n_burn_in_steps, rng)
+    samples: list[npt.NDArray[np.intp]] = []
+    n_sampled = 0
+    while n_sampled < n_samples:
+        _step(constraints, deals, n_steps_between_samples, rng)
+        samples.append(deals[: n_samples - n_sampled, :-1].copy())
+        n_sampled += len(samples[-1])
+        if deadline is not None and perf_counter() > deadline:
+            break
+    return np.concatenate(samples)
+
+
+def sample_deals_in_parallel(
+    constraints: DealConstraints,
+    start: npt.NDArray[np.intp],
+    executor: Executor,
+    n_tasks: int,
+    n_samples: int = DEFAULT_N_SAMPLES,
+    max_seconds: float | None = None,
+    rng: np.random.Generator | None = None,
+) -> npt.NDArray[np.intp]:
+    """Sample deals as in `sample_deals`, but split evenly across `n_tasks` tasks on
+    the given executor, e.g., one task per worker of a `ProcessPoolExecutor`.
+
+    Each task gets the constraints once, along with its own random generator, and
+    returns its deals as a compact array.
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    n_task_samples = [
+        n_samples // n_tasks + (task_index < n_samples % n_tasks)
+        for task_index in range(n_tasks)
+    ]
+    futures = [
+        executor.submit(
+            _sample_compact_deals, constraints, start, n, max_seconds, task_rng
+        )
+        for n, task_rng in zip(n_task_samples, rng.spawn(n_tasks), strict=True)
+        if n > 0
+    ]
+    return np.concatenate([future.result() for future in futures]).astype(np.intp)
+
+
+def _sample_compact_deals(
+    constraints: DealConstraints,
+    start: npt.NDArray[np.intp],
+    n_samples: int,
+    max_seconds: float | None,
+    rng: np.random.Generator,
+) -> npt.NDArray[np.int8]:
+    return sample_deals(constraints, start, n_samples, max_seconds, rng).astype(np.int8)
+
+
+def _step(
+    constraints: DealConstraints,
+    deals: npt.NDArray[np.intp],
+    n_steps: int,
+    rng: np.random.Generator,
+) -> None:
+    n_chains = len(deals)
+    chain_indices = np.arange(n_chains)[:, None]
+    # Cards whose location is known never move.
+    movable_cards = np.flatnonzero(constraints.allowed.sum(axis=1) > 1)
+    n_movable_cards = len(movable_cards)
+    clause_locations, clause_cards = _pad_or_clauses(constraints)
+    for step in range(n_steps):
+        # Alternate between swapping one and two pairs of cards, since some deals can
+        # only be left by moving two cards into the same hand at once.
+        n_swapped_cards = min(2 * (1 + step % 2), n_movable_cards - n_movable_cards % 2)
+        if n_swapped_cards == 0:
+            return
+        cards = movable_cards[
+            _choose_distinct(n_chains, n_movable_cards, n_swapped_cards, rng)
+        ]
+        locations = deals[chain_indices, cards]
+        # Swap the locations of the first and second cards, third and fourth cards, etc.
+        new_locations = locations[:, np.arange(n_swapped_cards) ^ 1]
+        accepted = constraints.allowed[cards, new_locations].all(axis=1)
+        proposals = deals[accepted]
+        proposals[chain_indices[: len(proposals)], cards[accepted]] = new_locations[
+            accepted
+        ]
+        if len(clause_locations) > 0:
+            # Padding cards have location -1, which no clause has.
+            consistent = (
+                (proposals[:, clause_cards] == clause_locations[:, None]).any(axis=2)
+            ).all(axis=1)
+            accepted[accepted] = consistent
+            proposals = proposals[consistent]
+        deals[accepted] = proposals
+
+
+def _choose_distinct(
+    n_rows: int, n: int, k: int, rng: np.random.Generator
+) -> npt.NDArray[np.intp]:
+    """Choose `k` distinct integers below `n` at random, in random order, for each row.
+
+    Each integer is chosen among those not yet chosen, by skipping over the chosen
+    ones in increasing order, which is much faster than sorting `n` random numbers per
+    row when `k` is small.
+    """
+    chosen = np.empty((n_rows, k), dtype=np.intp)
+    for i in range(k):
+        choice = rng.integers(n - i, size=n_rows)
+        for previous_choice in np.sort(chosen[:, :i], axis=1).T:
+            choice += choice >= previous_choice
+        chosen[:, i] = choice
+    return chosen
+
+
+def _pad_or_clauses(
+    constraints: DealConstraints,
+) -> tuple[npt.NDArray[np.intp], npt.NDArray[np.intp]]:
+    """Get the location of each "has at least one of" clause and its cards, padded to
+    equal lengths with the index of the padding card, i.e., one past the last card.
+    """
+    n_cards_per_clause = max((len(c) for _, c in constraints.or_clauses), default=0)
+    clause_locations = np.array(
+        [location for location, _ in constraints.or_clauses], dtype=np.intp
+    )
+    clause_cards = np.full(
+        (len(constraints.or_clauses), n_cards_per_clause),
+        constraints.n_cards,
+        dtype=np.intp,
+    )
+    for k, (_, cards) in enumerate(constraints.or_clauses):
+        clause_cards[k, : len(cards)] = cards
+    return clause_locations, clause_cards
@@ -0,0 +1,257 @@
+import dataclasses
+from collections.abc import Sequence
+
+import numpy as np
+import numpy.typing as npt
+
+from common.cards import RUMOR_TYPES, RUMORS
+from common.maths import Cnf
+
+N_RUMOR_TYPES = len(RUMOR_TYPES)
+CARD_TYPE_INDICES = [
+    next(i for i, rumor_type in enumerate(RUMOR_TYPES) if isinstance(card, rumor_type))
+    for card in RUMORS
+]
+
+
+@dataclasses.dataclass
+class DealConstraints:
+    """What one agent knows about how the rumor cards are dealt.
+
+    Cards are indexed as in `RUMORS` and locations as in the SAT encoding, i.e., the
+    players, then the case file, then the extra cards, so that card `i` being in location
+    `j` is variable `j * len(RUMORS) + i + 1`.
+
+    Internally, the case file is split into one slot per rumor type, so that every
+    internal location simply holds a fixed number of cards: the players hold
+    `n_cards_per_player` each, each case-file slot holds one card of its type, and the
+    extra cards hold `n_extra_cards`.
+    """
+
+    n_players: int
+    allowed: npt.NDArray[np.bool_]
+    """Whether each card (row) may be in each internal location (column)."""
+    or_clauses: list[tuple[int, tuple[int, ...]]]
+    """Internal locations that each hold at least one of the given cards."""
+    capacities: list[int]
+    """The number of cards in each internal location."""
+    is_contradictory: bool = dataclasses.field(default=False, init=False)
+    """Whether propagation has found that no deal is consistent, which it may not
+    always find.
+    """
+
+    @property
+    def n_cards(self) -> int:
+        return len(self.allowed)
+
+    @property
+    def n_locations(self) -> int:
+        """The number of external locations."""
+        return self.n_players + 2
+
+    def to_internal_location(self, card: int, location: int) -> int:
+        if location < self.n_players:
+            return location
+        if location == self.n_players:  # The case file.
+            return self.n_players + CARD_TYPE_INDICES[card]
+        return self.n_players + N_RUMOR_TYPES  # The extra cards.
+
+    def to_external_location(self, internal_location: int) -> int:
+        if internal_location < self.n_players:
+            return internal_location
+        if internal_location < self.n_players + N_RUMOR_TYPES:
+            return self.n_players
+        return self.n_players + 1
+
+    def deal_from_model(self, model: Sequence[int]) -> npt.NDArray[np.intp]:
+        """Get the deal in a model of the SAT encoding, as the internal location of each
+        card.
+        """
+        deal = np.empty(self.n_cards, dtype=np.intp)
+        for lit in model[: self.n_locations * self.n_cards]:
+            if lit > 0:
+                location, card = divmod(lit - 1, self.n_cards)
+                deal[card] = self.to_internal_location(card, location)
+        return deal
+
+    def to_external_locations(
+        self, deals: npt.NDArray[np.intp]
+    ) -> npt.NDArray[np.intp]:
+        """Get the external location of each card in each deal (row)."""
+        return np.array(
+            [self.to_external_location(i) for i in range(len(self.capacities))]
+        )[deals]
+
+    def count_locations(self, deals: npt.NDArray[np.intp]) -> npt.NDArray[np.int_]:
+        """Count the deals (rows) in which each card (row) is in each external location
+        (column).
+        """
+        external_locations = self.to_external_locations(deals)
+        return (external_locations[..., None] == np.arange(self.n_locations)).sum(
+            axis=0
+        )
+
+    @property
+    def known_locations(self) -> npt.NDArray[np.intp]:
+        """Get the internal location of each card if known, otherwise -1."""
+        is_known = self.allowed.sum(axis=1) == 1
+        return np.where(is_known, self.allowed.argmax(axis=1), -1)
+
+    def to_internal_locations(self) -> npt.NDArray[np.intp]:
+        """Get the internal location of each card (row) for each external location
+        (column).
+        """
+        internal_locations = np.tile(np.arange(self.n_locations), (self.n_cards, 1))
+        internal_locations[:, self.n_players] += CARD_TYPE_INDICES
+        internal_locations[:, self.n_players + 1] = self.n_players + N_RUMOR_TYPES
+        return internal_locations
+
+    @property
+    def external_allowed(self) -> npt.NDArray[np.bool_]:
+        """Whether each card (row) may be in each external location (column)."""
+        return np.take_along_axis(self.allowed, self.to_internal_locations(), axis=1)
+
+    @property
+    def external_known(self) -> npt.NDArray[np.bool_]:
+        """Whether each card (row) is known to be in each external location (column)."""
+        return self.known_locations[:, None] == self.to_internal_locations()
+
+    @classmethod
+    def from_clauses(
+        cls,
+        clauses: Cnf,
+        n_players: int,
+        n_cards_per_player: int,
+        n_extra_cards: int,
+    ) -> "DealConstraints":
+        """Interpret clauses of known facts (unit clauses) and "has at least one of"
+        statements (positive clauses over a single location).
+
+        The rules of the game are not read from the clauses but are built in.
+        """
+        constraints = cls.without_knowledge(
+            n_players, n_cards_per_player, n_extra_cards
+        )
+        constraints.add_clauses(clauses)
+        return constraints
+
+    @classmethod
+    def without_knowledge(
+        cls, n_players: int, n_cards_per_player: int, n_extra_cards: int
+    ) -> "DealConstraints":
+        n_cards = len(RUMORS)
+        n_internal_locations = n_players + N_RUMOR_TYPES + 1
+        allowed = np.zeros((n_cards, n_internal_locations), dtype=np.bool_)
+        allowed[:, :n_players] = True
+        allowed[np.arange(n_cards), n_players + np.array(CARD_TYPE_INDICES)] = True
+        allowed[:, -1] = n_extra_cards > 0
+        return cls(
+            n_players=n_players,
+            allowed=allowed,
+            or_clauses=[],
+            capacities=[
+                *([n_cards_per_player] * n_players),
+                *([1] * N_RUMOR_TYPES),
+                n_extra_cards,
+            ],
+        )
+
+    def add_clauses(self, clauses: Cnf) -> None:
+        """Add clauses as in `from_clauses`, then propagate."""
+        if len(clauses) == 0:
+            return
+        or_clauses = list(self.or_clauses)
+        for clause in clauses:
+            cards_and_locations = [
+                (card, self.to_internal_location(card, location))
+                for location, card in (
+                    divmod(abs(lit) - 1, self.n_cards) for lit in clause
+                )
+            ]
+            if len(clause) == 1 and clause[0] < 0:
+                card, location = cards_and_locations[0]
+                self.allowed[card, location] = False
+            elif len(clause) == 1:
+                card, location = cards_and_locations[0]
+                self.allowed[card, :location] = False
+                self.allowed[card, location + 1 :] = False
+            elif (
+                all(lit > 0 for lit in clause)
+                and len({location for _, location in cards_and_locations}) == 1
+            ):
+                or_clauses.append(
+                    (
+                        cards_and_locations[0][1],
+                        tuple(card for card, _ in cards_and_locations),
+                    )
+                )
+            else:
+                raise ValueError(f"Unsupported clause: {clause}")
+        self.or_clauses = or_clauses
+        self.propagate()
+
+    def propagate(self) -> None:
+        """Deduce what follows simply from the constraints, until nothing more does:
+
+        - A card in a known location is in no other location (this is implicit in
+          `allowed`).
+        - A location whose known cards fill it holds no other cards.
+        - A location that has only as many possible cards as it holds holds all of
+          them.
+        - A "has at least one of" clause whose other cards cannot be in its location
+          holds its last card.
+        """
+        capacities = np.array(self.capacities)
+        while True:
+            n_allowed = self.allowed.sum()
+            known_locations = self.known_locations
+            is_known = known_locations >= 0
+            known_counts = np.bincount(
+                known_locations[is_known], minlength=len(capacities)
+            )
+            is_full = known_counts == capacities
+            self.allowed[np.ix_(~is_known, is_full)] = False
+            is_tight = (self.allowed.sum(axis=0) == capacities) & (capacities > 0)
+            in_tight = self.allowed & is_tight
+            # Cards that may be in two tight locations are a contradiction, which is
+            # left for the SAT solver to find.
+            is_forced = in_tight.sum(axis=1) == 1
+            self.allowed[is_forced] = in_tight[is_forced]
+            self.or_clauses = self._simplify_or_clauses(self.or_clauses)
+            if self.allowed.sum() == n_allowed:
+                break
+        self.is_contradictory = bool(
+            (self.allowed.sum(axis=1) == 0).any()
+            or (known_counts > capacities).any()
+            or (self.allowed.sum(axis=0) < capacities).any()
+            or any(len(cards) == 0 for _, cards in self.or_clauses)
+        )
+
+    def _simplify_or_clauses(
+        self, or_clauses: Sequence[tuple[int, tuple[int, ...]]]
+    ) -> list[tuple[int, tuple[int, ...]]]:
+        """Drop the cards of each clause that cannot be in its location, and the clauses
+        that are already satisfied or duplicated. A clause that is left with one card
+        becomes a known fact, which may in turn simplify other clauses.
+
+        A clause left with no cards is kept, since it makes the deal impossible.
+        """
+        while True:
+            simplified: list[tuple[int, tuple[int, ...]]] = []
+            for location, cards in or_clauses:
+                cards = tuple(sorted(c for c in cards if self.allowed[c, location]))
+                if any(self.allowed[c].sum() == 1 for c in cards):
+                    continue
+                if (location, cards) not in simplified:
+                    simplified.append((location, cards))
+            facts = [
+                (cards[0], location)
+                for location, cards in simplified
+                if len(cards) == 1
+            ]
+            if len(facts) == 0:
+                return simplified
+            for card, location in facts:
+                self.allowed[card, :location] = False
+                self.allowed[card, location + 1 :] = False
+            or_clauses = simplified
@@ -0,0 +1,99 @@
+import dataclasses
+from collections.abc import Sequence
+
+import numpy as np
+import numpy.typing as npt
+
+from common.agent_utils import CASE_FILE, EXTRA_CARDS, AgentIndex
+from common.cards import RUMOR_TYPES, RUMORS, Crime, RumorCard
+from common.maths import CardLocation
+
+UNKNOWN = -1
+FALSE = 0
+TRUE = 1
+
+
+@dataclasses.dataclass
+class DeductionState:
+    """What an agent has proven about where each card is.
+
+    Values are held as a tri-state array over cards (rows, as in `RUMORS`) × locations
+    (columns, as in the SAT encoding, i.e., the players, then the case file, then the
+    extra cards). Knowledge only grows (unless a turn is retracted, after which the
+    agent starts a new state), so once a value is proven, it never changes, and each
+    location only needs its unknown values re-checked when the knowledge changes.
+    `SmartBotObserver.get_deduction_state` does so lazily, for the locations that are
+    queried.
+    """
+
+    player_indices: Sequence[AgentIndex]
+
+    values: npt.NDArray[np.int8] = dataclasses.field(init=False)
+    """`TRUE`, `FALSE`, or `UNKNOWN` for each card (row) in each location (column)."""
+    _knowledge_versions: npt.NDArray[np.int64] = dataclasses.field(init=False)
+    """The knowledge version with which each location is up to date, if any."""
+
+    def __post_init__(self) -> None:
+        self.values = np.full((len(RUMORS), len(self.locations)), UNKNOWN, np.int8)
+        self._knowledge_versions = np.full(len(self.locations), -1)
+
+    @property
+    def locations(self) -> list[CardLocation]:
+        return [*self.player_indices, CASE_FILE, EXTRA_CARDS]
+
+    def location_index(self, location: CardLocation) -> int:
+        return self.locations.index(location)
+
+    def get_outdated_location_indices(
+        self, locations: Sequence[CardLocation], knowledge_version: int
+    ) -> list[int]:
+        return [
+            location_index
+            for location_index in map(self.location_index, locations)
+            if self._knowledge_versions[location_index] != knowledge_version
+        ]
+
+    def update(
+        self,
+        location_indices: Sequence[int],
+        values: npt.NDArray[np.int8],
+        knowledge_version: int,
+    ) -> None:
+        """Record the values of the given locations (columns of `values`) as of the
+        given knowledge version. Values that are already proven are kept.
+        """
+        old_values = self.values[:, location_indices]
+        self.values[:, location_indices] = np.where(
+            old_values == UNKNOWN, values, old_values
+        )
+        self._knowledge_versions[location_indices] = knowledge_version
+
+    def get_value(self, rumor_card: RumorCard, location: CardLocation) -> bool | None:
+        value = self.values[rumor_card.id, self.location_index(location)]
+        return None if value == UNKNOWN else bool(value)
+
+    def get_unknown_cards(self, location: CardLocation) -> list[RumorCard]:
+        """Get the cards that may or may not be in the given location."""
+        column = self.values[:, self.location_index(location)]
+        return [RUMORS[i] for i in np.flatnonzero(column == UNKNOWN)]
+
+    def get_case_file_candidates(self) -> dict[type[RumorCard], list[RumorCard]]:
+        """Get the cards of each rumor type that may be in the case file."""
+        column = self.values[:, self.location_index(CASE_FILE)]
+        return {
+            rumor_type: [
+                rumor_card
+                for rumor_card in RUMORS
+                if isinstance(rumor_card, rumor_type) and column[rumor_card.id] != FALSE
+            ]
+            for rumor_type in RUMOR_TYPES
+        }
+
+    def is_solved(self) -> bool:
+        return bool((self.values[:, self.location_index(CASE_FILE)] != UNKNOWN).all())
+
+    def get_crime(self) -> Crime | None:
+        if not self.is_solved():
+            return None
+        column = self.values[:, self.location_index(CASE_FILE)]
+        return Crime(*[RUMORS[i] for i in np.flatnonzero(column == TRUE)])  # type: ignore
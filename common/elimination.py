@@ -0,0 +1,66 @@
+import numpy as np
+import numpy.typing as npt
+
+from common.cards import N_CASE_FILE_CARDS, RUMOR_TYPES, RUMORS
+
+RUMOR_TYPE_CARD_IDS = [
+    np.array([card.id for card in RUMORS if isinstance(card, rumor_type)])
+    for rumor_type in RUMOR_TYPES
+]
+"""The ids of the cards of each rumor type."""
+
+
+def get_case_file_candidates(
+    possible: npt.NDArray[np.bool_], n_players: int
+) -> npt.NDArray[np.bool_]:
+    """Get which cards may be in the case file.
+
+    Knowledge is given as whether each card may be in each location, i.e., arrays of
+    (any leading dimensions ×) cards × locations, with the locations in order of the
+    players, then the case file, then the extra cards.
+    """
+    return possible[..., n_players]
+
+
+def rule_out_case_file(possible: npt.NDArray[np.bool_], n_players: int) -> None:
+    """Draw what follows from the case file having exactly one card of each rumor
+    type, in place: a card that can only be in the case file rules the other cards of
+    its type out of it, and the only card of its type that can be in the case file is
+    in it.
+    """
+    for card_ids in RUMOR_TYPE_CARD_IDS:
+        type_possible = possible[..., card_ids, :]
+        candidates = type_possible[..., n_players]
+        is_in_case_file = candidates & (type_possible.sum(axis=-1) == 1)
+        candidates = np.where(
+            is_in_case_file.any(axis=-1, keepdims=True), is_in_case_file, candidates
+        )
+        is_sole_candidate = candidates & (candidates.sum(axis=-1, keepdims=True) == 1)
+        type_possible &= ~is_sole_candidate[..., None]
+        type_possible[..., n_players] = candidates
+        possible[..., card_ids, :] = type_possible
+
+
+def is_solved(possible: npt.NDArray[np.bool_], n_players: int) -> npt.NDArray[np.bool_]:
+    """Get whether only one card of each rumor type may be in the case file."""
+    return get_case_file_candidates(possible, n_players).sum(axis=-1) == len(
+        RUMOR_TYPES
+    )
+
+
+def must_see_extra_cards(
+    possible: npt.NDArray[np.bool_], n_players: int, n_extra_cards: int
+) -> npt.NDArray[np.bool_]:
+    """Get whether the extra cards are needed to go on, i.e., whether some card that
+    may be in the case file can otherwise only be an extra card, or the extra cards may
+    be all of the cards that may be in the case file but are not.
+    """
+    candidates = get_case_file_candidates(possible, n_players)
+    n_other_candidates = candidates.sum(axis=-1) - N_CASE_FILE_CARDS
+    is_case_file_or_extra_card = (
+        candidates & possible[..., n_players + 1] & ~possible[..., :n_players].any(-1)
+    )
+    return (n_extra_cards > 0) & (
+        ((0 < n_other_candidates) & (n_other_candidates <= n_extra_cards))
+        | is_case_file_or_extra_card.any(axis=-1)
+    )
@@ -0,0 +1,167 @@
+import abc
+import dataclasses
+import json
+from collections.abc import Sequence
+from pathlib import Path
+from types import TracebackType
+from typing import Any, Self, TextIO
+
+from common.agent_utils import AgentIndex, UnknownRumor
+from common.cards import Crime, RumorCard
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class TurnStarted:
+    turn_index: int
+    player_index: AgentIndex
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class GuessMade:
+    turn_index: int
+    player_index: AgentIndex
+    guess: Crime
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class CardRevealed:
+    """A player shows a card for a guess (`UnknownRumor` if only the guesser sees which
+    one), or does not (`None`).
+    """
+
+    turn_index: int
+    guesser_index: AgentIndex
+    responder_index: AgentIndex
+    rumor_card: RumorCard | UnknownRumor | None
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class CrimeSolved:
+    """Players and observers solve the crime in a turn."""
+
+    turn_index: int
+    player_indices: Sequence[AgentIndex]
+    observer_indices: Sequence[AgentIndex]
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class ExtraCardsSeen:
+    turn_index: int
+    agent_index: AgentIndex
+    rumor_cards: Sequence[RumorCard]
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class GameEnded:
+    """Every player and observer has solved the crime."""
+
+    turn_index: int
+
+
+type GameEvent = (
+    TurnStarted | GuessMade | CardRevealed | CrimeSolved | ExtraCardsSeen | GameEnded
+)
+
+
+class EventSink(abc.ABC):
+    """Where the events of a game go, e.g., to the console or to a file."""
+
+    @abc.abstractmethod
+    def emit(self, event: GameEvent) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+
+class NullEventSink(EventSink):
+    """Drop every event, for games that are played for their results alone."""
+
+    def emit(self, event: GameEvent) -> None:
+        pass
+
+
+NULL_EVENT_SINK = NullEventSink()
+
+
+class ConsoleEventSink(EventSink):
+    """Print the turns and who solves the crime when, as the simulator always has."""
+
+    def emit(self, event: GameEvent) -> None:
+        match event:
+            case TurnStarted():
+                print(f"Turn: {event.turn_index}.")
+            case CrimeSolved():
+                if len(event.player_indices) > 0:
+                    print(
+                        "The following players have solved the crime in the last "
+                        f"turn: {list(event.player_indices)}"
+                    )
+                if len(event.observer_indices) > 0:
+                    print(
+                        "The following observers have solved the crime in the last "
+                        f"turn: {list(event.observer_indices)}"
+                    )
+            case GameEnded():
+                print("By now, all players and observers have solved the crime.")
+
+
+class JsonlEventSink(EventSink):
+    """Write each event as a line of JSON to a file, `buffer_size` events at a time.
+
+    Cards are written by name, a card that is shown but unseen as `"unknown"`, and a
+    card that is not shown as `null`.
+    """
+
+    def __init__(self, path: Path, buffer_size: int = 1000) -> None:
+        self.buffer_size = buffer_size
+        self._file: TextIO = path.open("w")
+        self._buffer: list[str] = []
+
+    def emit(self, event: GameEvent) -> None:
+        self._buffer.append(json.dumps(event_to_dict(event)))
+        if len(self._buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if len(self._buffer) > 0:
+            self._file.write("\n".join(self._buffer) + "\n")
+            self._buffer.clear()
+        self._file.flush()
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+
+def event_to_dict(event: GameEvent) -> dict[str, Any]:
+    """Get an event as JSON-serializable data, with its type as `"event"`."""
+    return {
+        "event": type(event).__name__,
+        **{
+            field.name: _to_json_value(getattr(event, field.name))
+            for field in dataclasses.fields(event)
+        },
+    }
+
+
+def _to_json_value(value: Any) -> Any:
+    if isinstance(value, RumorCard):
+        return value.name
+    if isinstance(value, UnknownRumor):
+        return "unknown"
+    if isinstance(value, list | tuple):
+        return [_to_json_value(item) for item in value]
+    return value
@@ -0,0 +1,174 @@
+import dataclasses
+import json
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import Any
+
+from common.agent_utils import (
+    AgentIndex,
+    BasePlayer,
+    CardReveal,
+    GameLogEntry,
+    UnknownRumor,
+)
+from common.bitboard import BitboardDeal, card_mask, ids_mask
+from common.cards import RUMORS, Crime, RumorCard
+from common.consts import EXTRA_CARDS
+
+GAME_RECORD_FORMAT = "cluedo-game-record/1"
+
+
+@dataclasses.dataclass(frozen=True)
+class TurnRecord:
+    guess: Crime
+    card_reveals: list[tuple[AgentIndex, RumorCard | None]]
+    """The players asked to answer the guess, in order, each with the card they showed
+    the current player, if any.
+    """
+
+
+@dataclasses.dataclass(frozen=True)
+class GameRecord:
+    """What happened in a game, i.e., the deal and, for each turn (from turn 1), the
+    guess of the current player and the answers to it, from which any agent's game log
+    can be replayed.
+
+    When the extra cards are seen is not recorded, since it depends on the agents.
+    """
+
+    deal: BitboardDeal
+    turns: list[TurnRecord]
+    seed: int | None = None
+    """The seed of the game in the simulator, if known."""
+
+    @property
+    def n_players(self) -> int:
+        return self.deal.n_players
+
+    @classmethod
+    def from_players(
+        cls,
+        deal: BitboardDeal,
+        players: dict[AgentIndex, BasePlayer],
+        seed: int | None = None,
+    ) -> "GameRecord":
+        """Record a game from the game logs of its players, each of whom sees the cards
+        shown in their own turns.
+        """
+        n_turns = len(next(iter(players.values())).game_log) - 1
+        turns = []
+        for turn_index in range(1, n_turns + 1):
+            game_log_entry = players[(turn_index - 1) % len(players)].game_log[
+                turn_index
+            ]
+            assert game_log_entry.guess is not None
+            turns.append(
+                TurnRecord(
+                    game_log_entry.guess,
+                    [
+                        (card_reveal.other_player_index, card_reveal.rumor_card)
+                        for card_reveal in game_log_entry.card_reveals
+                        if card_reveal.other_player_index != EXTRA_CARDS
+                        and not isinstance(card_reveal.rumor_card, UnknownRumor)
+                    ],  # type: ignore
+                )
+            )
+        return cls(deal, turns, seed)
+
+    def get_game_log(self, agent_index: AgentIndex | None = None) -> list[GameLogEntry]:
+        """Get the game log of the game as a player would have seen it, or as an
+        observer would have if no player is given, without the extra cards.
+        """
+        game_log = [GameLogEntry(turn_index=0)]
+        for turn_index, turn in enumerate(self.turns, start=1):
+            is_current_player = agent_index == (turn_index - 1) % self.n_players
+            game_log_entry = GameLogEntry(turn_index, turn.guess)
+            game_log_entry.card_reveals = [
+                CardReveal(
+                    player_index,
+                    rumor_card
+                    if rumor_card is None or is_current_player
+                    else UnknownRumor(),
+                )
+                for player_index, rumor_card in turn.card_reveals
+                # Players do not see their own answers in their game logs.
+                if player_index != agent_index
+            ]
+            game_log.append(game_log_entry)
+        return game_log
+
+    def to_json(self) -> dict[str, Any]:
+        """Get the record as compact JSON data, with cards as their ids."""
+        return {
+            "format": GAME_RECORD_FORMAT,
+            "seed": self.seed,
+            "hands": [
+                [card.id for card in self.deal.hand(player_index)]
+                for player_index in range(self.n_players)
+            ],
+            "case_file": [card.id for card in self.deal.crime],
+            "extra_cards": [card.id for card in self.deal.extra_cards],
+            "turns": [
+                [
+                    [card.id for card in turn.guess],
+                    [
+                        [player_index, None if rumor_card is None else rumor_card.id]
+                        for player_index, rumor_card in turn.card_reveals
+                    ],
+                ]
+                for turn in self.turns
+            ],
+        }
+
+    @classmethod
+    def from_json(cls, data: dict[str, Any]) -> "GameRecord":
+        if data.get("format") != GAME_RECORD_FORMAT:
+            raise ValueError(f"Not a game record: {data.get('format')!r}")
+        return cls(
+            deal=BitboardDeal(
+                hand_masks=tuple(ids_mask(hand) for hand in data["hands"]),
+                case_file_mask=ids_mask(data["case_file"]),
+                extra_cards_mask=ids_mask(data["extra_cards"]),
+            ),
+            turns=[
+                TurnRecord(
+                    Crime(*(RUMORS[card_id] for card_id in guess)),  # type: ignore
+                    [
+                        (player_index, None if card_id is None else RUMORS[card_id])
+                        for player_index, card_id in card_reveals
+                    ],
+                )
+                for guess, card_reveals in data["turns"]
+            ],
+            seed=data["seed"],
+        )
+
+    def check(self) -> None:
+        """Check that the recorded answers agree with the deal."""
+        for turn_index, turn in enumerate(self.turns, start=1):
+            guess_mask = card_mask(turn.guess)
+            for player_index, rumor_card in turn.card_reveals:
+                shown_mask = self.deal.hand_masks[player_index] & guess_mask
+                if rumor_card is None:
+                    is_valid = shown_mask == 0
+                else:
+                    is_valid = shown_mask & card_mask([rumor_card]) != 0
+                if not is_valid:
+                    raise ValueError(
+                        f"Turn {turn_index}: player {player_index} cannot show "
+                        f"{rumor_card} for {turn.guess}"
+                    )
+
+
+def write_game_records(path: Path, game_records: Iterable[GameRecord]) -> None:
+    """Write game records as lines of JSON, one game per line."""
+    with path.open("w") as file:
+        for game_record in game_records:
+            file.write(json.dumps(game_record.to_json(), separators=(",", ":")) + "\n")
+
+
+def read_game_records(path: Path) -> Iterator[GameRecord]:
+    with path.open() as file:
+        for line in file:
+            if line.strip():
+                yield GameRecord.from_json(json.loads(line))
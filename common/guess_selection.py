@@ -0,0 +1,142 @@
+from collections.abc import Sequence
+
+import numpy as np
+import numpy.typing as npt
+
+from common.agent_utils import AgentIndex, get_responder_sequences
+from common.cards import Crime
+from common.deals import N_RUMOR_TYPES, DealConstraints
+from common.utils import permutations
+
+N_GUESS_SAMPLES = 100
+"""The number of sampled deals over which guesses are scored."""
+N_GUESS_SAMPLING_STEPS = 100
+"""The number of steps for which each chain is run to sample deals for guessing, far
+fewer than for estimating probabilities, since guesses need only be good rather than
+exactly the best.
+"""
+
+
+def choose_guess_by_information_gain(
+    constraints: DealConstraints,
+    deals: npt.NDArray[np.intp],
+    guesses: Sequence[Crime],
+    guesser_index: AgentIndex,
+    rng: np.random.Generator | None = None,
+) -> Crime:
+    """Choose the guess that is expected to tell the guesser the most about the case
+    file, i.e., after which the case file is expected to have the least entropy. Ties
+    are broken at random.
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    entropies = expected_case_file_entropies(
+        constraints, deals, guesses, guesser_index, rng
+    )
+    best_guess_indices = np.flatnonzero(np.isclose(entropies, entropies.min()))
+    return guesses[rng.choice(best_guess_indices)]
+
+
+def expected_case_file_entropies(
+    constraints: DealConstraints,
+    deals: npt.NDArray[np.intp],
+    guesses: Sequence[Crime],
+    guesser_index: AgentIndex,
+    rng: np.random.Generator,
+) -> npt.NDArray[np.float64]:
+    """Get the expected entropy (in bits) of the case file after each guess, given the
+    card reveals that the guesser would see, taking the consistent deals to be those
+    sampled.
+
+    Deals are given as the internal location of each card, one deal per row. The other
+    players are asked in the order of `get_responder_sequences`, and each player who
+    shows a card is taken to show any of the guessed cards that they have at random.
+
+    Every deal is scored against every guess at once, as arrays of deals × guesses ×
+    rumor types.
+    """
+    n_deals = len(deals)
+    guess_cards = np.array(
+        [[rumor_card.id for rumor_card in guess] for guess in guesses], dtype=np.intp
+    ).T
+    external_locations = constraints.to_external_locations(deals)
+    # Which card a player shows is drawn once per deal rather than once per guess,
+    # which is as random for any one guess, as a random order of preference of the
+    # rumor types. The cards of each guess are then given values that order them by
+    # when they would be shown, i.e., by the position of the player who has them, then
+    # by that player's preference, and that also tell the rumor type.
+    preferences = permutations(N_RUMOR_TYPES, n_deals, rng).astype(np.int16)
+    card_tie_breaks = preferences * N_RUMOR_TYPES + np.arange(
+        N_RUMOR_TYPES, dtype=np.int16
+    )
+    n_tie_breaks = N_RUMOR_TYPES**2
+    # Whether the furthest player of the next sequence is not asked, which is the case
+    # if the previous sequence got as far as its own furthest player.
+    skips_furthest = np.zeros((n_deals, len(guesses)), dtype=np.bool_)
+    outcomes = np.zeros((n_deals, len(guesses)), dtype=np.int64)
+    n_outcomes = 1
+    for responder_indices in get_responder_sequences(
+        guesser_index, constraints.n_players
+    ):
+        n_responders = len(responder_indices)
+        location_values = np.full(constraints.n_locations, n_responders, dtype=np.int16)
+        location_values[responder_indices] = np.arange(n_responders)
+        location_values *= n_tie_breaks
+        shown_values = (
+            location_values[external_locations][:, guess_cards]
+            + card_tie_breaks[:, :, None]
+        ).min(axis=1)
+        # The outcome of each value is the position of the player who shows a card and
+        # the card's rumor type, or that no player shows a card, first if every player
+        # is asked, then if the furthest player is not.
+        values = np.arange((n_responders + 1) * n_tie_breaks)
+        is_asked = values < n_responders * n_tie_breaks
+        is_furthest = is_asked & (values >= (n_responders - 1) * n_tie_breaks)
+        n_sequence_outcomes = n_responders * N_RUMOR_TYPES + 1
+        value_outcomes = np.where(
+            is_asked,
+            values // n_tie_breaks * N_RUMOR_TYPES + values % N_RUMOR_TYPES,
+            n_sequence_outcomes - 1,
+        )
+        value_outcomes = np.concatenate(
+            [
+                value_outcomes,
+                np.where(is_furthest, n_sequence_outcomes - 1, value_outcomes),
+            ]
+        )
+        outcomes = (
+            outcomes * n_sequence_outcomes
+            + value_outcomes[shown_values + skips_furthest * len(values)]
+        )
+        n_outcomes *= n_sequence_outcomes
+        skips_furthest = shown_values >= (n_responders - 1) * n_tie_breaks
+    case_files = np.stack(
+        [
+            (deals == constraints.n_players + rumor_type_index).argmax(axis=1)
+            for rumor_type_index in range(N_RUMOR_TYPES)
+        ],
+        axis=1,
+    )
+    _, case_file_indices = np.unique(case_files, axis=0, return_inverse=True)
+    case_file_indices = case_file_indices.reshape(n_deals)
+    n_case_files = case_file_indices.max() + 1
+    # H(case file | outcome) = H(case file, outcome) - H(outcome), in terms of counts.
+    joint_keys, joint_counts = np.unique(
+        (np.arange(len(guesses)) * n_outcomes + outcomes) * n_case_files
+        + case_file_indices[:, None],
+        return_counts=True,
+    )
+    # The joint keys are sorted, so those of each outcome of each guess are together.
+    outcome_keys = joint_keys // n_case_files
+    outcome_starts = np.flatnonzero(np.diff(outcome_keys, prepend=-1))
+    outcome_counts = np.add.reduceat(joint_counts, outcome_starts)
+    entropies = np.bincount(
+        outcome_keys[outcome_starts] // n_outcomes,
+        weights=outcome_counts * np.log2(outcome_counts),
+        minlength=len(guesses),
+    ) - np.bincount(
+        joint_keys // (n_outcomes * n_case_files),
+        weights=joint_counts * np.log2(joint_counts),
+        minlength=len(guesses),
+    )
+    return entropies / n_deals
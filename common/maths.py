@@ -4,6 +4,7 @@ import abc
 import dataclasses
 import itertools
 from collections.abc import Sequence
+from typing import Any, Self
 
 from common.agent_utils import AgentIndex, CaseFile
 from common.cards import RumorCard
@@ -14,6 +15,8 @@ type CardLocation = AgentIndex | CaseFile | ExtraCards
 
 
 class BooleanStatement(abc.ABC):
+    __slots__ = ()
+
     @abc.abstractmethod
     def __str__(self) -> str:
         raise NotImplementedError
@@ -27,25 +30,48 @@ class BooleanStatement(abc.ABC):
         raise NotImplementedError
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(frozen=True, eq=False, slots=True)
 class CardIsInLocation(BooleanStatement):
     """A boolean variable representing whether the given `rumor_card` is in the given
     `location`.
+
+    Like rumor cards, variables are interned, with their hash computed once.
     """
 
     rumor_card: RumorCard
     location: CardLocation
+    _hash: int = dataclasses.field(init=False, repr=False)
+
+    def __new__(cls, rumor_card: RumorCard, location: CardLocation) -> Self:
+        var = _VARIABLES.get((rumor_card, location))
+        if var is None:
+            var = object.__new__(cls)
+            object.__setattr__(var, "_hash", hash((location, rumor_card)))
+            _VARIABLES[(rumor_card, location)] = var
+        return var
 
     def __str__(self) -> str:
         return f"player {self.location} has {self.rumor_card.name} card"
 
     def __hash__(self) -> int:
-        return hash((self.location, self.rumor_card, type(self).__name__))
+        return self._hash
+
+    def __reduce__(self) -> tuple[type[Self], tuple[RumorCard, CardLocation]]:
+        return type(self), (self.rumor_card, self.location)
+
+    def __copy__(self) -> Self:
+        return self
+
+    def __deepcopy__(self, memo: dict[int, Any]) -> Self:
+        return self
 
     def to_cnf(self, variables_to_lits: dict[CardIsInLocation, int]) -> Cnf:
         return [[variables_to_lits[self]]]
 
 
+_VARIABLES: dict[tuple[RumorCard, CardLocation], CardIsInLocation] = {}
+
+
 @dataclasses.dataclass
 class Not(BooleanStatement):
     operand: CardIsInLocation
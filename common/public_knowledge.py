@@ -0,0 +1,122 @@
+import dataclasses
+from collections.abc import Sequence
+
+from common.agent_utils import AgentIndex
+from common.maths import Cnf
+from common.rules_cnf import get_rules_cnf
+from common.sat_backends import SatBackendSetting, resolve_sat_backend
+from common.sat_solver import DEFAULT_SAT_BACKEND, IncrementalSolver
+
+
+@dataclasses.dataclass
+class PublicKnowledge:
+    """What every agent at a table knows, i.e., the rules of the game and the public
+    card reveals (who showed or did not show a card for which guess), encoded once in
+    one solver that the agents share.
+
+    Each agent adds its private knowledge (its own hand and the cards shown to it),
+    which is all unit clauses, as assumptions when solving, so that the agents never
+    encode or solve the same public clauses separately, and share what the solver
+    learns from them.
+
+    The clauses of each turn are guarded by an activation literal of the turn, which is
+    also assumed when solving, so that a turn can be retracted without rebuilding the
+    solver.
+    """
+
+    player_indices: Sequence[AgentIndex]
+    n_cards_per_player: int
+    n_extra_cards: int
+    sat_backend: SatBackendSetting = DEFAULT_SAT_BACKEND
+
+    solver: IncrementalSolver = dataclasses.field(init=False)
+    clauses: Cnf = dataclasses.field(init=False)
+    """The clauses of the public card reveals so far that are unique within their
+    turns, in the order added.
+    """
+    clause_turn_indices: list[int] = dataclasses.field(init=False)
+    """The turn of each of `clauses`."""
+    n_retractions: int = dataclasses.field(init=False)
+    """The number of times that the clauses of a turn have been retracted."""
+    _rules_clause_set: set[tuple[int, ...]] = dataclasses.field(init=False)
+    _clause_set: set[tuple[int, tuple[int, ...]]] = dataclasses.field(init=False)
+    _activation_lits: dict[int, int] = dataclasses.field(init=False)
+    """The activation literal of each turn with clauses."""
+
+    def __post_init__(self) -> None:
+        rules = get_rules_cnf(
+            len(self.player_indices), self.n_cards_per_player, self.n_extra_cards
+        )
+        self.solver = IncrementalSolver(
+            n_vars=rules.n_lits,
+            name=resolve_sat_backend(
+                self.sat_backend,
+                len(self.player_indices),
+                self.n_cards_per_player,
+                self.n_extra_cards,
+            ),
+        )
+        self.clauses = []
+        self.clause_turn_indices = []
+        self.n_retractions = 0
+        self._rules_clause_set = set(rules.add_to(self.solver))
+        self._clause_set = set()
+        self._activation_lits = {}
+
+    @property
+    def assumptions(self) -> list[int]:
+        """The activation literals of the turns that have clauses."""
+        return list(self._activation_lits.values())
+
+    def get_turn_index(self, activation_lit: int) -> int | None:
+        """Get the turn of the given activation literal, if it is one."""
+        return next(
+            (
+                turn_index
+                for turn_index, lit in self._activation_lits.items()
+                if lit == activation_lit
+            ),
+            None,
+        )
+
+    def add_clauses(self, clauses: Cnf, turn_index: int) -> None:
+        """Add the given canonical clauses (see `ClauseCompiler`) of the given turn that
+        are new to it.
+        """
+        new_clauses: Cnf = []
+        for clause in clauses:
+            key = (turn_index, tuple(clause))
+            if key in self._clause_set or key[1] in self._rules_clause_set:
+                continue
+            self._clause_set.add(key)
+            new_clauses.append(clause)
+        if len(new_clauses) == 0:
+            return
+        if turn_index not in self._activation_lits:
+            self._activation_lits[turn_index] = self.solver.new_var()
+        activation_lit = self._activation_lits[turn_index]
+        self.clauses.extend(new_clauses)
+        self.clause_turn_indices.extend([turn_index] * len(new_clauses))
+        self.solver.add_clauses([[*clause, -activation_lit] for clause in new_clauses])
+
+    def retract(self, turn_index: int) -> None:
+        """Forget the clauses of the given turn, for every agent that shares this.
+
+        The activation literal of the turn is retired, which satisfies its clauses for
+        good, and any later clauses of the turn get a new one.
+        """
+        activation_lit = self._activation_lits.pop(turn_index, None)
+        if activation_lit is None:
+            return
+        self.solver.add_clauses([[-activation_lit]])
+        kept = [
+            (clause, clause_turn_index)
+            for clause, clause_turn_index in zip(
+                self.clauses, self.clause_turn_indices, strict=True
+            )
+            if clause_turn_index != turn_index
+        ]
+        self.clauses = [clause for clause, _ in kept]
+        self.clause_turn_indices = [clause_turn_index for _, clause_turn_index in kept]
+        self._clause_set = {key for key in self._clause_set if key[0] != turn_index}
+        self.n_retractions += 1
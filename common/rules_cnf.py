@@ -0,0 +1,185 @@
+import dataclasses
+import functools
+import hashlib
+import json
+import os
+from collections.abc import Sequence
+from pathlib import Path
+from typing import cast
+
+from pysat.formula import IDPool  # type: ignore
+
+from common.agent_utils import CASE_FILE, EXTRA_CARDS, AgentIndex
+from common.cardinality import CardinalityConstraint, exactly_clauses
+from common.cards import CHARACTERS, ROOMS, RUMORS, WEAPONS
+from common.maths import CardIsInLocation, CardLocation, Xor
+from common.sat_solver import IncrementalSolver
+
+RULES_CACHE_DIR_ENV_VAR = "CLUEDO_RULES_CACHE_DIR"
+"""If set, compiled rules are also saved to and loaded from files in this directory."""
+
+_CACHE_FILE_VERSION = 2
+_DECK_HASH = hashlib.sha256(
+    "\n".join(f"{type(card).__name__}: {card.name}" for card in RUMORS).encode()
+).hexdigest()[:16]
+
+
+@dataclasses.dataclass(frozen=True)
+class RulesCnf:
+    """The rules of the game alone, for a given table.
+
+    Every rule is a cardinality constraint. Solvers with native cardinality constraints
+    take `constraints` as they are; other solvers take the equivalent `clauses`.
+
+    Variables are numbered by position, as in `get_variables_to_lits`, so the same
+    rules serve every agent at a table with the same number of players, whatever their
+    indices.
+    """
+
+    constraints: tuple[CardinalityConstraint, ...]
+    clauses: tuple[tuple[int, ...], ...]
+    """Unique clauses, each with its literals sorted."""
+    n_lits: int
+    """The highest variable index in use by `clauses`, including auxiliary variables."""
+
+    def add_to(self, solver: IncrementalSolver) -> tuple[tuple[int, ...], ...]:
+        """Add the rules to the given solver, natively if it supports cardinality
+        constraints. Returns the clauses that were added, if any.
+        """
+        if solver.supports_cardinality_constraints:
+            for lits, bound in self.constraints:
+                solver.add_exactly(lits, bound)
+            return ()
+        solver.add_clauses(self.clauses)  # type: ignore
+        return self.clauses
+
+
+def get_rules_cnf(
+    n_players: int, n_cards_per_player: int, n_extra_cards: int
+) -> RulesCnf:
+    """Get the compiled rules for a table, building them only once per process (and
+    only once per cache directory, if `RULES_CACHE_DIR_ENV_VAR` is set).
+    """
+    return _get_rules_cnf(n_players, n_cards_per_player, n_extra_cards)
+
+
+@functools.cache
+def _get_rules_cnf(
+    n_players: int, n_cards_per_player: int, n_extra_cards: int
+) -> RulesCnf:
+    cache_dir = os.environ.get(RULES_CACHE_DIR_ENV_VAR)
+    if not cache_dir:
+        return build_rules_cnf(n_players, n_cards_per_player, n_extra_cards)
+    return _load_or_build_rules_cnf(
+        Path(cache_dir), n_players, n_cards_per_player, n_extra_cards
+    )
+
+
+def _load_or_build_rules_cnf(
+    cache_dir: Path, n_players: int, n_cards_per_player: int, n_extra_cards: int
+) -> RulesCnf:
+    path = cache_dir / (
+        f"rules-v{_CACHE_FILE_VERSION}-{n_players}-{n_cards_per_player}"
+        f"-{n_extra_cards}-{_DECK_HASH}.json"
+    )
+    try:
+        data = json.loads(path.read_text())
+        return RulesCnf(
+            constraints=tuple(
+                (tuple(lits), bound) for lits, bound in data["constraints"]
+            ),
+            clauses=tuple(tuple(clause) for clause in data["clauses"]),
+            n_lits=data["n_lits"],
+        )
+    except (OSError, ValueError, KeyError, TypeError):
+        pass  # Missing or unreadable, so (re)build it.
+    rules = build_rules_cnf(n_players, n_cards_per_player, n_extra_cards)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    # Write to a temporary file first, so that concurrent processes never read a
+    # partial file.
+    temp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    temp_path.write_text(
+        json.dumps(
+            {
+                "constraints": rules.constraints,
+                "clauses": rules.clauses,
+                "n_lits": rules.n_lits,
+            }
+        )
+    )
+    temp_path.replace(path)
+    return rules
+
+
+def build_rules_cnf(
+    n_players: int, n_cards_per_player: int, n_extra_cards: int
+) -> RulesCnf:
+    player_indices = list(range(n_players))
+    variables_to_lits = get_variables_to_lits(player_indices)
+    constraints: list[CardinalityConstraint] = [
+        (tuple(variables_to_lits[var] for var in statement.operands), 1)
+        for statement in rules_boolean_statements(player_indices)
+    ]
+    # The number of extra cards is implied by the other rules, but stating it spares
+    # the solver from re-deriving it by counting cards whenever that matters.
+    hand_sizes: dict[CardLocation, int] = {
+        **{player_index: n_cards_per_player for player_index in player_indices},
+        EXTRA_CARDS: n_extra_cards,
+    }
+    for location, hand_size in hand_sizes.items():
+        constraints.append(
+            (
+                tuple(
+                    i for v, i in variables_to_lits.items() if v.location == location
+                ),
+                hand_size,
+            )
+        )
+    id_pool = IDPool(start_from=1, occupied=[[1, len(variables_to_lits)]])
+    clauses = [
+        clause
+        for lits, bound in constraints
+        for clause in exactly_clauses(lits, bound, id_pool)
+    ]
+    return RulesCnf(
+        constraints=tuple(constraints),
+        clauses=tuple(dict.fromkeys(tuple(sorted(clause)) for clause in clauses)),
+        n_lits=cast(int, id_pool.top),  # type: ignore
+    )
+
+
+def get_variables_to_lits(
+    player_indices: Sequence[AgentIndex],
+) -> dict[CardIsInLocation, int]:
+    locs: list[CardLocation] = [*player_indices, CASE_FILE, EXTRA_CARDS]
+    all_variables = [
+        CardIsInLocation(rumor_card, loc) for loc in locs for rumor_card in RUMORS
+    ]
+    return {var: i + 1 for i, var in enumerate(all_variables)}
+
+
+def rules_boolean_statements(player_indices: Sequence[AgentIndex]) -> list[Xor]:
+    """Get the statements that follow from the rules of the game, other than the number
+    of cards in each location.
+    """
+    statements: list[Xor] = []
+
+    # General knowledge of the game:
+
+    # The case file contains exactly one character, weapon, and room.
+    for rumor_cards in (CHARACTERS, WEAPONS, ROOMS):
+        statements.append(
+            Xor([CardIsInLocation(rumor_card, CASE_FILE) for rumor_card in rumor_cards])
+        )
+
+    # Each rumor card is owned by exactly one of the players including the case file
+    # and extra cards.
+    locs: list[CardLocation] = [*player_indices, CASE_FILE, EXTRA_CARDS]
+    for rumor_card in RUMORS:
+        statements.append(
+            Xor(
+                [CardIsInLocation(rumor_card, loc) for loc in locs],
+            )
+        )
+
+    return statements
@@ -0,0 +1,169 @@
+import functools
+import json
+import os
+from pathlib import Path
+from time import perf_counter
+from typing import Literal
+
+import numpy as np
+import pysat  # type: ignore
+from pysat.solvers import NoSuchSolverError  # type: ignore
+
+from common.agent_utils import CASE_FILE, CardReveal, GameLogEntry, UnknownRumor
+from common.backbone import compute_backbone
+from common.cards import CHARACTERS, ROOMS, RUMORS, WEAPONS, Crime
+from common.clause_compiler import ClauseCompiler
+from common.maths import Cnf
+from common.rules_cnf import get_rules_cnf
+from common.sat_solver import SAT_BACKENDS, IncrementalSolver, SatBackend
+
+type SatBackendSetting = SatBackend | Literal["auto"]
+AUTO: Literal["auto"] = "auto"
+"""Pick the backend that is fastest on benchmark instances for the table."""
+
+SAT_BACKEND_CACHE_DIR_ENV_VAR = "CLUEDO_SAT_BACKEND_CACHE_DIR"
+"""If set, the backends picked by `AUTO` are also saved to and loaded from files in
+this directory.
+"""
+
+N_BENCHMARK_INSTANCES = 2
+N_BENCHMARK_TURNS = 15
+N_BENCHMARK_REPEATS = 2
+
+
+def resolve_sat_backend(
+    sat_backend: SatBackendSetting,
+    n_players: int,
+    n_cards_per_player: int,
+    n_extra_cards: int,
+) -> SatBackend:
+    if sat_backend != AUTO:
+        return sat_backend
+    return _select_sat_backend(n_players, n_cards_per_player, n_extra_cards)
+
+
+@functools.cache
+def _select_sat_backend(
+    n_players: int, n_cards_per_player: int, n_extra_cards: int
+) -> SatBackend:
+    cache_dir = os.environ.get(SAT_BACKEND_CACHE_DIR_ENV_VAR)
+    path = (
+        None
+        if not cache_dir
+        else Path(cache_dir)
+        / f"sat-backend-{n_players}-{n_cards_per_player}-{n_extra_cards}.json"
+    )
+    if path is not None:
+        try:
+            data = json.loads(path.read_text())
+            if (
+                data["pysat_version"] == pysat.__version__
+                and data["sat_backend"] in SAT_BACKENDS
+            ):
+                return data["sat_backend"]
+        except (OSError, ValueError, KeyError, TypeError):
+            pass  # Missing or unreadable, so benchmark again.
+    seconds = benchmark_sat_backends(n_players, n_cards_per_player, n_extra_cards)
+    sat_backend = min(seconds, key=seconds.__getitem__)
+    if path is not None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        temp_path.write_text(
+            json.dumps(
+                {
+                    "pysat_version": pysat.__version__,
+                    "sat_backend": sat_backend,
+                    "seconds": seconds,
+                }
+            )
+        )
+        temp_path.replace(path)
+    return sat_backend
+
+
+def benchmark_sat_backends(
+    n_players: int,
+    n_cards_per_player: int,
+    n_extra_cards: int,
+    sat_backends: tuple[SatBackend, ...] = SAT_BACKENDS,
+) -> dict[SatBackend, float]:
+    """Time each backend on the same representative instances, i.e., the knowledge of
+    a player over the first turns of random games, re-solving the case file after each
+    turn as agents do.
+
+    Returns the best time in seconds of each backend that is available.
+    """
+    player_indices = list(range(n_players))
+    rules = get_rules_cnf(n_players, n_cards_per_player, n_extra_cards)
+    compiler = ClauseCompiler(player_indices)
+    case_file_lits = [compiler.lit(rumor_card, CASE_FILE) for rumor_card in RUMORS]
+    rng = np.random.default_rng(0)
+    instances = [
+        _make_benchmark_instance(compiler, n_players, n_cards_per_player, rng)
+        for _ in range(N_BENCHMARK_INSTANCES)
+    ]
+    seconds: dict[SatBackend, float] = {}
+    for sat_backend in sat_backends:
+        try:
+            for _ in range(N_BENCHMARK_REPEATS):
+                start = perf_counter()
+                for turns in instances:
+                    solver = IncrementalSolver(n_vars=rules.n_lits, name=sat_backend)
+                    rules.add_to(solver)
+                    for clauses in turns:
+                        solver.add_clauses(clauses)
+                        solver.solve()
+                        compute_backbone(solver, case_file_lits)
+                    solver.delete()
+                elapsed = perf_counter() - start
+                seconds[sat_backend] = min(seconds.get(sat_backend, elapsed), elapsed)
+        except (NoSuchSolverError, NotImplementedError):
+            continue  # Not available in this build of pysat.
+    return seconds
+
+
+def _make_benchmark_instance(
+    compiler: ClauseCompiler,
+    n_players: int,
+    n_cards_per_player: int,
+    rng: np.random.Generator,
+) -> list[Cnf]:
+    """Deal a random game and get the clauses that player 0 learns in each turn, in
+    which the current player asks the others in order until one shows a card.
+    """
+    deck = [RUMORS[i] for i in rng.permutation(len(RUMORS))]
+    crime_cards = {
+        next(c for c in deck if c in rumor_cards)
+        for rumor_cards in (CHARACTERS, WEAPONS, ROOMS)
+    }
+    deck = [rumor_card for rumor_card in deck if rumor_card not in crime_cards]
+    hands = [
+        deck[i * n_cards_per_player : (i + 1) * n_cards_per_player]
+        for i in range(n_players)
+    ]
+    turns: list[Cnf] = [compiler.hand_clauses(0, hands[0])]
+    for turn_index in range(1, N_BENCHMARK_TURNS + 1):
+        guesser = (turn_index - 1) % n_players
+        guess = Crime(
+            CHARACTERS[rng.integers(len(CHARACTERS))],
+            WEAPONS[rng.integers(len(WEAPONS))],
+            ROOMS[rng.integers(len(ROOMS))],
+        )
+        game_log_entry = GameLogEntry(turn_index, guess)
+        clauses: Cnf = []
+        for delta in range(1, n_players):
+            responder = (guesser + delta) % n_players
+            shown = [
+                rumor_card for rumor_card in guess if rumor_card in hands[responder]
+            ]
+            if len(shown) == 0:
+                card_reveal = CardReveal(responder, None)
+            elif guesser == 0:
+                card_reveal = CardReveal(responder, shown[0])
+            else:
+                card_reveal = CardReveal(responder, UnknownRumor())
+            clauses.extend(compiler.card_reveal_clauses(game_log_entry, card_reveal))
+            if len(shown) > 0:
+                break
+        turns.append(clauses)
+    return turns
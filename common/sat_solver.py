@@ -0,0 +1,159 @@
+import dataclasses
+from collections.abc import Sequence
+from typing import Literal, cast, get_args
+
+from pysat.solvers import Solver  # type: ignore
+
+from common.maths import Cnf
+
+type SatBackend = Literal["m22", "g3", "g4", "cd19", "lgl", "mcb", "mpl", "mc", "gc4"]
+"""The pysat solvers that support everything that `IncrementalSolver` needs."""
+SAT_BACKENDS: tuple[SatBackend, ...] = get_args(SatBackend.__value__)
+DEFAULT_SAT_BACKEND: SatBackend = "mc"
+"""Minicard, i.e., MiniSat with native cardinality constraints."""
+
+
+@dataclasses.dataclass
+class IncrementalSolver:
+    """A long-lived SAT solver to which clauses are only ever added.
+
+    Each solve is warm-started from the phases of the previous model, so that
+    re-solving after adding a handful of clauses mostly confirms the previous model
+    rather than searching from scratch.
+    """
+
+    n_vars: int
+    """The highest variable index in use, including auxiliary variables."""
+    name: SatBackend = DEFAULT_SAT_BACKEND
+
+    n_solves: int = dataclasses.field(default=0, init=False)
+    """The number of calls to `solve` so far."""
+    _solver: Solver = dataclasses.field(init=False)
+    _model: list[int] | None = dataclasses.field(init=False)
+    _falsifying_selectors: dict[int, int] = dataclasses.field(init=False)
+    """The selector of each literal that, if true, makes the literal false."""
+    _any_falsifying_selector: int | None = dataclasses.field(init=False)
+    """The selector that, if true, makes at least one of `_falsifying_selectors` true."""
+
+    def __post_init__(self) -> None:
+        self._solver = Solver(name=self.name)
+        self._model = None
+        self._falsifying_selectors = {}
+        self._any_falsifying_selector = None
+
+    def new_var(self) -> int:
+        """Allocate a fresh auxiliary variable."""
+        self.n_vars += 1
+        return self.n_vars
+
+    def add_clauses(self, clauses: Cnf) -> None:
+        for clause in clauses:
+            self.n_vars = max(self.n_vars, *(abs(lit) for lit in clause))
+            self._solver.add_clause(clause)  # type: ignore
+
+    @property
+    def supports_cardinality_constraints(self) -> bool:
+        return cast(bool, self._solver.supports_atmost())  # type: ignore
+
+    def add_exactly(self, lits: Sequence[int], bound: int) -> None:
+        """Add a native constraint that exactly `bound` of `lits` are true.
+
+        Requires `supports_cardinality_constraints`.
+        """
+        self.n_vars = max(self.n_vars, *(abs(lit) for lit in lits))
+        self._solver.add_atmost(list(lits), bound)  # type: ignore
+        if bound == 1:
+            self._solver.add_clause(list(lits))  # type: ignore
+        else:
+            self._solver.add_atmost([-lit for lit in lits], len(lits) - bound)  # type: ignore
+
+    def solve(
+        self, assumptions: Sequence[int] = (), phases: Sequence[int] | None = None
+    ) -> bool:
+        """Solve under the given assumptions.
+
+        The solver prefers the given `phases` (literals) if any, otherwise those of the
+        previous model.
+        """
+        self.n_solves += 1
+        if phases is None:
+            phases = self._model
+        if phases is not None:
+            self._solver.set_phases(list(phases))  # type: ignore
+        solvable = cast(
+            bool,
+            self._solver.solve(assumptions=list(assumptions)),  # type: ignore
+        )
+        if solvable:
+            self._model = cast(list[int], self._solver.get_model())  # type: ignore
+        return solvable
+
+    def solve_falsifying_any(
+        self,
+        lits: Sequence[int],
+        assumptions: Sequence[int] = (),
+        phases: Sequence[int] | None = None,
+    ) -> bool:
+        """Solve under the given assumptions for a model in which at least one of `lits`
+        is false, as in `solve`.
+
+        Rather than a clause for `lits` under a fresh selector, which would stay in the
+        solver for good, each variable gets a selector (and clause) per literal the first
+        time it is given, and the selectors of the other literals are assumed false. So
+        the solver grows only with the variables given, however often this is called.
+        """
+        new_lits = dict.fromkeys(
+            new_lit
+            for lit in lits
+            if lit not in self._falsifying_selectors
+            for new_lit in [lit, -lit]
+        )
+        for lit in new_lits:
+            selector = self.new_var()
+            self.add_clauses([[-selector, -lit]])
+            self._falsifying_selectors[lit] = selector
+        if len(new_lits) > 0 or self._any_falsifying_selector is None:
+            self._any_falsifying_selector = self.new_var()
+            self.add_clauses(
+                [[-self._any_falsifying_selector, *self._falsifying_selectors.values()]]
+            )
+        lit_set = set(lits)
+        return self.solve(
+            assumptions=[
+                self._any_falsifying_selector,
+                *(
+                    -selector
+                    for lit, selector in self._falsifying_selectors.items()
+                    if lit not in lit_set
+                ),
+                *assumptions,
+            ],
+            phases=phases,
+        )
+
+    def get_minimal_core(self, assumptions: Sequence[int]) -> list[int] | None:
+        """Get a minimal subset of the given assumptions under which there is no model,
+        or `None` if there is a model under all of them.
+
+        The core of the solver is shrunk by dropping each of its assumptions in turn
+        for which there is still no model without it.
+        """
+        if self.solve(assumptions):
+            return None
+        core = list(self._solver.get_core())  # type: ignore
+        i = 0
+        while i < len(core):
+            if self.solve(core[:i] + core[i + 1 :]):
+                i += 1
+            else:
+                del core[i]
+        return core
+
+    def get_model(self) -> list[int]:
+        """Get the model found by the last successful call to `solve`."""
+        if self._model is None:
+            raise ValueError("No model has been found yet")
+        return self._model
+
+    def delete(self) -> None:
+        self._solver.delete()  # type: ignore
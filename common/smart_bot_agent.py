@@ -1,29 +1,49 @@
 import dataclasses
 import itertools
+from collections.abc import Sequence
+from concurrent.futures import Executor
 from enum import Enum
-from typing import cast
 
-from pysat.card import CardEnc  # type: ignore
-from pysat.formula import CNF, IDPool  # type: ignore
-from pysat.solvers import Solver  # type: ignore
+import numpy as np
+import numpy.typing as npt
 
 from common.agent_utils import (
     CASE_FILE,
     EXTRA_CARDS,
+    AgentIndex,
     BaseObserver,
     BasePlayer,
+    CardReveal,
+    GameLogEntry,
     UnknownRumor,
 )
+from common.backbone import compute_backbone
 from common.cards import (
     CHARACTERS,
     N_CASE_FILE_CARDS,
     ROOMS,
-    RUMOR_TYPES,
     RUMORS,
     WEAPONS,
     Crime,
     RumorCard,
 )
+from common.clause_compiler import ClauseCompiler
+from common.consts import ExtraCards
+from common.deal_counting import count_deals
+from common.deal_sampling import (
+    DEFAULT_N_SAMPLES,
+    N_BURN_IN_STEPS,
+    N_STEPS_BETWEEN_SAMPLES,
+    sample_deals,
+    sample_deals_in_parallel,
+)
+from common.deals import DealConstraints
+from common.deduction_state import FALSE, TRUE, UNKNOWN, DeductionState
+from common.guess_selection import (
+    N_GUESS_SAMPLES,
+    N_GUESS_SAMPLING_STEPS,
+    choose_guess_by_information_gain,
+)
 from common.maths import (
     BooleanStatement,
     CardIsInLocation,
@@ -31,9 +51,16 @@ from common.maths import (
     Cnf,
     Not,
     Or,
-    Xor,
 )
-from common.utils import shuffled, sign
+from common.public_knowledge import PublicKnowledge
+from common.rules_cnf import get_variables_to_lits, rules_boolean_statements
+from common.sat_backends import SatBackendSetting
+from common.sat_solver import DEFAULT_SAT_BACKEND, IncrementalSolver
+from common.symmetry import (
+    get_interchangeable_cards,
+    get_interchangeable_players,
+    get_representatives,
+)
 
 
 class GuessMakingStrategy(Enum):
@@ -44,7 +71,9 @@ class GuessMakingStrategy(Enum):
     RANDOM_FIRST_FREE_CASE_FILE_VARIABLES = "RANDOM_FIRST_FREE_CASE_FILE_VARIABLES"
     """Best performance."""
     NEW_GUESS_RUMOR = "NEW_GUESS_RUMOR"
-    """Not yet implemented."""
+    """Maximize the expected information gained about the case file, over sampled
+    deals.
+    """
 
 
 class GuessAnsweringStrategy(Enum):
@@ -60,229 +89,487 @@ class UnsolvableError(Exception):
 
 @dataclasses.dataclass
 class SmartBotObserver(BaseObserver):
-    _free_case_file_variables: dict[int, list[CardIsInLocation]] = dataclasses.field(
-        init=False
+    sat_backend: SatBackendSetting | None = dataclasses.field(
+        default=None, kw_only=True
+    )
+    """The SAT solver backend, which is that of `public_knowledge` if that is given,
+    otherwise `DEFAULT_SAT_BACKEND` by default.
+    """
+    public_knowledge: PublicKnowledge | None = dataclasses.field(
+        default=None, kw_only=True
     )
+    """The public knowledge to share with the other agents at the table, if any,
+    otherwise this agent keeps its own (with `sat_backend`).
+    """
+    rng: np.random.Generator = dataclasses.field(
+        default_factory=np.random.default_rng, kw_only=True
+    )
+    """The source of all of this agent's randomness, e.g., in its guesses and
+    samples.
+    """
+
+    _variables_to_lits: dict[CardIsInLocation, int] = dataclasses.field(init=False)
+    _variables: list[CardIsInLocation] = dataclasses.field(init=False)
+    _knowledge_clauses: Cnf = dataclasses.field(init=False)
+    _knowledge_version: int = dataclasses.field(init=False)
+    _n_public_clauses: int = dataclasses.field(init=False)
+    """The number of public clauses that have been added to `_knowledge_clauses`."""
+    _n_public_retractions: int = dataclasses.field(init=False)
+    """The number of public retractions as of the last sync."""
+    _private_lits: dict[int, list[int]] = dataclasses.field(init=False)
+    """The private knowledge of this agent from each turn (turn 0 being its hand and
+    anything else that it knew before the gameplay), as literals to assume when
+    solving.
+    """
+    _clause_set: set[tuple[int, ...]] = dataclasses.field(init=False)
+    _solver: IncrementalSolver = dataclasses.field(init=False)
+    _clause_compiler: ClauseCompiler = dataclasses.field(init=False)
+    _deal_constraints: DealConstraints = dataclasses.field(init=False)
+    _deduction_state: DeductionState = dataclasses.field(init=False)
 
     def __post_init__(self) -> None:
         super().__post_init__()
-        self._free_case_file_variables = {}
+        self._variables_to_lits = get_variables_to_lits(self.player_indices)
+        self._variables = list(self._variables_to_lits)
+        self._clause_compiler = ClauseCompiler(self.player_indices)
+        self._knowledge_version = 0
+        self._private_lits = {}
+        # The solver holds the rules and the public card reveals, which are the same
+        # for every agent at the table, so they are encoded and solved once for all of
+        # them. Everything else that this agent knows is a unit clause, which is
+        # assumed when solving.
+        if self.public_knowledge is None:
+            if self.sat_backend is None:
+                self.sat_backend = DEFAULT_SAT_BACKEND
+            self.public_knowledge = PublicKnowledge(
+                self.player_indices,
+                self.n_cards_per_player,
+                self.n_extra_cards,
+                self.sat_backend,
+            )
+        elif self.sat_backend is None:
+            self.sat_backend = self.public_knowledge.sat_backend
+        elif self.sat_backend != self.public_knowledge.sat_backend:
+            raise ValueError(
+                f"The SAT backend {self.sat_backend!r} is not that of the shared public "
+                f"knowledge, {self.public_knowledge.sat_backend!r}"
+            )
+        self._solver = self.public_knowledge.solver
+        self._reset_knowledge()
+        self._add_private_clauses(self._hand_clauses(), turn_index=0)
 
     @property
     def n_extra_cards(self) -> int:
         n_players = len(self.player_indices)
         return (len(RUMORS) - N_CASE_FILE_CARDS) % n_players
 
-    def _game_log_to_boolean_statements(self) -> list[BooleanStatement]:
-        statements: list[BooleanStatement] = []
+    def sees_card(
+        self,
+        turn_index: int,
+        other_player_index: AgentIndex | ExtraCards,
+        rumor_card: RumorCard | UnknownRumor | None,
+    ) -> None:
+        super().sees_card(turn_index, other_player_index, rumor_card)
+        game_log_entry = self.game_log[turn_index]
+        clauses = self._clause_compiler.card_reveal_clauses(
+            game_log_entry, game_log_entry.card_reveals[-1]
+        )
+        if isinstance(rumor_card, RumorCard):
+            # Only this agent (and the player who showed it) knows which card it is.
+            self._add_private_clauses(clauses, turn_index)
+        else:
+            # Every agent at the table sees the same reveal, so whichever sees it
+            # first adds it for all of them.
+            self.public_knowledge.add_clauses(clauses, turn_index)  # type: ignore
+
+    def reset_game_log_entry(self, turn_index: int, guess: Crime | None = None) -> None:
+        """Forget the card reveals of the given turn (other than of the extra cards),
+        e.g., to enter them again after a mistake, and restart its game log entry with
+        the given guess.
+
+        The solver is not rebuilt; the clauses of the turn are merely no longer
+        assumed. Public reveals are forgotten for every agent that shares the public
+        knowledge.
+        """
+        extra_card_reveals = [
+            card_reveal
+            for card_reveal in self.game_log[turn_index].card_reveals
+            if card_reveal.other_player_index == EXTRA_CARDS
+        ]
+        self.game_log[turn_index] = GameLogEntry(turn_index, guess)
+        self._private_lits.pop(turn_index, None)
+        self.public_knowledge.retract(turn_index)  # type: ignore
+        self._reset_knowledge()
+        for card_reveal in extra_card_reveals:
+            self.sees_card(
+                turn_index, card_reveal.other_player_index, card_reveal.rumor_card
+            )
 
-        # General knowledge of the game:
+    def get_conflicting_turn_indices(self) -> list[int]:
+        """Get the turns whose card reveals contradict each other (turn 0 being what
+        this agent knew before the gameplay), or none if they do not.
+
+        The turns are those of a minimal set of reveals that contradict each other, so
+        forgetting any one of them resolves the contradiction (but not necessarily
+        others).
+        """
+        self._sync_public_knowledge()
+        core = self._solver.get_minimal_core(self._assumptions)
+        if core is None:
+            return []
+        turn_indices: set[int] = set()
+        for lit in core:
+            turn_index = self.public_knowledge.get_turn_index(lit)  # type: ignore
+            if turn_index is not None:
+                turn_indices.add(turn_index)
+            else:
+                turn_indices.update(
+                    turn_index
+                    for turn_index, lits in self._private_lits.items()
+                    if lit in lits
+                )
+        return sorted(turn_indices)
+
+    @property
+    def _assumptions(self) -> list[int]:
+        """The literals to assume when solving, for this agent's knowledge."""
+        return [
+            *self.public_knowledge.assumptions,  # type: ignore
+            *dict.fromkeys(lit for lits in self._private_lits.values() for lit in lits),
+        ]
 
-        # The case file contains exactly one character, weapon, and room.
-        for rumor_cards in (CHARACTERS, WEAPONS, ROOMS):
+    def _add_private_clauses(self, clauses: Cnf, turn_index: int) -> None:
+        """Add the given canonical unit clauses of the given turn to this agent's
+        knowledge, and assume them when solving.
+        """
+        self._private_lits.setdefault(turn_index, []).extend(lit for (lit,) in clauses)
+        self._add_knowledge_clauses(clauses)
+
+    def _reset_knowledge(self) -> None:
+        """Rebuild this agent's knowledge, other than in the solver, from its private
+        knowledge and the public knowledge, e.g., after a turn has been retracted.
+        """
+        # Knowledge may have shrunk, so nothing proven so far can be relied on.
+        self._deduction_state = DeductionState(self.player_indices)
+        self._knowledge_clauses = []
+        self._knowledge_version += 1
+        self._clause_set = set()
+        # Simple deductions are propagated as knowledge comes in, which decides many
+        # questions without calling the solver.
+        self._deal_constraints = DealConstraints.without_knowledge(
+            len(self.player_indices), self.n_cards_per_player, self.n_extra_cards
+        )
+        self._add_knowledge_clauses(
+            [[lit] for lits in self._private_lits.values() for lit in lits]
+        )
+        self._n_public_clauses = 0
+        self._n_public_retractions = self.public_knowledge.n_retractions  # type: ignore
+        self._sync_public_knowledge()
+
+    def _sync_public_knowledge(self) -> None:
+        """Add the public clauses that have been added since the last sync to this
+        agent's knowledge. The solver already has them.
+        """
+        public_knowledge = self.public_knowledge
+        assert public_knowledge is not None
+        if public_knowledge.n_retractions != self._n_public_retractions:
+            self._reset_knowledge()
+            return
+        self._add_knowledge_clauses(public_knowledge.clauses[self._n_public_clauses :])
+        self._n_public_clauses = len(public_knowledge.clauses)
+
+    def _add_knowledge_clauses(self, clauses: Cnf) -> Cnf:
+        """Add the given canonical clauses (see `ClauseCompiler`) that are new to this
+        agent's knowledge, and return those.
+        """
+        new_clauses: Cnf = []
+        for clause in clauses:
+            key = tuple(clause)
+            if key in self._clause_set:
+                continue
+            self._clause_set.add(key)
+            new_clauses.append(clause)
+        self._knowledge_clauses.extend(new_clauses)
+        self._knowledge_version += len(new_clauses)
+        self._deal_constraints.add_clauses(new_clauses)
+        return new_clauses
+
+    def _solve(self) -> None:
+        """Solve under this agent's knowledge, leaving a model in the solver."""
+        if not self._solver.solve(assumptions=self._assumptions):
+            raise UnsolvableError
+
+    def _rules_boolean_statements(self) -> list[BooleanStatement]:
+        """Get the statements that follow from the rules of the game, other than the
+        number of cards in each location.
+        """
+        return rules_boolean_statements(self.player_indices)
+
+    def _hand_boolean_statements(self) -> list[BooleanStatement]:
+        """Get the statements that this agent knows from its own rumor cards."""
+        return []
+
+    def _hand_clauses(self) -> Cnf:
+        """Get the clauses of `_hand_boolean_statements`."""
+        return []
+
+    @staticmethod
+    def _card_reveal_to_boolean_statements(
+        game_log_entry: GameLogEntry, card_reveal: CardReveal
+    ) -> list[BooleanStatement]:
+        """Get the statements that this agent learns from a single card reveal.
+
+        The solver is instead fed the equivalent clauses from `ClauseCompiler`; this is
+        the readable reference for them.
+        """
+        statements: list[BooleanStatement] = []
+        if isinstance(card_reveal.rumor_card, RumorCard):
+            # If another player has shown this player a rumor card, then this player
+            # knows that that other player has that rumor card.
+            statements.append(
+                CardIsInLocation(card_reveal.rumor_card, card_reveal.other_player_index)
+            )
+        elif game_log_entry.guess is None:
+            pass
+        elif isinstance(card_reveal.rumor_card, UnknownRumor):
+            # If a player A (can be this player) shows another player B (cannot be this
+            # player) a rumor card, then this player knows that player A has at least
+            # one of the rumor cards in player B's guess:
+            # This player does not know that specific rumor card.
             statements.append(
-                Xor(
+                Or(
                     [
-                        CardIsInLocation(rumor_card, CASE_FILE)
-                        for rumor_card in rumor_cards
+                        CardIsInLocation(rumor_card, card_reveal.other_player_index)
+                        for rumor_card in game_log_entry.guess
                     ]
                 )
             )
-
-        # Each rumor card is owned by exactly one of the players including the case file
-        # and extra cards.
-        locs: list[CardLocation] = [*self.player_indices, CASE_FILE, EXTRA_CARDS]
-        for rumor_card in RUMORS:
-            statements.append(
-                Xor(
-                    [CardIsInLocation(rumor_card, loc) for loc in locs],
+        else:  # card_reveal.rumor_card is None
+            for rumor_card in game_log_entry.guess:
+                # If a player A (can be this player) does not show another player B
+                # (cannot be this player) a rumor card, then this player knows that
+                # player A does have any of the rumor cards in player B's guess.
+                statements.append(
+                    Not(CardIsInLocation(rumor_card, card_reveal.other_player_index))
                 )
-            )
+        return statements
+
+    def _game_log_to_boolean_statements(self) -> list[BooleanStatement]:
+        """Get all statements known to this agent by re-reading the whole game log.
+
+        The solver is instead fed incrementally as cards are seen; this is the
+        reference for what it should contain.
+        """
+        statements = [
+            *self._rules_boolean_statements(),
+            *self._hand_boolean_statements(),
+        ]
 
         # Player knowledge accumulated during gameplay:
 
         for game_log_entry in self.game_log:
             for card_reveal in game_log_entry.card_reveals:
-                if isinstance(card_reveal.rumor_card, RumorCard):
-                    # If another player has shown this player a rumor card, then this
-                    # player knows that that other player has that rumor card.
-                    statements.append(
-                        CardIsInLocation(
-                            card_reveal.rumor_card, card_reveal.other_player_index
-                        )
-                    )
-                elif game_log_entry.guess is None:
-                    continue
-                elif isinstance(card_reveal.rumor_card, UnknownRumor):
-                    # If a player A (can be this player) shows another player B (cannot
-                    # be this player) a rumor card, then this player knows that player A
-                    # has at least one of the rumor cards in player B's guess:
-                    # This player does not know that specific rumor card.
-                    statements.append(
-                        Or(
-                            [
-                                CardIsInLocation(
-                                    rumor_card, card_reveal.other_player_index
-                                )
-                                for rumor_card in game_log_entry.guess
-                            ]
-                        )
-                    )
-                else:  # card_reveal.rumor_card is None
-                    for rumor_card in game_log_entry.guess:
-                        # If a player A (can be this player) does not show another
-                        # player B (cannot be this player) a rumor card, then this
-                        # player knows that player A does have any of the rumor cards in
-                        # player B's guess.
-                        statements.append(
-                            Not(
-                                CardIsInLocation(
-                                    rumor_card, card_reveal.other_player_index
-                                )
-                            )
-                        )
+                statements.extend(
+                    self._card_reveal_to_boolean_statements(game_log_entry, card_reveal)
+                )
 
         # Remove duplicates.  # TODO: Preserve order?
         statements = list(set(statements))
 
         return statements
 
-    def _get_all_variables(
+    def solve_truths_cnf_probabilities(
         self,
-    ) -> dict[CardIsInLocation, int]:
-        locs: list[CardLocation] = [*self.player_indices, CASE_FILE, EXTRA_CARDS]
-        all_variables = [
-            CardIsInLocation(rumor_card, loc) for loc in locs for rumor_card in RUMORS
-        ]
-        return {var: i + 1 for i, var in enumerate(all_variables)}
+        n_samples: int = DEFAULT_N_SAMPLES,
+        max_seconds: float | None = None,
+        executor: Executor | None = None,
+        n_tasks: int | None = None,
+    ) -> dict[CardIsInLocation, float]:
+        """Estimate the probability of each variable being true from near-uniform
+        samples of the deals that are consistent with this agent's knowledge.
+
+        If an executor is given, the samples are drawn in `n_tasks` tasks on it, as in
+        `sample_deals_in_parallel`, by default one task per worker of a
+        `ProcessPoolExecutor` or `ThreadPoolExecutor`.
+        """
+        constraints = self._get_deal_constraints()
+        if executor is None:
+            deals = self._sample_deals(n_samples=n_samples, max_seconds=max_seconds)
+        else:
+            if n_tasks is None:
+                # The standard executors do not expose their number of workers.
+                n_tasks = getattr(executor, "_max_workers", None)
+                if n_tasks is None:
+                    raise ValueError("The number of tasks must be given")
+            self._solve()
+            deals = sample_deals_in_parallel(
+                constraints,
+                start=constraints.deal_from_model(self._solver.get_model()),
+                executor=executor,
+                n_tasks=n_tasks,
+                n_samples=n_samples,
+                max_seconds=max_seconds,
+                rng=self.rng,
+            )
+        probabilities = constraints.count_locations(deals) / len(deals)
+        return dict(zip(self._variables, probabilities.T.ravel().tolist(), strict=True))
 
-    def _boolean_statements_to_cnf_clauses(
+    def _sample_deals(
         self,
-        statements: list[BooleanStatement],
-        variables_to_lits: dict[CardIsInLocation, int],
-    ) -> tuple[Cnf, int]:
-        clauses: Cnf = []
-        for statement in statements:
-            clauses.extend(statement.to_cnf(variables_to_lits))
-        id_pool = IDPool(start_from=1, occupied=[[1, len(variables_to_lits)]])
-        for player_index in self.player_indices:
-            clauses.extend(
-                CardEnc.equals(  # type: ignore
-                    lits=[
-                        i
-                        for v, i in variables_to_lits.items()
-                        if v.location == player_index
-                    ],
-                    bound=self.n_cards_per_player,
-                    vpool=id_pool,
-                ).clauses  # type: ignore
-            )
-        clauses = [
-            list(c) for c in list(set(tuple(c) for c in clauses))
-        ]  # TODO: Remove?
-        n_lits = cast(int, id_pool.top)  # type: ignore
-        return clauses, n_lits
-
-    def solve_truths_cnf_probabilities(self, n_samples: int = 10):
-        all_variables = self._get_all_variables()
-        statements = self._game_log_to_boolean_statements()
-        clauses, n_lits = self._boolean_statements_to_cnf_clauses(
-            statements, variables_to_lits=all_variables
+        n_samples: int,
+        max_seconds: float | None = None,
+        n_burn_in_steps: int = N_BURN_IN_STEPS,
+        n_steps_between_samples: int = N_STEPS_BETWEEN_SAMPLES,
+    ) -> npt.NDArray[np.intp]:
+        """Sample deals that are consistent with this agent's knowledge, as in
+        `sample_deals`.
+        """
+        constraints = self._get_deal_constraints()
+        self._solve()
+        return sample_deals(
+            constraints,
+            start=constraints.deal_from_model(self._solver.get_model()),
+            n_samples=n_samples,
+            max_seconds=max_seconds,
+            rng=self.rng,
+            n_burn_in_steps=n_burn_in_steps,
+            n_steps_between_samples=n_steps_between_samples,
+        )
+
+    def count_truths_probabilities(self) -> dict[CardIsInLocation, float]:
+        """Get the exact probability of each variable being true, taking every deal that
+        is consistent with this agent's knowledge to be equally likely.
+        """
+        return self._counts_to_probabilities(*count_deals(self._get_deal_constraints()))
+
+    def _counts_to_probabilities(
+        self, n_deals: float, marginals: npt.NDArray[np.float64]
+    ) -> dict[CardIsInLocation, float]:
+        if n_deals == 0:
+            raise UnsolvableError
+        probabilities = (marginals / n_deals).T.ravel().tolist()
+        return dict(zip(self._variables, probabilities, strict=True))
+
+    def _get_deal_constraints(self) -> DealConstraints:
+        self._sync_public_knowledge()
+        return self._deal_constraints
+
+    def must_see_extra_cards(self) -> bool:
+        if self.n_extra_cards == 0:
+            return False
+        unknown_cards = self.get_deduction_state([CASE_FILE]).get_unknown_cards(
+            CASE_FILE
         )
-        solutions: list[dict[CardIsInLocation, bool]] = []
-        for _ in range(n_samples):
-            orig_lit_indices = list(range(1, 1 + n_lits))
-            random_lit_indices = shuffled(orig_lit_indices)
-            orig2random_lit_index_mapping = dict(
-                zip(orig_lit_indices, random_lit_indices, strict=True)
+        # The case file has one card of each rumor type that is not yet solved, so the
+        # extra cards may account for all of the other candidates.
+        n_unsolved_rumor_types = len({type(rumor_card) for rumor_card in unknown_cards})
+        return 0 < len(unknown_cards) - n_unsolved_rumor_types <= self.n_extra_cards
+
+    @property
+    def knowledge_version(self) -> int:
+        """A number that increases whenever this agent's knowledge changes, including
+        by new public knowledge, and so identifies its content.
+        """
+        self._sync_public_knowledge()
+        return self._knowledge_version
+
+    def get_deduction_state(
+        self, locations: Sequence[CardLocation] | None = None
+    ) -> DeductionState:
+        """Get what this agent has proven about where each card is, first bringing the
+        given locations (by default, all of them) up to date with its knowledge.
+
+        Only values that are neither proven already nor decided by propagation are
+        checked with the solver.
+        """
+        state = self._deduction_state
+        knowledge_version = self.knowledge_version
+        location_indices = state.get_outdated_location_indices(
+            state.locations if locations is None else locations, knowledge_version
+        )
+        if len(location_indices) == 0:
+            return state
+        constraints = self._deal_constraints
+        if constraints.is_contradictory:
+            raise UnsolvableError
+        values = np.where(
+            state.values[:, location_indices] != UNKNOWN,
+            state.values[:, location_indices],
+            np.where(
+                constraints.external_known[:, location_indices],
+                TRUE,
+                np.where(
+                    constraints.external_allowed[:, location_indices], UNKNOWN, FALSE
+                ),
+            ),
+        ).astype(np.int8)
+        # If propagation has decided every value, the solver is not called at all (and
+        # so the knowledge is only checked for the contradictions that propagation
+        # finds).
+        cards, columns = np.nonzero(values == UNKNOWN)
+        if len(cards) > 0:
+            self._solve()
+            # Interchangeable cards, and likewise players, have the same values, so
+            # only the first of each group is checked.
+            card_representatives = get_representatives(
+                get_interchangeable_cards(constraints), constraints.n_cards
             )
-            random_clauses = [
-                [sign(lit) * orig2random_lit_index_mapping[abs(lit)] for lit in clause]
-                for clause in clauses
-            ]
-            cnf = CNF(
-                from_clauses=shuffled([shuffled(lits) for lits in random_clauses])
+            location_representatives = get_representatives(
+                get_interchangeable_players(constraints), constraints.n_locations
             )
-            with Solver(bootstrap_with=cnf) as solver:
-                solver.solve()  # type: ignore
-                solution = cast(list[int], solver.get_model())
-            random2orig_lit_index_mapping = {
-                v: k for k, v in orig2random_lit_index_mapping.items()
-            }
-            solution = sorted(
-                [
-                    sign(lit) * random2orig_lit_index_mapping[abs(lit)]
-                    for lit in solution
-                ],
-                key=abs,
+            lits = (
+                location_representatives[np.array(location_indices)[columns]]
+                * len(RUMORS)
+                + card_representatives[cards]
+                + 1
             )
-            solutions.append(
-                {v: s > 0 for v, s in zip(all_variables, solution, strict=False)}
+            backbone = compute_backbone(
+                self._solver, np.unique(lits).tolist(), assumptions=self._assumptions
             )
-        probabilities = {
-            var: sum(sol[var] for sol in solutions) / n_samples for var in all_variables
-        }
-        return probabilities
-
-    def must_see_extra_cards(self, turn_index: int) -> bool:
-        free_case_file_variables = self._get_free_case_file_variables(turn_index)
-        return 0 < len(free_case_file_variables) - 1 <= self.n_extra_cards
-
-    def _get_free_case_file_variables(self, turn_index: int | None = None):
-        if (
-            turn_index is not None
-            and turn_index in self._free_case_file_variables.keys()
-        ):
-            free_case_file_variables = self._free_case_file_variables[turn_index]
-        else:
-            _, free_case_file_variables = self._solve_truths_cnf()
-            if turn_index is not None:
-                self._free_case_file_variables[turn_index] = free_case_file_variables
-        return free_case_file_variables
-
-    def _solve_truths_cnf(
-        self,
-    ) -> tuple[dict[CardIsInLocation, bool] | None, list[CardIsInLocation]]:
-        all_variables = self._get_all_variables()
-        statements = self._game_log_to_boolean_statements()
-        clauses, _ = self._boolean_statements_to_cnf_clauses(
-            statements, variables_to_lits=all_variables
+            values[cards, columns] = np.where(
+                np.isin(lits, backbone),
+                TRUE,
+                np.where(np.isin(-lits, backbone), FALSE, UNKNOWN),
+            )
+        state.update(location_indices, values, knowledge_version)
+        return state
+
+    def solve_backbone(
+        self, variables: Sequence[CardIsInLocation] | None = None
+    ) -> dict[CardIsInLocation, bool]:
+        """Get the value of each of the given variables (by default, the whole card ×
+        location grid) that has the same value in every solution.
+        """
+        if variables is None:
+            variables = self._variables
+        self._sync_public_knowledge()
+        self._solve()
+        backbone = compute_backbone(
+            self._solver,
+            [self._variables_to_lits[var] for var in variables],
+            assumptions=self._assumptions,
         )
-        cnf = CNF(from_clauses=clauses)
-        with Solver(bootstrap_with=cnf) as solver:
-            solvable = cast(bool, solver.solve())  # type: ignore
-            if not solvable:
-                raise UnsolvableError
-            solution = cast(list[int], solver.get_model())
-            free_case_file_variables: list[CardIsInLocation] = []
-            for rumor_card in RUMORS:
-                case_file_variable = CardIsInLocation(rumor_card, CASE_FILE)
-                case_file_variable_index = all_variables[case_file_variable]
-                if +case_file_variable_index in solution:
-                    assumptions = [-case_file_variable_index]
-                elif -case_file_variable_index in solution:
-                    assumptions = [+case_file_variable_index]
-                else:
-                    raise ValueError
-                if cast(bool, solver.solve(assumptions=assumptions)):  # type: ignore
-                    free_case_file_variables.append(case_file_variable)
-        if len(free_case_file_variables) == 0:
-            solution = {v: s > 0 for v, s in zip(all_variables, solution, strict=False)}
-            return solution, free_case_file_variables
-        else:
-            return None, free_case_file_variables
+        return {self._variables[abs(lit) - 1]: lit > 0 for lit in backbone}
 
     def try_solving_crime(self) -> Crime | None:
-        solution, _ = self._solve_truths_cnf()
-        if solution is None:
-            return None
-        return Crime(
-            *[
-                var.rumor_card
-                for var, v in solution.items()
-                if var.location == CASE_FILE and v == 1
-            ]  # type: ignore
-        )
+        return self.get_deduction_state([CASE_FILE]).get_crime()
+
+
+def count_truths_probabilities_in_parallel(
+    observers: Sequence[SmartBotObserver], executor: Executor
+) -> list[dict[CardIsInLocation, float]]:
+    """Get the exact probabilities of each observer, as in
+    `SmartBotObserver.count_truths_probabilities`, counting in one task per observer on
+    the given executor.
+    """
+    futures = [
+        executor.submit(count_deals, observer._get_deal_constraints())
+        for observer in observers
+    ]
+    return [
+        observer._counts_to_probabilities(*future.result())
+        for observer, future in zip(observers, futures, strict=True)
+    ]
 
 
 @dataclasses.dataclass
@@ -303,9 +590,9 @@ class SmartBotPlayer(BasePlayer, SmartBotObserver):
     def make_guess(self, turn_index: int | None = None) -> Crime:
         if self.guess_making_strategy is GuessMakingStrategy.RANDOM:
             guess = Crime(
-                character=shuffled(CHARACTERS)[0],
-                weapon=shuffled(WEAPONS)[0],
-                room=shuffled(ROOMS)[0],
+                character=CHARACTERS[self.rng.integers(len(CHARACTERS))],
+                weapon=WEAPONS[self.rng.integers(len(WEAPONS))],
+                room=ROOMS[self.rng.integers(len(ROOMS))],
             )
         elif (
             self.guess_making_strategy
@@ -313,45 +600,55 @@ class SmartBotPlayer(BasePlayer, SmartBotObserver):
             or self.guess_making_strategy
             is GuessMakingStrategy.RANDOM_FIRST_FREE_CASE_FILE_VARIABLES
         ):
-            free_case_file_variables = self._get_free_case_file_variables(turn_index)
-            case_file_variables = [
-                CardIsInLocation(location=CASE_FILE, rumor_card=rc) for rc in RUMORS
-            ]
+            case_file_candidates = self.get_deduction_state(
+                [CASE_FILE]
+            ).get_case_file_candidates()
             crime_cards = {}
-            for rumor_type in RUMOR_TYPES:
-                rumor_cards = [
-                    var.rumor_card
-                    for var in free_case_file_variables
-                    if isinstance(var.rumor_card, rumor_type)
-                ]
-                if len(rumor_cards) == 0:
-                    rumor_cards = [
-                        var.rumor_card
-                        for var in case_file_variables
-                        if isinstance(var.rumor_card, rumor_type)
-                    ]
+            for rumor_type, rumor_cards in case_file_candidates.items():
+                # Once the rumor type is solved, any card of it will do.
+                if len(rumor_cards) == 1:
+                    rumor_cards = [rc for rc in RUMORS if isinstance(rc, rumor_type)]
                 if (
                     self.guess_making_strategy
                     is GuessMakingStrategy.RANDOM_FIRST_FREE_CASE_FILE_VARIABLES
                 ):
-                    rumor_cards = shuffled(rumor_cards)
-                crime_cards[rumor_type] = rumor_cards[0]
+                    crime_cards[rumor_type] = rumor_cards[
+                        self.rng.integers(len(rumor_cards))
+                    ]
+                else:
+                    crime_cards[rumor_type] = rumor_cards[0]
             guess = Crime(*crime_cards.values())
         elif self.guess_making_strategy is GuessMakingStrategy.NEW_GUESS_RUMOR:
-            raise NotImplementedError
+            # Only guesses of cards that may be in the case file are scored, which are
+            # far fewer than all guesses and do as well. Once a rumor type is solved,
+            # its card in the case file is one that no other player can show.
+            case_file_candidates = self.get_deduction_state(
+                [CASE_FILE]
+            ).get_case_file_candidates()
+            guess = choose_guess_by_information_gain(
+                self._get_deal_constraints(),
+                self._sample_deals(
+                    n_samples=N_GUESS_SAMPLES,
+                    n_burn_in_steps=0,
+                    n_steps_between_samples=N_GUESS_SAMPLING_STEPS,
+                ),
+                [
+                    Crime(*rumor_cards)
+                    for rumor_cards in itertools.product(*case_file_candidates.values())
+                ],
+                self.agent_index,
+                self.rng,
+            )
         else:
             raise TypeError
         return guess
 
-    def answer_guess(self, guess: Crime) -> RumorCard | None:
-        for rumor_card in shuffled(self.rumor_cards):
-            for rumor in guess:
-                if rumor_card == rumor:
-                    return rumor_card
-        return None
+    def choose_card_to_show(self, rumor_cards: Sequence[RumorCard]) -> RumorCard:
+        """Show any of the given cards at random."""
+        return rumor_cards[self.rng.integers(len(rumor_cards))]
 
-    def _game_log_to_boolean_statements(self) -> list[BooleanStatement]:
-        statements = super()._game_log_to_boolean_statements()
+    def _hand_boolean_statements(self) -> list[BooleanStatement]:
+        statements = super()._hand_boolean_statements()
 
         # Player knowledge of the game instance:
 
@@ -363,7 +660,7 @@ class SmartBotPlayer(BasePlayer, SmartBotObserver):
             else:
                 statements.append(Not(expression))
 
-        # Remove duplicates.  # TODO: Preserve order?
-        statements = list(set(statements))
-
         return statements
+
+    def _hand_clauses(self) -> Cnf:
+        return self._clause_compiler.hand_clauses(self.agent_index, self.rumor_cards)
@@ -2,16 +2,18 @@ from threading import Lock
 
 import pandas as pd
 
+from common.deduction_state import DeductionState
 from common.maths import CardIsInLocation
 
 AGENT = "agent"
 TURN_INDEX = "turn_index"
 CARD_LOCATION = "card_location"
 RUMOR_CARD = "rumor_card"
-APPROX_PROBABILITY = "approx_probability"
+PROBABILITY = "probability"
+PROVEN = "proven"
 
 _probabilities_df = pd.DataFrame(
-    columns=[AGENT, TURN_INDEX, CARD_LOCATION, RUMOR_CARD, APPROX_PROBABILITY]
+    columns=[AGENT, TURN_INDEX, CARD_LOCATION, RUMOR_CARD, PROBABILITY, PROVEN]
 )
 _lock = Lock()
 
@@ -25,7 +27,11 @@ def append_probabilities(
     agent: str,
     turn_index: int,
     probabilities: dict[CardIsInLocation, float],
+    deduction_state: DeductionState | None = None,
 ) -> None:
+    """Append an agent's probabilities, and, if given, whether each is proven, i.e.,
+    known for certain.
+    """
     global _probabilities_df
     append_df = pd.DataFrame(
         [
@@ -38,7 +44,11 @@ def append_probabilities(
                     else v.location
                 ),
                 RUMOR_CARD: str(v.rumor_card),
-                APPROX_PROBABILITY: p,
+                PROBABILITY: p,
+                PROVEN: (
+                    deduction_state is not None
+                    and deduction_state.get_value(v.rumor_card, v.location) is not None
+                ),
             }
             for v, p in probabilities.items()
         ]
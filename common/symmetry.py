@@ -0,0 +1,156 @@
+import math
+
+import numpy as np
+import numpy.typing as npt
+
+from common.deals import CARD_TYPE_INDICES, DealConstraints
+from common.utils import permutations
+
+
+def get_interchangeable_cards(constraints: DealConstraints) -> list[list[int]]:
+    """Group the cards that are interchangeable under the given constraints, i.e., the
+    cards of each rumor type that are in no "has at least one of" clause and may be in
+    the same locations. Swapping two such cards in any consistent deal gives another
+    consistent deal.
+
+    Every card is in exactly one group, and groups are in order of their first card.
+    """
+    clause_cards = {card for _, cards in constraints.or_clauses for card in cards}
+    groups: dict[object, list[int]] = {}
+    for card in range(constraints.n_cards):
+        key = (
+            card
+            if card in clause_cards
+            else (CARD_TYPE_INDICES[card], constraints.allowed[card].tobytes())
+        )
+        groups.setdefault(key, []).append(card)
+    return list(groups.values())
+
+
+def get_interchangeable_players(constraints: DealConstraints) -> list[list[int]]:
+    """Group the players who are interchangeable under the given constraints, i.e., the
+    players with no "has at least one of" clause who hold as many cards as each other
+    and may hold the same cards. Swapping the hands of two such players in any
+    consistent deal gives another consistent deal.
+
+    Every player is in exactly one group, and groups are in order of their first
+    player.
+    """
+    clause_locations = {location for location, _ in constraints.or_clauses}
+    groups: dict[object, list[int]] = {}
+    for player in range(constraints.n_players):
+        key = (
+            player
+            if player in clause_locations
+            else (
+                constraints.capacities[player],
+                constraints.allowed[:, player].tobytes(),
+            )
+        )
+        groups.setdefault(key, []).append(player)
+    return list(groups.values())
+
+
+def get_representatives(groups: list[list[int]], n: int) -> npt.NDArray[np.intp]:
+    """Get the first member of the group of each of `n` members, or the member itself
+    if it is in none of the groups.
+    """
+    representatives = np.arange(n)
+    for group in groups:
+        representatives[group] = group[0]
+    return representatives
+
+
+def merge_players(
+    constraints: DealConstraints, player_groups: list[list[int]]
+) -> DealConstraints:
+    """Merge each group of interchangeable players (see `get_interchangeable_players`)
+    into one player who holds all of their cards. The merged players are numbered in
+    order of their groups, and the other locations follow as usual.
+    """
+    player_indices = [group[0] for group in player_groups]
+    internal_locations = [
+        *player_indices,
+        *range(constraints.n_players, len(constraints.capacities)),
+    ]
+    merged_locations = {
+        player: merged_player
+        for merged_player, group in enumerate(player_groups)
+        for player in group
+    }
+    n_merged_players = len(player_groups)
+    merged = DealConstraints(
+        n_players=n_merged_players,
+        allowed=constraints.allowed[:, internal_locations].copy(),
+        or_clauses=[
+            (
+                merged_locations[location]
+                if location < constraints.n_players
+                else location - constraints.n_players + n_merged_players,
+                cards,
+            )
+            for location, cards in constraints.or_clauses
+        ],
+        capacities=[
+            *(
+                sum(constraints.capacities[player] for player in group)
+                for group in player_groups
+            ),
+            *constraints.capacities[constraints.n_players :],
+        ],
+    )
+    merged.is_contradictory = constraints.is_contradictory
+    return merged
+
+
+def get_merged_locations(
+    constraints: DealConstraints, player_groups: list[list[int]]
+) -> npt.NDArray[np.intp]:
+    """Get the internal location of `merge_players` of each internal location."""
+    n_merged_players = len(player_groups)
+    merged_locations = np.arange(len(constraints.capacities)) - (
+        constraints.n_players - n_merged_players
+    )
+    for merged_player, group in enumerate(player_groups):
+        merged_locations[group] = merged_player
+    return merged_locations
+
+
+def count_player_splits(
+    constraints: DealConstraints, player_groups: list[list[int]]
+) -> float:
+    """Count the ways in which the merged players of `merge_players` can split their
+    cards between the players of their groups, which is the same for every deal.
+    """
+    n_splits = 1
+    for group in player_groups:
+        capacities = [constraints.capacities[player] for player in group]
+        n_splits *= math.factorial(sum(capacities)) // math.prod(
+            math.factorial(capacity) for capacity in capacities
+        )
+    return float(n_splits)
+
+
+def split_merged_players(
+    constraints: DealConstraints,
+    player_groups: list[list[int]],
+    merged_deals: npt.NDArray[np.intp],
+    rng: np.random.Generator,
+) -> npt.NDArray[np.intp]:
+    """Split the cards of each merged player of `merge_players` between the players of
+    their group at random, which turns deals that are uniform over the merged
+    constraints into deals that are uniform over the given constraints.
+    """
+    n_merged_players = len(player_groups)
+    deals = merged_deals + (constraints.n_players - n_merged_players)
+    for merged_player, group in enumerate(player_groups):
+        is_merged = merged_deals == merged_player
+        if len(group) == 1:
+            deals[is_merged] = group[0]
+            continue
+        # Each merged player holds the same number of cards in every deal, so the
+        # cards of each deal fit in a row, as do the shuffled hands of the group.
+        players = np.repeat(group, [constraints.capacities[player] for player in group])
+        hands = players[permutations(len(players), len(deals), rng)]
+        deals[is_merged] = hands.ravel()
+    return deals
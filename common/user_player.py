@@ -1,4 +1,5 @@
 import dataclasses
+from collections.abc import Sequence
 
 from common.agent_utils import BasePlayer
 from common.cards import (
@@ -25,17 +26,14 @@ class UserPlayer(BasePlayer):
         print(f"{self._prefix}: It's your turn to make a guess.")
         return self._get_crime()
 
-    def answer_guess(self, guess: Crime) -> RumorCard | None:
-        options = set(guess) & set(self.rumor_cards)
-        if len(options) == 0:
-            return None
-        if len(options) == 1:
-            return options.pop()
+    def choose_card_to_show(self, rumor_cards: Sequence[RumorCard]) -> RumorCard:
+        if len(rumor_cards) == 1:
+            return rumor_cards[0]
         else:
             return self.textio.get_rumor_card(
                 "Select a rumor card in answer to the guess",
                 self._prefix,
-                list(options),
+                rumor_cards,
             )
 
     def _get_crime(self) -> Crime:
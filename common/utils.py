@@ -1,13 +1,15 @@
-from collections.abc import MutableSequence
-from copy import deepcopy
-from random import shuffle
-from typing import Any
+import numpy as np
+import numpy.typing as npt
 
 
-def shuffled[T: MutableSequence[Any]](iterable: T) -> T:
-    iterable_copy = deepcopy(iterable)
-    shuffle(iterable_copy)
-    return iterable_copy
+def permutations(
+    n: int, n_permutations: int, rng: np.random.Generator
+) -> npt.NDArray[np.intp]:
+    """Draw permutations of `range(n)` independently, one per row, in one call, e.g.,
+    to shuffle many decks (or any other sequences of the same length) at once by
+    indexing them.
+    """
+    return rng.permuted(np.tile(np.arange(n), (n_permutations, 1)), axis=1)
 
 
 def sign(x: int | float):
@@ -0,0 +1,19 @@
+import pytest
+
+from common.agent_utils import get_responder_sequences
+
+
+@pytest.mark.parametrize(
+    ("n_players", "expected_sequences"),
+    [
+        (2, ([1], [1])),
+        (3, ([2], [1])),
+        (4, ([3, 2], [1, 2])),
+        (5, ([4, 3], [1, 2])),
+        (6, ([5, 4, 3], [1, 2, 3])),
+    ],
+)
+def test_responder_sequences(
+    n_players: int, expected_sequences: tuple[list[int], list[int]]
+) -> None:
+    assert get_responder_sequences(0, n_players) == expected_sequences
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from cluedo_simulator import run_game, set_up_game
+from common.agent_utils import NaivePlayer, UnknownRumor
+from common.batched_games import (
+    NO_CARD,
+    NOT_ASKED,
+    BaselineStrategy,
+    play_baseline_games,
+)
+from common.cards import RUMORS
+
+
+@pytest.mark.parametrize("n_players", [2, 3, 4, 5, 6])
+@pytest.mark.parametrize("strategy", list(BaselineStrategy))
+def test_baseline_games_are_played_by_the_rules(
+    n_players: int, strategy: BaselineStrategy
+) -> None:
+    games = play_baseline_games(n_players, n_games=50, strategy=strategy, seed=0)
+    n_cards_per_player = (len(RUMORS) - 3) // n_players
+    assert (
+        (games.locations[:, None, :] == np.arange(n_players + 2)[None, :, None]).sum(
+            axis=2
+        )
+        == [
+            *[n_cards_per_player] * n_players,
+            3,
+            len(RUMORS) - 3 - n_players * n_cards_per_player,
+        ]
+    ).all()
+    assert (games.solving_turn_indices > 0).all()
+    for game_index in range(len(games.locations)):
+        for turn_index in range(games.n_turns[game_index]):
+            guess = games.guesses[turn_index, game_index]
+            for responder_index, answer in enumerate(
+                games.answers[turn_index, game_index]
+            ):
+                hand = np.flatnonzero(games.locations[game_index] == responder_index)
+                if answer == NO_CARD:
+                    assert len(np.intersect1d(hand, guess)) == 0
+                elif answer != NOT_ASKED:
+                    assert answer in hand and answer in guess
+    game_log = games.get_game_log(0, agent_index=0)
+    assert len(game_log) == games.n_turns[0] + 1
+    assert all(
+        not isinstance(card_reveal.rumor_card, UnknownRumor)
+        for game_log_entry in game_log[1::n_players]
+        for card_reveal in game_log_entry.card_reveals
+    )
+
+
+@pytest.mark.parametrize("n_players", [3, 5])
+def test_naive_players_solve_the_crime(n_players: int) -> None:
+    for seed in range(3):
+        setup = set_up_game(
+            player_types=[NaivePlayer] * n_players, observer_types=[], seed=seed
+        )
+        run_game(setup, dashboard=False, reveal_extra_cards_first=False)
+        assert all(
+            player.try_solving_crime() == setup.crime
+            for player in setup.players.values()
+        )
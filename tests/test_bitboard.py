@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from common.agent_utils import get_responder_sequences
+from common.bitboard import FULL_MASK, BitboardDeal, card_mask, mask_cards
+from common.cards import CHARACTERS, ROOMS, RUMORS, WEAPONS, Crime
+
+
+def test_masks_round_trip() -> None:
+    assert mask_cards(card_mask(RUMORS)) == RUMORS
+    assert card_mask(RUMORS) == FULL_MASK
+    assert mask_cards(card_mask([ROOMS[2], CHARACTERS[1]])) == [CHARACTERS[1], ROOMS[2]]
+
+
+@pytest.mark.parametrize("n_players", [2, 3, 4, 5, 6])
+def test_deal_answers_guesses_like_the_hands(n_players: int) -> None:
+    rng = np.random.default_rng(n_players)
+    deal = BitboardDeal.deal(n_players, rng)
+    masks = [*deal.hand_masks, deal.case_file_mask, deal.extra_cards_mask]
+    assert sum(masks) == FULL_MASK
+    assert all(
+        (mask & other_mask) == 0
+        for mask in masks
+        for other_mask in masks
+        if mask is not other_mask
+    )
+    assert len({hand_mask.bit_count() for hand_mask in deal.hand_masks}) == 1
+    assert deal.crime == Crime(*mask_cards(deal.case_file_mask))  # type: ignore
+    for _ in range(20):
+        guess = Crime(rng.choice(CHARACTERS), rng.choice(WEAPONS), rng.choice(ROOMS))  # type: ignore
+        current_player_index = int(rng.integers(n_players))
+        first_sequence, second_sequence = get_responder_sequences(
+            current_player_index, n_players
+        )
+        expected_answers = []
+        for responder_index in first_sequence:
+            shown = [card for card in guess if card in deal.hand(responder_index)]
+            expected_answers.append((responder_index, card_mask(shown)))
+            if len(shown) > 0:
+                break
+        if len(expected_answers) == len(first_sequence):
+            second_sequence = second_sequence[:-1]
+        for responder_index in second_sequence:
+            shown = [card for card in guess if card in deal.hand(responder_index)]
+            expected_answers.append((responder_index, card_mask(shown)))
+            if len(shown) > 0:
+                break
+        assert deal.get_answers(current_player_index, guess) == expected_answers
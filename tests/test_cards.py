@@ -0,0 +1,18 @@
+import copy
+import pickle
+
+from common.agent_utils import CASE_FILE
+from common.cards import RUMORS, parse_rumor
+from common.maths import CardIsInLocation
+
+
+def test_cards_and_variables_are_interned() -> None:
+    for i, rumor_card in enumerate(RUMORS):
+        assert rumor_card.id == i
+        assert parse_rumor(rumor_card.name) is rumor_card
+        assert copy.deepcopy(rumor_card) is rumor_card
+        assert pickle.loads(pickle.dumps(rumor_card)) is rumor_card
+        var = CardIsInLocation(rumor_card, CASE_FILE)
+        assert CardIsInLocation(location=CASE_FILE, rumor_card=rumor_card) is var
+        assert copy.deepcopy(var) is var
+        assert pickle.loads(pickle.dumps(var)) is var
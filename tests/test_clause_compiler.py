@@ -0,0 +1,32 @@
+from cluedo_simulator import run_turn, set_up_game
+from common.clause_compiler import ClauseCompiler
+from common.rules_cnf import get_variables_to_lits
+from common.smart_bot_agent import SmartBotObserver, SmartBotPlayer
+
+
+def test_card_reveal_clauses_match_statements() -> None:
+    n_players = 4
+    setup = set_up_game(
+        player_types=[SmartBotPlayer] * n_players,
+        observer_types=[SmartBotObserver],
+        seed=0,
+    )
+    for turn_index in range(1, 2 * n_players + 1):
+        run_turn(
+            turn_index, setup.players, (turn_index - 1) % n_players, {}, setup.deal
+        )
+    player = setup.players[0]
+    compiler = ClauseCompiler(player.player_indices)
+    variables_to_lits = get_variables_to_lits(player.player_indices)
+    for game_log_entry in player.game_log:
+        for card_reveal in game_log_entry.card_reveals:
+            expected = [
+                sorted(clause)
+                for statement in SmartBotObserver._card_reveal_to_boolean_statements(  # type: ignore
+                    game_log_entry, card_reveal
+                )
+                for clause in statement.to_cnf(variables_to_lits)
+            ]
+            clauses = compiler.card_reveal_clauses(game_log_entry, card_reveal)
+            assert sorted(clauses) == sorted(expected)
+            assert all(clause == sorted(clause) for clause in clauses)
@@ -6,7 +6,7 @@ import pytest
 
 from cluedo_assistant import CluedoAssistant
 from common.agent_utils import CardReveal, UnknownRumor
-from common.cards import Character, Crime, Room, Weapon
+from common.cards import CHARACTERS, ROOMS, WEAPONS, Character, Crime, Room, Weapon
 from common.consts import GameVariant
 
 
@@ -270,3 +270,79 @@ def test_collect_responses(case: Case) -> None:
         )
         == case.expected_card_reveals
     )
+
+
+class _GameInterrupted(Exception):
+    pass
+
+
+def test_contradictory_turn_is_entered_again() -> None:
+    # Arrange
+
+    hand = [*WEAPONS[:4], *ROOMS[:3]]
+    guess = Crime(CHARACTERS[0], WEAPONS[0], ROOMS[0])
+    other_guess = Crime(CHARACTERS[0], WEAPONS[5], ROOMS[5])
+    textio = Mock(spec=TextIO)
+    # Player 1 shows the user a card in turn 1, then the user mistakenly enters that
+    # nobody shows any of Player 2's guessed cards, which include it, in turn 3, and
+    # enters that turn again.
+    respondent_indexes = iter([1, None, None, 1, None])
+    rumor_cards = iter(
+        [*guess, guess.character, *other_guess, *other_guess]  # type: ignore
+    )
+
+    def get_player_index(
+        prompt: str,
+        optional: str,
+        player_indexes: list[int],
+        all_player_names: list[str],
+        player_index_of_user: int,
+    ) -> int | None:
+        if "Which player are you?" in prompt:
+            return 0
+        return next(respondent_indexes)
+
+    def announce_turn(
+        turn_index: int, player_name: str, current_player_is_user: bool
+    ) -> None:
+        if turn_index == 4:
+            raise _GameInterrupted
+
+    textio.get_rumor_cards = lambda prompt, n_rumor_cards: hand
+    textio.get_yes_or_no = lambda prompt: "Player 1 start" not in prompt
+    textio.get_game_variant = lambda: GameVariant.BOTH_SIDES_REVEAL
+    textio.get_player_index = get_player_index
+    textio.get_rumor_card = lambda prompt, options: next(rumor_cards)
+    textio.announce_turn = announce_turn
+    textio.print_ = lambda *args, **kwargs: None
+
+    assistant = CluedoAssistant(
+        io=textio, player_names=[f"Player {i}" for i in range(3)]
+    )
+
+    # Act
+
+    with pytest.raises(_GameInterrupted):
+        assistant.run(dashboard=False)
+
+    # Assert
+
+    # Every scripted answer has been given, including those of turn 3 again.
+    assert list(respondent_indexes) == []
+    assert list(rumor_cards) == []
+    agent = assistant.agent
+    assert [game_log_entry.guess for game_log_entry in agent.game_log] == [
+        None,
+        guess,
+        None,
+        other_guess,
+    ]
+    assert agent.game_log[1].card_reveals == [
+        CardReveal(1, CHARACTERS[0]),
+        CardReveal(2, None),
+    ]
+    assert agent.game_log[2].card_reveals == []
+    assert sorted(
+        agent.game_log[3].card_reveals, key=(lambda cr: cr.other_player_index)
+    ) == [CardReveal(0, None), CardReveal(1, UnknownRumor())]
+    assert agent.get_conflicting_turn_indices() == []
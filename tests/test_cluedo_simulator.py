@@ -0,0 +1,49 @@
+from cluedo_simulator import run_game, run_tournament, set_up_game
+from common.smart_bot_agent import (
+    GuessMakingStrategy,
+    SmartBotObserver,
+    SmartBotPlayer,
+)
+
+
+def test_same_seed_replays_same_game() -> None:
+    game_logs = []
+    for _ in range(2):
+        setup = set_up_game(
+            player_types=[SmartBotPlayer] * 4,
+            observer_types=[SmartBotObserver],
+            seed=123,
+        )
+        run_game(setup, dashboard=False, reveal_extra_cards_first=False)
+        game_logs.append([agent.game_log for agent in setup.agents.values()])
+    assert game_logs[0] == game_logs[1]
+    other_setup = set_up_game(
+        player_types=[SmartBotPlayer] * 4, observer_types=[SmartBotObserver], seed=124
+    )
+    run_game(other_setup, dashboard=False, reveal_extra_cards_first=False)
+    assert [agent.game_log for agent in other_setup.agents.values()] != game_logs[0]
+
+
+def test_tournament_rotates_strategies_over_reproducible_games() -> None:
+    strategies = [GuessMakingStrategy.RANDOM, GuessMakingStrategy.NEW_GUESS_RUMOR]
+    results = run_tournament(
+        n_games=2, guess_making_strategies=[*strategies, strategies[0]], seed=0
+    )
+    assert len(results) == 2 * 3
+    assert list(results.query("game_index == 0")["strategy"]) == [
+        "RANDOM",
+        "NEW_GUESS_RUMOR",
+        "RANDOM",
+    ]
+    assert list(results.query("game_index == 1")["strategy"]) == [
+        "RANDOM",
+        "RANDOM",
+        "NEW_GUESS_RUMOR",
+    ]
+    assert results.groupby("game_index")["won"].any().all()
+    assert (results["n_solver_calls"] > 0).all()
+    assert results.drop(columns="seconds").equals(
+        run_tournament(
+            n_games=2, guess_making_strategies=[*strategies, strategies[0]], seed=0
+        ).drop(columns="seconds")
+    )
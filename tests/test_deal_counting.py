@@ -0,0 +1,90 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+from pysat.solvers import Solver  # type: ignore
+
+from cluedo_simulator import run_turn, set_up_game
+from common.agent_utils import CASE_FILE, EXTRA_CARDS
+from common.cards import CHARACTERS, ROOMS, WEAPONS
+from common.deal_counting import count_deals
+from common.deals import DealConstraints
+from common.maths import CardIsInLocation
+from common.rules_cnf import get_rules_cnf
+from common.smart_bot_agent import (
+    SmartBotObserver,
+    SmartBotPlayer,
+    count_truths_probabilities_in_parallel,
+)
+
+
+@pytest.mark.parametrize("n_players", [2, 3, 4, 5, 6])
+def test_probabilities_without_knowledge(n_players: int) -> None:
+    observer = SmartBotObserver(
+        agent_index=-1,
+        player_indices=list(range(n_players)),
+        n_cards_per_player=21 // n_players,
+    )
+    probabilities = observer.count_truths_probabilities()
+    for rumor_cards in (CHARACTERS, WEAPONS, ROOMS):
+        p_case_file = 1 / len(rumor_cards)
+        p_extra_cards = (1 - p_case_file) * observer.n_extra_cards / 21
+        for rumor_card in rumor_cards:
+            assert probabilities[
+                CardIsInLocation(rumor_card, CASE_FILE)
+            ] == pytest.approx(p_case_file)
+            assert probabilities[
+                CardIsInLocation(rumor_card, EXTRA_CARDS)
+            ] == pytest.approx(p_extra_cards)
+            for player_index in observer.player_indices:
+                assert probabilities[
+                    CardIsInLocation(rumor_card, player_index)
+                ] == pytest.approx((1 - p_case_file - p_extra_cards) / n_players)
+
+
+def test_count_matches_enumeration() -> None:
+    setup = set_up_game(player_types=[SmartBotPlayer] * 3, observer_types=[], seed=0)
+    agent = setup.players[0]
+    assert isinstance(agent, SmartBotPlayer)
+    turn_index = 0
+    while True:
+        turn_index += 1
+        run_turn(
+            turn_index, setup.players, (turn_index - 1) % 3, setup.observers, setup.deal
+        )
+        constraints = DealConstraints.from_clauses(
+            agent._knowledge_clauses,  # type: ignore
+            n_players=3,
+            n_cards_per_player=agent.n_cards_per_player,
+            n_extra_cards=agent.n_extra_cards,
+        )
+        n_deals, marginals = count_deals(constraints)
+        if n_deals < 2000:
+            break
+    n_variables = len(agent._variables)  # type: ignore
+    deals: list[list[int]] = []
+    rules = get_rules_cnf(3, agent.n_cards_per_player, agent.n_extra_cards)
+    clauses = [*rules.clauses, *agent._knowledge_clauses]  # type: ignore
+    with Solver(bootstrap_with=clauses) as solver:
+        while solver.solve():  # type: ignore
+            deal = solver.get_model()[:n_variables]  # type: ignore
+            deals.append(deal)  # type: ignore
+            solver.add_clause([-lit for lit in deal])  # type: ignore
+    assert n_deals == len(deals)
+    n_cards = marginals.shape[0]
+    for var in range(1, n_variables + 1):
+        location, card = divmod(var - 1, n_cards)
+        assert marginals[card, location] == sum(var in deal for deal in deals)
+
+
+def test_parallel_counts_match_serial_counts() -> None:
+    setup = set_up_game(
+        player_types=[SmartBotPlayer] * 4, observer_types=[SmartBotObserver], seed=1
+    )
+    for turn_index in range(1, 5):
+        run_turn(turn_index, setup.players, turn_index - 1, setup.observers, setup.deal)
+    agents = [
+        agent for agent in setup.agents.values() if isinstance(agent, SmartBotObserver)
+    ]
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        parallel = count_truths_probabilities_in_parallel(agents, executor)
+    assert parallel == [agent.count_truths_probabilities() for agent in agents]
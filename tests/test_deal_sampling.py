@@ -0,0 +1,32 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pytest
+
+from cluedo_simulator import run_turn, set_up_game
+from common.smart_bot_agent import SmartBotObserver, SmartBotPlayer
+
+
+@pytest.mark.parametrize(("n_players", "n_workers"), [(3, 1), (4, 1), (4, 2)])
+def test_sampled_probabilities_match_exact_counts(
+    n_players: int, n_workers: int
+) -> None:
+    setup = set_up_game(
+        player_types=[SmartBotPlayer] * n_players,
+        observer_types=[SmartBotObserver],
+        seed=n_players,
+    )
+    for turn_index in range(1, n_players + 1):
+        run_turn(turn_index, setup.players, turn_index - 1, setup.observers, setup.deal)
+    (observer,) = setup.observers.values()
+    assert isinstance(observer, SmartBotObserver)
+    exact = observer.count_truths_probabilities()
+    if n_workers == 1:
+        sampled = observer.solve_truths_cnf_probabilities(n_samples=4000)
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            sampled = observer.solve_truths_cnf_probabilities(
+                n_samples=4000, executor=executor
+            )
+    errors = np.array([sampled[var] - p for var, p in exact.items()])
+    assert np.abs(errors).max() < 0.1
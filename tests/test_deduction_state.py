@@ -0,0 +1,32 @@
+import numpy as np
+
+from common.agent_utils import CASE_FILE
+from common.cards import CHARACTERS, ROOMS, RUMORS, WEAPONS, Crime
+from common.deduction_state import FALSE, TRUE, UNKNOWN, DeductionState
+
+
+def test_case_file_queries() -> None:
+    state = DeductionState(player_indices=[0, 1, 2])
+    case_file = state.location_index(CASE_FILE)
+    crime = Crime(CHARACTERS[1], WEAPONS[2], ROOMS[3])
+    values = np.full((len(RUMORS), 1), UNKNOWN, np.int8)
+    for rumor_card in [*CHARACTERS, *WEAPONS]:
+        values[rumor_card.id] = TRUE if rumor_card in crime else FALSE
+    values[ROOMS[0].id] = FALSE
+    state.update([case_file], values, knowledge_version=1)
+    assert state.get_outdated_location_indices([CASE_FILE], 1) == []
+    assert state.get_outdated_location_indices([CASE_FILE, 0], 1) == [0]
+    assert not state.is_solved()
+    assert state.get_crime() is None
+    assert state.get_unknown_cards(CASE_FILE) == ROOMS[1:]
+    candidates = list(state.get_case_file_candidates().values())
+    assert candidates == [[crime.character], [crime.weapon], ROOMS[1:]]
+    # Values that are proven are kept.
+    values[:] = UNKNOWN
+    for rumor_card in ROOMS:
+        values[rumor_card.id] = TRUE if rumor_card in crime else FALSE
+    state.update([case_file], values, knowledge_version=2)
+    assert state.get_value(CHARACTERS[1], CASE_FILE) is True
+    assert state.get_value(ROOMS[0], CASE_FILE) is False
+    assert state.get_value(ROOMS[0], 0) is None
+    assert state.get_crime() == crime
@@ -0,0 +1,53 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from cluedo_simulator import run_game, set_up_game
+from common.events import ConsoleEventSink, CrimeSolved, GameEnded, JsonlEventSink
+from common.smart_bot_agent import SmartBotObserver, SmartBotPlayer
+
+
+def test_jsonl_event_sink_traces_game(tmp_path: Path) -> None:
+    setup = set_up_game(
+        player_types=[SmartBotPlayer] * 4, observer_types=[SmartBotObserver], seed=0
+    )
+    path = tmp_path / "events.jsonl"
+    with JsonlEventSink(path, buffer_size=7) as events:
+        solving_turn_indices = run_game(
+            setup, dashboard=False, reveal_extra_cards_first=True, events=events
+        )
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [r["turn_index"] for r in records if r["event"] == "TurnStarted"] == list(
+        range(1, max(solving_turn_indices.values()) + 1)
+    )
+    assert {
+        agent_index
+        for r in records
+        if r["event"] == "CrimeSolved"
+        for agent_index in r["player_indices"] + r["observer_indices"]
+    } == set(setup.agents)
+    assert records[-1] == {
+        "event": "GameEnded",
+        "turn_index": max(solving_turn_indices.values()),
+    }
+    guesser_reveals = [
+        r
+        for r in records
+        if r["event"] == "CardRevealed" and r["rumor_card"] is not None
+    ]
+    assert all(r["rumor_card"] != "unknown" for r in guesser_reveals)
+    player = setup.players[guesser_reveals[0]["responder_index"]]
+    assert guesser_reveals[0]["rumor_card"] in [c.name for c in player.rumor_cards]
+
+
+def test_console_event_sink_prints_progress(
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    events = ConsoleEventSink()
+    events.emit(CrimeSolved(5, player_indices=[1], observer_indices=[]))
+    events.emit(GameEnded(5))
+    assert capsys.readouterr().out.splitlines() == [
+        "The following players have solved the crime in the last turn: [1]",
+        "By now, all players and observers have solved the crime.",
+    ]
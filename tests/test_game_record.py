@@ -0,0 +1,63 @@
+from pathlib import Path
+
+import pytest
+
+from cluedo_replay import replay_game
+from cluedo_simulator import run_game, set_up_game
+from common.agent_utils import NaivePlayer
+from common.batched_games import BaselineStrategy, play_baseline_games
+from common.consts import EXTRA_CARDS
+from common.game_record import GameRecord, read_game_records, write_game_records
+from common.smart_bot_agent import SmartBotObserver, SmartBotPlayer
+
+
+def test_game_records_round_trip(tmp_path: Path) -> None:
+    games = play_baseline_games(n_players=5, n_games=20, seed=0)
+    game_records = [games.get_game_record(game_index) for game_index in range(20)]
+    for game_record in game_records:
+        game_record.check()
+    path = tmp_path / "games.jsonl"
+    write_game_records(path, game_records)
+    assert list(read_game_records(path)) == game_records
+
+
+@pytest.mark.parametrize("n_players", [3, 4])
+def test_replay_solves_crime_in_same_turns_as_game(n_players: int) -> None:
+    setup = set_up_game(
+        player_types=[SmartBotPlayer] * n_players,
+        observer_types=[SmartBotObserver],
+        seed=7,
+    )
+    solving_turn_indices = run_game(
+        setup, dashboard=False, reveal_extra_cards_first=False
+    )
+    game_record = GameRecord.from_players(setup.deal, setup.players, seed=7)
+    game_record.check()
+    for game_log_entry, agent_game_log_entry in zip(
+        game_record.get_game_log(agent_index=1), setup.agents[1].game_log, strict=True
+    ):
+        assert game_log_entry.card_reveals == [
+            card_reveal
+            for card_reveal in agent_game_log_entry.card_reveals
+            if card_reveal.other_player_index != EXTRA_CARDS
+        ]
+    result = replay_game(
+        game_record,
+        player_types=[SmartBotPlayer] * n_players,
+        observer_types=[SmartBotObserver],
+    )
+    assert result.solving_turn_indices == solving_turn_indices
+    assert len(result.turn_seconds) == len(game_record.turns)
+
+
+def test_replay_of_baseline_games_by_naive_players() -> None:
+    games = play_baseline_games(
+        n_players=4, n_games=10, strategy=BaselineStrategy.NAIVE, seed=0
+    )
+    for game_index in range(10):
+        result = replay_game(
+            games.get_game_record(game_index), player_types=[NaivePlayer] * 4
+        )
+        assert [
+            result.solving_turn_indices[player_index] for player_index in range(4)
+        ] == list(games.solving_turn_indices[game_index])
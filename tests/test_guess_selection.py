@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from cluedo_simulator import run_game, run_turn, set_up_game
+from common.guess_selection import expected_case_file_entropies
+from common.smart_bot_agent import (
+    GuessMakingStrategy,
+    SmartBotObserver,
+    SmartBotPlayer,
+)
+
+
+def test_expected_entropies_are_at_most_case_file_entropy() -> None:
+    n_players = 4
+    setup = set_up_game(
+        player_types=[SmartBotPlayer] * n_players,
+        observer_types=[SmartBotObserver],
+        seed=0,
+    )
+    for turn_index in range(1, n_players + 1):
+        run_turn(turn_index, setup.players, turn_index - 1, setup.observers, setup.deal)
+    player = setup.players[0]
+    assert isinstance(player, SmartBotPlayer)
+    constraints = player._get_deal_constraints()  # type: ignore
+    deals = player._sample_deals(n_samples=500)  # type: ignore
+    entropies = expected_case_file_entropies(
+        constraints,
+        deals,
+        player.remaining_unique_guesses,
+        player.agent_index,
+        np.random.default_rng(0),
+    )
+    case_file_locations = constraints.to_external_locations(deals) == n_players
+    _, counts = np.unique(case_file_locations, axis=0, return_counts=True)
+    case_file_entropy = -(counts / len(deals) * np.log2(counts / len(deals))).sum()
+    assert (entropies >= -1e-9).all()
+    assert (entropies <= case_file_entropy + 1e-9).all()
+    # Some guess is expected to tell something.
+    assert entropies.min() < case_file_entropy - 0.5
+
+
+@pytest.mark.parametrize("n_players", [3, 6])
+def test_information_gain_guesses_solve_the_crime(n_players: int) -> None:
+    setup = set_up_game(
+        player_types=[SmartBotPlayer] * n_players, observer_types=[], seed=n_players
+    )
+    for player in setup.players.values():
+        assert isinstance(player, SmartBotPlayer)
+        player.guess_making_strategy = GuessMakingStrategy.NEW_GUESS_RUMOR
+    run_game(setup, dashboard=False, reveal_extra_cards_first=False)
+    for player in setup.players.values():
+        assert player.try_solving_crime() == setup.crime
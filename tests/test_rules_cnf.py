@@ -0,0 +1,45 @@
+import math
+from pathlib import Path
+
+import pytest
+from pysat.formula import IDPool  # type: ignore
+from pysat.solvers import Solver  # type: ignore
+
+from common.cardinality import PAIRWISE_MAX_SIZE, exactly_clauses
+from common.rules_cnf import _load_or_build_rules_cnf, build_rules_cnf  # type: ignore
+
+
+@pytest.mark.parametrize("n_players", [3, 4])
+def test_rules_cache_file_round_trip(tmp_path: Path, n_players: int) -> None:
+    n_cards_per_player, n_extra_cards = divmod(21, n_players)
+    expected = build_rules_cnf(n_players, n_cards_per_player, n_extra_cards)
+    built = _load_or_build_rules_cnf(
+        tmp_path, n_players, n_cards_per_player, n_extra_cards
+    )
+    (path,) = tmp_path.iterdir()
+    loaded = _load_or_build_rules_cnf(
+        tmp_path, n_players, n_cards_per_player, n_extra_cards
+    )
+    assert built == loaded == expected
+    # An unreadable file is rebuilt.
+    path.write_text("{")
+    assert (
+        _load_or_build_rules_cnf(tmp_path, n_players, n_cards_per_player, n_extra_cards)
+        == expected
+    )
+
+
+@pytest.mark.parametrize(
+    ("n_lits", "bound"), [(4, 1), (PAIRWISE_MAX_SIZE + 2, 1), (7, 3)]
+)
+def test_exactly_clauses_count(n_lits: int, bound: int) -> None:
+    lits = list(range(1, n_lits + 1))
+    id_pool = IDPool(start_from=1, occupied=[[1, n_lits]])
+    n_models = 0
+    with Solver(bootstrap_with=exactly_clauses(lits, bound, id_pool)) as solver:
+        while solver.solve():  # type: ignore
+            model = solver.get_model()[:n_lits]  # type: ignore
+            assert sum(lit > 0 for lit in model) == bound  # type: ignore
+            solver.add_clause([-lit for lit in model])  # type: ignore
+            n_models += 1
+    assert n_models == math.comb(n_lits, bound)
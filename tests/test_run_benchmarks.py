@@ -0,0 +1,39 @@
+import copy
+
+import pytest
+
+from benchmarks.run_benchmarks import (
+    OPERATIONS,
+    BenchmarkSettings,
+    compare_benchmarks,
+    run_benchmarks,
+)
+
+
+def test_benchmarks_flag_regressions() -> None:
+    settings = BenchmarkSettings(
+        n_players=(3,), n_games=1, max_n_turns=4, n_samples=10, sampling_turn_step=2
+    )
+    baseline = run_benchmarks(settings)
+    latencies = baseline["results"]["3"]["latency_ms"]
+    assert set(latencies) == set(OPERATIONS)
+    assert list(latencies["try_solving_crime"]) == ["1", "2", "3", "4"]
+    assert list(latencies["solve_truths_cnf_probabilities"]) == ["1", "3"]
+    assert baseline["results"]["3"]["peak_memory_kib"] > 0
+    assert not compare_benchmarks(baseline, baseline)["regressed"].any()
+
+    current = copy.deepcopy(baseline)
+    current["results"]["3"]["latency_ms"]["try_solving_crime"] = {
+        turn_index: 2 * latency
+        for turn_index, latency in latencies["try_solving_crime"].items()
+    }
+    current["results"]["3"]["games_per_second"] /= 2
+    comparison = compare_benchmarks(baseline, current, threshold=0.5)
+    assert set(comparison.loc[comparison["regressed"], "metric"]) == {
+        "try_solving_crime_ms",
+        "games_per_second",
+    }
+
+    current["settings"]["seed"] += 1
+    with pytest.raises(ValueError):
+        compare_benchmarks(baseline, current)
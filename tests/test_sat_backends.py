@@ -0,0 +1,35 @@
+import pytest
+
+from cluedo_simulator import run_turn, set_up_game
+from common.sat_backends import benchmark_sat_backends
+from common.sat_solver import DEFAULT_SAT_BACKEND, SAT_BACKENDS
+from common.smart_bot_agent import SmartBotObserver, SmartBotPlayer
+
+
+@pytest.mark.parametrize("sat_backend", SAT_BACKENDS)
+def test_backends_agree(sat_backend: str) -> None:
+    backbones = []
+    for backend in (DEFAULT_SAT_BACKEND, sat_backend):
+        setup = set_up_game(
+            player_types=[SmartBotPlayer] * 4,
+            observer_types=[SmartBotObserver],
+            sat_backend=backend,  # type: ignore
+            seed=0,
+        )
+        for turn_index in range(1, 5):
+            run_turn(
+                turn_index, setup.players, turn_index - 1, setup.observers, setup.deal
+            )
+        backbones.append(
+            [
+                agent.solve_backbone()
+                for agent in setup.agents.values()
+                if isinstance(agent, SmartBotObserver)
+            ]
+        )
+    assert backbones[0] == backbones[1]
+
+
+def test_benchmark_times_each_backend() -> None:
+    seconds = benchmark_sat_backends(3, 7, 0, sat_backends=("m22", "g3"))
+    assert set(seconds) == {"m22", "g3"}
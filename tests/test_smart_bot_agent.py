@@ -0,0 +1,209 @@
+from typing import Any
+
+import pytest
+
+from cluedo_simulator import run_turn, set_up_game
+from common.cards import CHARACTERS, ROOMS, RUMOR_TYPES, WEAPONS, Crime
+from common.smart_bot_agent import SmartBotObserver, SmartBotPlayer, UnsolvableError
+
+
+@pytest.mark.parametrize("n_players", [2, 3, 4, 6])
+def test_incremental_clauses_match_game_log(n_players: int) -> None:
+    setup = set_up_game(
+        player_types=[SmartBotPlayer] * n_players,
+        observer_types=[SmartBotObserver],
+        seed=n_players,
+    )
+    for turn_index in range(1, 2 * n_players + 1):
+        run_turn(
+            turn_index,
+            setup.players,
+            (turn_index - 1) % n_players,
+            setup.observers,
+            setup.deal,
+        )
+        for agent in setup.agents.values():
+            assert isinstance(agent, SmartBotObserver)
+            rules = agent._rules_boolean_statements()  # type: ignore
+            expected_clauses = {
+                tuple(sorted(clause))
+                for statement in agent._game_log_to_boolean_statements()  # type: ignore
+                if statement not in rules
+                for clause in statement.to_cnf(agent._variables_to_lits)  # type: ignore
+            }
+            agent._sync_public_knowledge()  # type: ignore
+            knowledge_clauses = {tuple(c) for c in agent._knowledge_clauses}  # type: ignore
+            public_knowledge = agent.public_knowledge
+            assert public_knowledge is not None
+            public_clauses = {tuple(c) for c in public_knowledge.clauses}
+            # Clauses that were already known from the rules are not knowledge, and
+            # every agent knows every public clause, even one that only restates what
+            # it was shown.
+            assert (
+                knowledge_clauses
+                <= expected_clauses | public_clauses
+                <= knowledge_clauses
+            )
+
+
+@pytest.mark.parametrize("n_players", [3, 5])
+def test_backbone_matches_one_solve_per_variable(n_players: int) -> None:
+    setup = set_up_game(
+        player_types=[SmartBotPlayer] * n_players,
+        observer_types=[SmartBotObserver],
+        seed=n_players,
+    )
+    for turn_index in range(1, n_players + 1):
+        run_turn(turn_index, setup.players, turn_index - 1, setup.observers, setup.deal)
+    for agent in setup.agents.values():
+        assert isinstance(agent, SmartBotObserver)
+        backbone = agent.solve_backbone()
+        solver = agent._solver  # type: ignore
+        assumptions = agent._assumptions  # type: ignore
+        for var, lit in agent._variables_to_lits.items():  # type: ignore
+            can_be_true = solver.solve(assumptions=[*assumptions, lit])
+            can_be_false = solver.solve(assumptions=[*assumptions, -lit])
+            if can_be_true and can_be_false:
+                assert var not in backbone
+            else:
+                assert backbone[var] is can_be_true
+
+
+def test_backbone_does_not_grow_solver() -> None:
+    setup = set_up_game(
+        player_types=[SmartBotPlayer] * 3, observer_types=[SmartBotObserver], seed=3
+    )
+    for turn_index in range(1, 4):
+        run_turn(turn_index, setup.players, turn_index - 1, setup.observers, setup.deal)
+    agents = list(setup.agents.values())
+    solver = setup.public_knowledge.solver
+    for agent in agents:
+        assert isinstance(agent, SmartBotObserver)
+        agent.solve_backbone()
+    n_vars = solver.n_vars
+    for _ in range(3):
+        for agent in agents:
+            assert isinstance(agent, SmartBotObserver)
+            agent.solve_backbone()
+    assert solver.n_vars == n_vars
+    assert solver._solver.nof_vars() <= n_vars  # type: ignore
+
+
+@pytest.mark.parametrize("n_players", [3, 6])
+def test_deduction_state_matches_backbone(n_players: int) -> None:
+    setup = set_up_game(
+        player_types=[SmartBotPlayer] * n_players,
+        observer_types=[SmartBotObserver],
+        seed=n_players,
+    )
+    for turn_index in range(1, 3 * n_players + 1):
+        run_turn(
+            turn_index,
+            setup.players,
+            (turn_index - 1) % n_players,
+            setup.observers,
+            setup.deal,
+        )
+        for agent in setup.agents.values():
+            assert isinstance(agent, SmartBotObserver)
+            # Query the case file first, so that other locations are brought up to
+            # date at different knowledge versions.
+            if turn_index % 2 == 0:
+                agent.try_solving_crime()
+                continue
+            state = agent.get_deduction_state()
+            backbone = agent.solve_backbone()
+            constraints = agent._get_deal_constraints()  # type: ignore
+            for var, lit in agent._variables_to_lits.items():  # type: ignore
+                location, card = divmod(lit - 1, len(state.values))
+                assert state.get_value(var.rumor_card, var.location) == backbone.get(
+                    var
+                )
+                # Whatever propagation decides is in the backbone.
+                if constraints.external_known[card, location]:
+                    assert backbone[var] is True
+                if not constraints.external_allowed[card, location]:
+                    assert backbone[var] is False
+
+
+def test_deduction_state_is_reused_until_knowledge_grows() -> None:
+    setup = set_up_game(player_types=[SmartBotPlayer] * 4, observer_types=[], seed=0)
+    run_turn(1, setup.players, 0, setup.observers, setup.deal)
+    agent = setup.players[1]
+    assert isinstance(agent, SmartBotPlayer)
+    knowledge_version = agent.knowledge_version
+    agent.get_deduction_state()
+    n_solves = 0
+    solve = agent._solver.solve  # type: ignore
+
+    def counting_solve(*args: Any, **kwargs: Any) -> bool:
+        nonlocal n_solves
+        n_solves += 1
+        return solve(*args, **kwargs)
+
+    agent._solver.solve = counting_solve  # type: ignore
+    agent.try_solving_crime()
+    agent.must_see_extra_cards()
+    agent.make_guess()
+    agent.get_deduction_state()
+    assert n_solves == 0
+    # Seeing a card that it already knows about tells the agent nothing new.
+    agent.sees_card(1, agent.agent_index, agent.rumor_cards[0])
+    assert agent.knowledge_version == knowledge_version
+    other_player = setup.players[(agent.agent_index + 1) % 4]
+    for rumor_card in other_player.rumor_cards:
+        agent.sees_card(1, other_player.agent_index, rumor_card)
+    assert agent.knowledge_version > knowledge_version
+    state = agent.get_deduction_state([other_player.agent_index])
+    assert state.get_unknown_cards(other_player.agent_index) == []
+
+
+def test_contradictory_turns_are_pinpointed_and_reset() -> None:
+    setup = set_up_game(player_types=[SmartBotPlayer] * 3, observer_types=[], seed=0)
+    agent = setup.players[0]
+    assert isinstance(agent, SmartBotPlayer)
+    other_player = setup.players[1]
+    assert isinstance(other_player, SmartBotPlayer)
+    rumor_card = other_player.rumor_cards[0]
+    guess = Crime(
+        *(
+            rumor_card if isinstance(rumor_card, rumor_type) else cards[0]
+            for rumor_type, cards in zip(
+                RUMOR_TYPES, [CHARACTERS, WEAPONS, ROOMS], strict=True
+            )
+        )
+    )
+    agent.add_game_log_entry(turn_index=1, guess=guess)
+    agent.sees_card(1, other_player.agent_index, rumor_card)
+    agent.add_game_log_entry(turn_index=2)
+    agent.try_solving_crime()
+    assert agent.get_conflicting_turn_indices() == []
+    # Mistakenly enter that the other player has none of the guessed cards.
+    agent.add_game_log_entry(turn_index=3, guess=guess)
+    agent.sees_card(3, other_player.agent_index, None)
+    with pytest.raises(UnsolvableError):
+        agent.try_solving_crime()
+    assert agent.get_conflicting_turn_indices() == [1, 3]
+    agent.reset_game_log_entry(turn_index=3, guess=guess)
+    assert agent.game_log[3].card_reveals == []
+    assert agent.get_conflicting_turn_indices() == []
+    state = agent.get_deduction_state([other_player.agent_index])
+    assert state.get_value(rumor_card, other_player.agent_index) is True
+
+
+def test_sat_backend_must_match_shared_public_knowledge() -> None:
+    setup = set_up_game(
+        player_types=[SmartBotPlayer] * 3, observer_types=[], sat_backend="g4", seed=0
+    )
+    agent = setup.players[0]
+    assert isinstance(agent, SmartBotPlayer)
+    assert agent.sat_backend == "g4"
+    kwargs: dict[str, Any] = {
+        "agent_index": 3,
+        "player_indices": agent.player_indices,
+        "n_cards_per_player": agent.n_cards_per_player,
+        "public_knowledge": setup.public_knowledge,
+    }
+    assert SmartBotObserver(**kwargs, sat_backend="g4").sat_backend == "g4"
+    with pytest.raises(ValueError):
+        SmartBotObserver(**kwargs, sat_backend="mc")
@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+
+from cluedo_simulator import run_turn, set_up_game
+from common.deal_counting import _count_deals, count_deals  # type: ignore
+from common.smart_bot_agent import SmartBotObserver, SmartBotPlayer
+from common.symmetry import get_interchangeable_players
+
+
+@pytest.mark.parametrize(("n_players", "n_turns"), [(3, 0), (5, 1), (6, 2)])
+def test_merged_players_count_and_sample_like_players(
+    n_players: int, n_turns: int
+) -> None:
+    setup = set_up_game(
+        player_types=[SmartBotPlayer] * n_players,
+        observer_types=[SmartBotObserver],
+        seed=0,
+    )
+    for turn_index in range(1, n_turns + 1):
+        run_turn(turn_index, setup.players, turn_index - 1, setup.observers, setup.deal)
+    (observer,) = setup.observers.values()
+    assert isinstance(observer, SmartBotObserver)
+    constraints = observer._get_deal_constraints()  # type: ignore
+    assert len(get_interchangeable_players(constraints)) < n_players
+    n_deals, marginals = count_deals(constraints)
+    expected_n_deals, expected_marginals = _count_deals(constraints)
+    assert n_deals == pytest.approx(expected_n_deals)
+    np.testing.assert_allclose(marginals, expected_marginals)
+    deals = observer._sample_deals(n_samples=2000)  # type: ignore
+    assert constraints.allowed[np.arange(constraints.n_cards), deals].all()
+    for location, capacity in enumerate(constraints.capacities):
+        assert ((deals == location).sum(axis=1) == capacity).all()
+    errors = constraints.count_locations(deals) / len(deals) - marginals / n_deals
+    assert np.abs(errors).max() < 0.1
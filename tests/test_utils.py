@@ -0,0 +1,15 @@
+import numpy as np
+
+from common.cards import RUMORS
+from common.utils import permutations
+
+
+def test_permutations_are_independent_permutations() -> None:
+    rows = permutations(len(RUMORS), 1000, np.random.default_rng(0))
+    assert (np.sort(rows, axis=1) == np.arange(len(RUMORS))).all()
+    # Each index is about as likely in each position.
+    assert np.allclose(
+        np.stack([(rows == i).mean(axis=0) for i in range(len(RUMORS))]),
+        1 / len(RUMORS),
+        atol=0.04,
+    )